@@ -3,8 +3,17 @@
 # By importing the logging_config module, we ensure the logger
 # is configured once when the package is first loaded.
 from . import logging_config
-from .agent import root_agent
 
-logging_config.logger.info("Project Agora application starting up. Logging configured.")
+__all__ = ["root_agent"]
 
-__all__ = ["root_agent"]
\ No newline at end of file
+
+def __getattr__(name):
+    # The agent tree (models, prompt caches, sub-agents) is built on first access, by the
+    # ADK loader or a deployment, so scripts that only import `project_agora.tools` skip it.
+    if name == "root_agent":
+        from .agent import root_agent
+
+        globals()["root_agent"] = root_agent
+        logging_config.logger.info("Project Agora application starting up. Logging configured.")
+        return root_agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -4,6 +4,8 @@
 Defines the main Orchestrator Agent for Project Agora.
 """
 
+import os
+
 from google.adk.agents import Agent
 from google.adk.tools.agent_tool import AgentTool
 
@@ -11,27 +13,36 @@ from .prompts import ORCHESTRATOR_PROMPT
 
 # Import all sub-agents and tools
 from .sub_agents.ticket_analysis.agent import ticket_analysis_agent
-from .sub_agents.knowledge_retrieval.agent import knowledge_retrieval_agent
-from .sub_agents.db_retrieval.agent import db_retrieval_agent
+from .sub_agents.context_retrieval.agent import context_retrieval_agent
 from .sub_agents.problem_solver.agent import problem_solver_agent
 from .sub_agents.code_generator.agent import code_generator_agent
 from .sub_agents.code_reviewer.agent import code_reviewer_agent
+from .sub_agents.intent_classifier.agent import intent_classifier_agent
 
 # Import tools that the orchestrator will call directly
 from .tools.tools import (
     create_ticket,
     update_ticket_after_analysis,
     update_ticket_after_retrieval,
+    update_ticket_status,
     generate_diagram_from_mermaid,
     format_code_reviewer_output,
 )
 
-from .callbacks import before_agent_call, before_tool_call, after_tool_call
+from .callbacks import before_agent_call, before_tool_call, after_tool_call, route_model_for_state
+from .model_routing import routed_model
+from .workflow_agent import TicketWorkflowAgent
+
+# "workflow" (default): the ticket state machine runs in code and models are only
+# called for the specialist work and ambiguous replies.
+# "llm": the orchestrator model follows the state machine in ORCHESTRATOR_PROMPT.
+ORCHESTRATOR_MODE = os.getenv("ORCHESTRATOR_MODE", "workflow").lower()
 
 # The main Orchestrator Agent
 orchestrator_agent = Agent(
     name="orchestrator_agent",
-    model="gemini-2.5-pro",
+    model=routed_model("orchestrator_agent"),
+    before_model_callback=route_model_for_state,
     global_instruction="""
         You are 'Agora', an expert system and lead orchestrator for a multi-agent system specializing in the **Google Agent Development Kit (ADK)**. You are modeled after the ancient Greek Agora—a central hub for collaboration.
 
@@ -47,11 +58,11 @@ orchestrator_agent = Agent(
         create_ticket,
         update_ticket_after_analysis,
         update_ticket_after_retrieval,
+        update_ticket_status,
         generate_diagram_from_mermaid,
         format_code_reviewer_output,
         AgentTool(ticket_analysis_agent),
-        AgentTool(knowledge_retrieval_agent),
-        AgentTool(db_retrieval_agent),
+        AgentTool(context_retrieval_agent),
         AgentTool(problem_solver_agent),
         AgentTool(code_generator_agent),
         AgentTool(code_reviewer_agent),
@@ -61,4 +72,16 @@ orchestrator_agent = Agent(
     after_tool_callback=after_tool_call,
 )
 
-root_agent = orchestrator_agent
\ No newline at end of file
+workflow_agent = TicketWorkflowAgent(
+    name="workflow_agent",
+    description="Drives the developer request ticket through its state machine in code.",
+    ticket_analysis_agent=ticket_analysis_agent,
+    context_retrieval_agent=context_retrieval_agent,
+    problem_solver_agent=problem_solver_agent,
+    code_generator_agent=code_generator_agent,
+    code_reviewer_agent=code_reviewer_agent,
+    intent_classifier_agent=intent_classifier_agent,
+    before_agent_callback=before_agent_call,
+)
+
+root_agent = orchestrator_agent if ORCHESTRATOR_MODE == "llm" else workflow_agent
\ No newline at end of file
@@ -0,0 +1,157 @@
+# FILE: project_agora/blob_store.py
+
+"""
+Content-addressed blob store for large ticket fields.
+
+The retrieval results and solutions written to the ticket can be tens of
+kilobytes. The ticket is re-serialized, persisted and injected into the context
+on every later turn, so values above `BLOB_OFFLOAD_THRESHOLD` bytes are written
+here instead. The ticket keeps a `BlobReference` (the SHA-256 address and size)
+and a short summary. Identical values share one blob, and blobs are never
+modified, so a reference stays valid for as long as the blob is kept.
+
+Configuration (environment variables):
+- `BLOB_STORE_URI`: `gs://bucket/prefix` for Cloud Storage, or a local directory
+  (default `.cache/blobs`).
+- `BLOB_OFFLOAD_THRESHOLD`: Values larger than this many bytes are offloaded (default 2048).
+- `BLOB_SUMMARY_CHARS`: Length of the summary kept in the ticket (default 300).
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional
+
+from google.api_core.exceptions import PreconditionFailed
+from google.cloud import storage
+
+from .entities.ticket import BlobReference
+from .logging_config import logger
+
+DEFAULT_BLOB_DIR = Path(__file__).resolve().parents[1] / ".cache" / "blobs"
+
+
+def content_address(data: bytes) -> str:
+    return f"sha256:{hashlib.sha256(data).hexdigest()}"
+
+
+def _digest(ref: str) -> str:
+    algorithm, _, digest = ref.partition(":")
+    if algorithm != "sha256" or len(digest) != 64:
+        raise ValueError(f"Unsupported blob reference '{ref}'.")
+    return digest
+
+
+class LocalBlobStore:
+    """Stores blobs as files under `root`, sharded by the first two hex digits of the digest."""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    def _path(self, ref: str) -> Path:
+        digest = _digest(ref)
+        return self.root / digest[:2] / digest
+
+    def put(self, data: bytes) -> str:
+        ref = content_address(data)
+        path = self._path(ref)
+        if path.exists():
+            return ref
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file and rename it so a reader never sees a partial blob.
+        with tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as tmp:
+            tmp.write(data)
+        os.replace(tmp.name, path)
+        return ref
+
+    def get(self, ref: str) -> bytes:
+        return self._path(ref).read_bytes()
+
+
+class GcsBlobStore:
+    """Stores blobs as objects under `gs://bucket/prefix/`."""
+
+    def __init__(self, bucket_name: str, prefix: str = "blobs"):
+        self.bucket_name = bucket_name
+        self.prefix = prefix.strip("/")
+        self._bucket = None
+
+    @property
+    def bucket(self):
+        if self._bucket is None:
+            self._bucket = storage.Client().bucket(self.bucket_name)
+        return self._bucket
+
+    def _name(self, ref: str) -> str:
+        return f"{self.prefix}/{_digest(ref)}" if self.prefix else _digest(ref)
+
+    def put(self, data: bytes) -> str:
+        ref = content_address(data)
+        try:
+            # Only create the object if it does not exist; an existing one has the same content.
+            self.bucket.blob(self._name(ref)).upload_from_string(data, if_generation_match=0)
+        except PreconditionFailed:
+            pass
+        return ref
+
+    def get(self, ref: str) -> bytes:
+        return self.bucket.blob(self._name(ref)).download_as_bytes()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_blob_store():
+    """Returns the process-wide blob store selected by BLOB_STORE_URI."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            uri = os.getenv("BLOB_STORE_URI") or str(DEFAULT_BLOB_DIR)
+            if uri.startswith("gs://"):
+                bucket_name, _, prefix = uri[5:].partition("/")
+                _store = GcsBlobStore(bucket_name, prefix)
+            else:
+                _store = LocalBlobStore(uri)
+        return _store
+
+
+def offload_threshold() -> int:
+    return int(os.getenv("BLOB_OFFLOAD_THRESHOLD", "2048"))
+
+
+def summarize(text: str, ref: BlobReference) -> str:
+    """Returns the start of `text`, cut at a line break where possible, followed by the blob reference."""
+    limit = int(os.getenv("BLOB_SUMMARY_CHARS", "300"))
+    head = text[:limit]
+    if len(text) > limit and "\n" in head:
+        head = head[: head.rindex("\n")]
+    return f"{head.rstrip()}\n… [{ref.size_bytes} bytes stored as {ref.ref}]"
+
+
+def offload_text(text: str) -> tuple[str, Optional[BlobReference]]:
+    """
+    Moves `text` to the blob store if it is larger than the offload threshold.
+    Returns the value to keep in the ticket (the text itself or its summary) and the
+    reference, or None if the text was kept inline.
+    """
+    data = text.encode("utf-8")
+    if len(data) <= offload_threshold():
+        return text, None
+    try:
+        ref = BlobReference(ref=get_blob_store().put(data), size_bytes=len(data))
+    except Exception as e:
+        logger.warning("Could not offload a %d-byte value to the blob store, keeping it inline: %s", len(data), e)
+        return text, None
+    return summarize(text, ref), ref
+
+
+def load_text(ref: BlobReference, fallback: str = "") -> str:
+    """Returns the full text behind a reference, or `fallback` (e.g. the summary) if it cannot be read."""
+    try:
+        return get_blob_store().get(ref.ref).decode("utf-8")
+    except Exception as e:
+        logger.warning("Could not read %s from the blob store, using its summary: %s", ref.ref, e)
+        return fallback
@@ -1,23 +1,40 @@
 # FILE: project_agora/callbacks.py
 
-import json
+import time
+from typing import Optional
 
 # Corrected imports from previous steps
 from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest
 from google.adk.tools.tool_context import ToolContext
+from google.genai import types
 
 from .logging_config import logger # Import our configured logger
+from .model_routing import get_route
+from .prompt_cache import get_prompt_cache
+from .ticket_state import load_ticket
+from .tools._data_tools import _get_embedding_for_query
+from .tools._semantic_cache import get_kb_query_cache
+from .tools._tool_executor import run_blocking
+from .tools.exceptions import EmbeddingError
+
+# Query embedding and start time of each knowledge retrieval run that missed the cache,
+# keyed by invocation id, so the after-callback can store the result. Entries whose
+# after-callback never ran (e.g. the agent raised) are dropped after this many seconds.
+_pending_kb_queries: dict[str, tuple[list[float], float]] = {}
+PENDING_KB_QUERY_MAX_SECONDS = 600.0
 
 def before_agent_call(callback_context: CallbackContext):
     """Logs the start of an agent's turn."""
     logger.info("Orchestrator turn started.")
     # We can still access the state to get ticket info
-    if "ticket" in callback_context.state:
-        try:
-            ticket = json.loads(callback_context.state["ticket"])
-            logger.info("Current Ticket ID: %s, Status: %s", ticket.get('ticket_id'), ticket.get('status'))
-        except (json.JSONDecodeError, TypeError):
-            logger.warning("Could not parse ticket from state during before_agent_call.")
+    try:
+        ticket = load_ticket(callback_context)
+    except ValueError:
+        logger.warning("Could not parse ticket from state during before_agent_call.")
+        return
+    if ticket is not None:
+        logger.info("Current Ticket ID: %s, Status: %s", ticket.ticket_id, ticket.status)
 
 
 def before_tool_call(tool: object, args: dict, tool_context: ToolContext):
@@ -41,4 +58,103 @@ def after_tool_call(tool: object, args: dict, tool_context: ToolContext, tool_re
 
     logger.info(
         "Tool '%s' finished. Response: %s", tool.name, truncated_response
-    )
\ No newline at end of file
+    )
+
+
+def route_model_for_state(callback_context: CallbackContext, llm_request: LlmRequest) -> None:
+    """Switches the model for this call to the one the agent's route assigns to the current ticket status."""
+    route = get_route(callback_context.agent_name)
+    if route is None or not route.state_models:
+        return None
+
+    status = None
+    try:
+        ticket = load_ticket(callback_context)
+        status = ticket.status if ticket else None
+    except ValueError:
+        logger.warning("Could not parse ticket from state during route_model_for_state.")
+    model = route.model_for(status)
+    if model != llm_request.model:
+        logger.info("Routing %s to %s for status '%s'.", callback_context.agent_name, model, status)
+        llm_request.model = model
+    return None
+
+
+async def route_model_and_cache_prompt(callback_context: CallbackContext, llm_request: LlmRequest) -> None:
+    """
+    Applies `route_model_for_state`, then replaces the agent's static instruction with
+    its context cache, so the cache is created for the model the request will use.
+    """
+    route_model_for_state(callback_context, llm_request)
+    cache = get_prompt_cache()
+    if cache is not None:
+        await cache.apply(callback_context.agent_name, llm_request)
+    return None
+
+
+def _request_text(callback_context: CallbackContext) -> str:
+    content = callback_context.user_content
+    if not content or not content.parts:
+        return ""
+    return " ".join(part.text for part in content.parts if part.text).strip()
+
+
+def _drop_stale_kb_queries(now: float) -> None:
+    stale = [key for key, (_, started) in _pending_kb_queries.items() if now - started > PENDING_KB_QUERY_MAX_SECONDS]
+    for key in stale:
+        _pending_kb_queries.pop(key, None)
+
+
+async def check_kb_query_cache(callback_context: CallbackContext) -> Optional[types.Content]:
+    """
+    Answers the knowledge retrieval agent from the semantic cache when a near-identical
+    request was answered recently, skipping both the RAG call and the model turn.
+    The request is embedded on the tool thread pool, so the sibling retrieval branch
+    and other sessions keep running meanwhile.
+    """
+    # An entry left by an earlier run in this invocation is stale on every path below.
+    _pending_kb_queries.pop(callback_context.invocation_id, None)
+    cache = get_kb_query_cache()
+    query = _request_text(callback_context)
+    if cache is None or not query:
+        return None
+
+    try:
+        embedding = await run_blocking(_get_embedding_for_query, query)
+    except EmbeddingError:
+        logger.warning("Knowledge retrieval cache skipped: could not embed the request.")
+        return None
+
+    entry = cache.lookup(embedding)
+    if entry is None:
+        now = time.perf_counter()
+        _drop_stale_kb_queries(now)
+        _pending_kb_queries[callback_context.invocation_id] = (embedding, now)
+        logger.info("Knowledge retrieval cache miss. Stats: %s", cache.stats())
+        return None
+
+    logger.info(
+        "Knowledge retrieval cache hit (similarity %.3f) for request: %s. Stats: %s",
+        entry["similarity"], query, cache.stats(),
+    )
+    # Returning content skips the agent, so its output_key has to be written here.
+    callback_context.state["kb_retrieval_results"] = entry["value"]
+    return types.Content(role="model", parts=[types.Part(text=entry["value"])])
+
+
+def store_kb_query_cache(callback_context: CallbackContext) -> None:
+    """Caches the knowledge retrieval agent's output for the request it just answered."""
+    pending = _pending_kb_queries.pop(callback_context.invocation_id, None)
+    cache = get_kb_query_cache()
+    result = callback_context.state.get("kb_retrieval_results")
+    if pending is None or cache is None or not result:
+        return None
+
+    embedding, started = pending
+    cache.store(
+        embedding,
+        result,
+        compute_seconds=time.perf_counter() - started,
+        query=_request_text(callback_context),
+    )
+    return None
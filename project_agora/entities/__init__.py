@@ -1 +1 @@
-from .ticket import SupportTicket, TicketAnalysis
+from .ticket import BlobReference, SupportTicket, TicketAnalysis
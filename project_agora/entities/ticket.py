@@ -5,7 +5,7 @@ These models, SupportTicket and TicketAnalysis, provide structured data handling
 for managing the application's state throughout the multi-agent workflow.
 """
 
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -29,6 +29,13 @@ class TicketAnalysis(BaseModel):
     )
 
 
+class BlobReference(BaseModel):
+    """A pointer to a large field value kept in the content-addressed blob store."""
+
+    ref: str = Field(description="The content address of the value (e.g., sha256:<hex digest>).")
+    size_bytes: int = Field(description="The size of the UTF-8 encoded value.")
+
+
 class SupportTicket(BaseModel):
     """The central state object representing a developer request."""
 
@@ -40,7 +47,8 @@ class SupportTicket(BaseModel):
         default="New",
         description=(
             "The current status of the request in its lifecycle (e.g., New, "
-            "Analyzing, AwaitingContextConfirmation, Pending Solution, AwaitingPlanApproval, Resolved)."
+            "Analyzing, AwaitingReuseConfirmation, AwaitingContextConfirmation, Pending Solution, "
+            "AwaitingPlanApproval, Resolved)."
         ),
     )
     request: str = Field(
@@ -59,6 +67,10 @@ class SupportTicket(BaseModel):
         default=None,
         description="The final proposed solution to be sent to the developer.",
     )
+    solution_source: Optional[str] = Field(
+        default=None,
+        description="The ID of the earlier ticket whose stored solution resolved this request, if any.",
+    )
 
     # Add these two new fields to store retrieval results
     retrieved_kb_docs: Optional[str] = Field(
@@ -68,9 +80,22 @@ class SupportTicket(BaseModel):
         default=None, description="Raw results from the historical ticket search."
     )
 
+    # Large values moved out of the session state
+    blob_refs: Dict[str, BlobReference] = Field(
+        default_factory=dict,
+        description=(
+            "Fields whose full value was moved to the blob store, by field name. "
+            "The field itself then holds a short summary."
+        ),
+    )
+
     # History and logging
     resolution_history: List[str] = Field(
-        default_factory=list, description="A log of actions taken on this request."
+        default_factory=list,
+        description="The most recent actions taken on this request (bounded by RESOLUTION_HISTORY_LIMIT).",
+    )
+    resolution_history_dropped: int = Field(
+        default=0, description="The number of older history entries dropped to keep the history bounded."
     )
     assigned_agent: Optional[str] = Field(
         default=None,
@@ -78,5 +103,5 @@ class SupportTicket(BaseModel):
     )
 
     def to_json(self) -> str:
-        """Converts the SupportTicket object to a JSON string for state management."""
-        return self.model_dump_json(indent=2)
+        """Converts the SupportTicket object to a compact JSON string for state management."""
+        return self.model_dump_json()
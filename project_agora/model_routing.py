@@ -0,0 +1,318 @@
+# FILE: project_agora/model_routing.py
+
+"""
+Central model routing for every agent in Project Agora.
+
+Each agent gets a `ModelRoute`: a primary model, optional per-ticket-state models,
+a fallback model and a latency budget. `routed_model(agent_name)` returns the
+model an agent should be constructed with. When routing is enabled this is a
+`RoutedLlm`, which:
+
+- times every call and records per-agent latency and token statistics,
+- fails over to the fallback model when the primary does not produce its first
+  response within the latency budget or raises,
+- downgrades the agent to the fallback model for a cooldown period after several
+  consecutive budget breaches, so a slow primary is not waited on every turn.
+
+The ticket state is applied by the `route_model_for_state` before-model callback,
+which rewrites `llm_request.model` from the route's `state_models`.
+
+Routes can be overridden with a JSON file named by `MODEL_ROUTING_CONFIG`, e.g.
+`{"problem_solver_agent": {"model": "gemini-2.5-flash", "latency_budget_s": 20}}`.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncGenerator, Optional
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.adk.models.registry import LLMRegistry
+from pydantic import BaseModel, Field
+
+from .logging_config import logger
+from .prompt_cache import detach_prompt_prefix
+
+PRO_MODEL = "gemini-2.5-pro"
+FLASH_MODEL = "gemini-2.5-flash"
+
+# The routing state used before a ticket has been created (greetings, create_ticket).
+NO_TICKET_STATE = "NoTicket"
+
+# Number of recent call latencies kept per agent for the percentile statistics.
+LATENCY_WINDOW = 200
+
+
+class ModelRoute(BaseModel):
+    """The model assignment and latency policy for one agent."""
+
+    model: str = Field(description="The primary model.")
+    state_models: dict[str, str] = Field(
+        default_factory=dict,
+        description="Models to use instead of the primary for specific ticket statuses.",
+    )
+    fallback: Optional[str] = Field(
+        default=None, description="The model used on failover and while downgraded."
+    )
+    latency_budget_s: Optional[float] = Field(
+        default=None,
+        description="Seconds allowed until the first response before failing over. None disables the budget.",
+    )
+    downgrade_after: int = Field(
+        default=3, description="Consecutive budget breaches that downgrade the agent to the fallback."
+    )
+    downgrade_cooldown_s: float = Field(
+        default=300.0, description="Seconds the agent stays downgraded before the primary is retried."
+    )
+
+    def model_for(self, status: Optional[str]) -> str:
+        """Returns the model for a ticket status, falling back to the primary model."""
+        return self.state_models.get(status or NO_TICKET_STATE, self.model)
+
+
+# The orchestrator mostly routes and emits canned status messages until a solution
+# has to be presented, so the early states run on flash.
+DEFAULT_ROUTES: dict[str, ModelRoute] = {
+    "orchestrator_agent": ModelRoute(
+        model=PRO_MODEL,
+        state_models={
+            NO_TICKET_STATE: FLASH_MODEL,
+            "New": FLASH_MODEL,
+            "Analyzing": FLASH_MODEL,
+            "AwaitingContextConfirmation": FLASH_MODEL,
+        },
+        fallback=FLASH_MODEL,
+        latency_budget_s=20.0,
+    ),
+    "ticket_analysis_agent": ModelRoute(model=FLASH_MODEL, latency_budget_s=15.0),
+    "intent_classifier_agent": ModelRoute(model=FLASH_MODEL, latency_budget_s=10.0),
+    "knowledge_retrieval_agent": ModelRoute(model=PRO_MODEL, fallback=FLASH_MODEL, latency_budget_s=15.0),
+    "db_retrieval_agent": ModelRoute(model=PRO_MODEL, fallback=FLASH_MODEL, latency_budget_s=15.0),
+    "problem_solver_agent": ModelRoute(model=PRO_MODEL, fallback=FLASH_MODEL, latency_budget_s=60.0),
+    "code_generator_agent": ModelRoute(model=PRO_MODEL, fallback=FLASH_MODEL, latency_budget_s=90.0),
+    "code_reviewer_agent": ModelRoute(model=PRO_MODEL, fallback=FLASH_MODEL, latency_budget_s=60.0),
+}
+
+
+def model_routing_enabled() -> bool:
+    return os.getenv("MODEL_ROUTING_ENABLED", "true").lower() not in ("0", "false", "no")
+
+
+def load_routes(config_path: Optional[str] = None) -> dict[str, ModelRoute]:
+    """Returns the default routes, with any agents in the JSON config file overridden field by field."""
+    routes = {name: route.model_copy(deep=True) for name, route in DEFAULT_ROUTES.items()}
+    config_path = config_path if config_path is not None else os.getenv("MODEL_ROUTING_CONFIG")
+    if not config_path:
+        return routes
+
+    try:
+        with open(config_path, "r", encoding="utf-8") as f:
+            overrides = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        logger.error("Could not read model routing config '%s', using defaults: %s", config_path, e)
+        return routes
+
+    for name, fields in overrides.items():
+        base = routes[name].model_dump() if name in routes else {}
+        routes[name] = ModelRoute(**{**base, **fields})
+    logger.info("Loaded model routing overrides for: %s", ", ".join(overrides))
+    return routes
+
+
+_routes: Optional[dict[str, ModelRoute]] = None
+
+
+def get_route(agent_name: str) -> Optional[ModelRoute]:
+    global _routes
+    if _routes is None:
+        _routes = load_routes()
+    return _routes.get(agent_name)
+
+
+class AgentModelStats:
+    """Latency, token and routing counters for one agent."""
+
+    def __init__(self):
+        self.calls = 0
+        self.failovers = 0
+        self.budget_breaches = 0
+        self.downgraded_calls = 0
+        self.errors = 0
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+        self.calls_by_model: dict[str, int] = {}
+        self.latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.consecutive_breaches = 0
+        self.downgraded_until = 0.0
+
+    def record(self, model: str, seconds: float, usage: Any = None):
+        self.calls += 1
+        self.calls_by_model[model] = self.calls_by_model.get(model, 0) + 1
+        self.latencies.append(seconds)
+        if usage is not None:
+            self.prompt_tokens += getattr(usage, "prompt_token_count", None) or 0
+            self.output_tokens += getattr(usage, "candidates_token_count", None) or 0
+
+    def summary(self) -> dict:
+        ordered = sorted(self.latencies)
+
+        def percentile(p: float) -> float:
+            return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))], 3) if ordered else 0.0
+
+        return {
+            "calls": self.calls,
+            "calls_by_model": dict(self.calls_by_model),
+            "failovers": self.failovers,
+            "budget_breaches": self.budget_breaches,
+            "downgraded_calls": self.downgraded_calls,
+            "errors": self.errors,
+            "p50_s": percentile(0.5),
+            "p95_s": percentile(0.95),
+            "mean_s": round(sum(ordered) / len(ordered), 3) if ordered else 0.0,
+            "prompt_tokens": self.prompt_tokens,
+            "output_tokens": self.output_tokens,
+        }
+
+
+_stats: dict[str, AgentModelStats] = {}
+_stats_lock = threading.Lock()
+
+
+def _agent_stats(agent_name: str) -> AgentModelStats:
+    with _stats_lock:
+        return _stats.setdefault(agent_name, AgentModelStats())
+
+
+def model_routing_stats() -> dict[str, dict]:
+    """Returns per-agent latency, token and failover statistics for this process."""
+    with _stats_lock:
+        return {name: stats.summary() for name, stats in _stats.items()}
+
+
+def reset_model_routing_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+_backends: dict[str, BaseLlm] = {}
+
+
+def _backend(model: str) -> BaseLlm:
+    """Returns a cached model client for `model` from the ADK model registry."""
+    if model not in _backends:
+        _backends[model] = LLMRegistry.new_llm(model)
+    return _backends[model]
+
+
+async def _first_response(
+    responses: AsyncGenerator[LlmResponse, None], budget: Optional[float]
+) -> LlmResponse:
+    if budget is None:
+        return await anext(responses)
+    return await asyncio.wait_for(anext(responses), timeout=budget)
+
+
+class RoutedLlm(BaseLlm):
+    """
+    A model that delegates to the model chosen by an agent's `ModelRoute`, enforcing
+    its latency budget. `model` is the route's primary model; the before-model
+    callback may replace `llm_request.model` with a state-specific model.
+    """
+
+    agent_name: str
+    route: ModelRoute
+
+    @classmethod
+    def supported_models(cls) -> list[str]:
+        # Only ever constructed directly by `routed_model`, never through the registry.
+        return []
+
+    def _select(self, requested: str, stats: AgentModelStats) -> tuple[str, bool]:
+        if self.route.fallback and time.monotonic() < stats.downgraded_until:
+            return self.route.fallback, True
+        return requested or self.route.model, False
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        stats = _agent_stats(self.agent_name)
+        model, downgraded = self._select(llm_request.model, stats)
+        if downgraded:
+            stats.downgraded_calls += 1
+        # Only a different model can help, and the fallback itself is never timed out.
+        budget = self.route.latency_budget_s if self.route.fallback and model != self.route.fallback else None
+
+        started = time.perf_counter()
+        if model != llm_request.model:
+            # Context caches are per model, so a downgraded call sends its instruction inline.
+            detach_prompt_prefix(llm_request)
+        llm_request.model = model
+        responses = _backend(model).generate_content_async(llm_request, stream=stream)
+        try:
+            first = await _first_response(responses, budget)
+        except StopAsyncIteration:
+            stats.record(model, time.perf_counter() - started)
+            return
+        except Exception as e:
+            await responses.aclose()
+            timed_out = isinstance(e, asyncio.TimeoutError)
+            if not self.route.fallback or model == self.route.fallback:
+                stats.errors += 1
+                raise
+            if timed_out:
+                self._record_breach(stats)
+                logger.warning(
+                    "%s: %s exceeded its %.1fs latency budget, failing over to %s.",
+                    self.agent_name, model, budget, self.route.fallback,
+                )
+            else:
+                stats.errors += 1
+                logger.warning(
+                    "%s: %s failed (%s), failing over to %s.", self.agent_name, model, e, self.route.fallback
+                )
+            stats.failovers += 1
+            model = self.route.fallback
+            detach_prompt_prefix(llm_request)
+            llm_request.model = model
+            responses = _backend(model).generate_content_async(llm_request, stream=stream)
+            first = await anext(responses, None)
+            if first is None:
+                stats.record(model, time.perf_counter() - started)
+                return
+        else:
+            if budget is not None:
+                stats.consecutive_breaches = 0
+
+        usage = first.usage_metadata
+        yield first
+        async for response in responses:
+            usage = response.usage_metadata or usage
+            yield response
+        stats.record(model, time.perf_counter() - started, usage)
+
+    def _record_breach(self, stats: AgentModelStats):
+        stats.budget_breaches += 1
+        stats.consecutive_breaches += 1
+        if stats.consecutive_breaches >= self.route.downgrade_after:
+            stats.consecutive_breaches = 0
+            stats.downgraded_until = time.monotonic() + self.route.downgrade_cooldown_s
+            logger.warning(
+                "%s: downgraded to %s for %.0fs after %d consecutive latency budget breaches.",
+                self.agent_name, self.route.fallback, self.route.downgrade_cooldown_s, self.route.downgrade_after,
+            )
+
+
+def routed_model(agent_name: str, default: str = PRO_MODEL) -> "str | RoutedLlm":
+    """
+    Returns the model an agent should be constructed with. With routing disabled, or
+    for an agent without a route, this is the plain model name.
+    """
+    route = get_route(agent_name)
+    if route is None:
+        return default
+    if not model_routing_enabled():
+        return route.model
+    return RoutedLlm(model=route.model, agent_name=agent_name, route=route)
@@ -0,0 +1,314 @@
+# FILE: project_agora/prompt_cache.py
+
+"""
+Prompt-prefix caching for agents with large, static instructions.
+
+The code generator and code reviewer instructions inline the whole ADK style
+guide, and that text was re-sent and re-processed on every call. Agents
+registered here have their system instruction stored once per model with the
+model's context-caching facility. Each call then references the cache instead
+of sending the text:
+
+- `FilePrompt` is an instruction provider that rebuilds the prompt only when one
+  of its source files (e.g. `style_guide.md`) changes.
+- `PromptPrefixCache.apply` swaps the request's system instruction for the cached
+  content. A new cache is created when the instruction's fingerprint changes,
+  because the prompt files were edited, or when the cache is about to expire.
+- `GeminiContextCacheBackend` uses Gemini context caching.
+  `LocalContextCacheBackend` is an in-memory stand-in that counts tokens locally.
+  Both feed the same cached versus uncached prefix token statistics.
+"""
+
+import asyncio
+import hashlib
+import os
+import time
+from typing import Any, Callable, Optional
+
+from google import genai
+from google.adk.models import LlmRequest
+from google.genai import types
+
+from .logging_config import logger
+from .tools._tokens import count_tokens
+
+DEFAULT_TTL_SECONDS = 3600
+# A cache this close to expiry is replaced before use so a call never references an expired cache.
+REFRESH_MARGIN_SECONDS = 60
+# After a failed cache creation (e.g. the prefix is below the model's minimum), retry this much later.
+RETRY_AFTER_FAILURE_SECONDS = 600
+
+
+class FilePrompt:
+    """
+    An ADK instruction provider that returns `build()`, calling it again only when
+    the modification time or size of one of `files` changes.
+    """
+
+    def __init__(self, build: Callable[[], str], files: list[str]):
+        self.build = build
+        self.files = files
+        self.rebuilds = 0
+        self._signature: Optional[tuple] = None
+        self._text = ""
+
+    def _current_signature(self) -> tuple:
+        signature = []
+        for path in self.files:
+            try:
+                stat = os.stat(path)
+                signature.append((path, stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append((path, None, None))
+        return tuple(signature)
+
+    def text(self) -> str:
+        signature = self._current_signature()
+        if signature != self._signature:
+            self._text = self.build()
+            if self._signature is not None:
+                self.rebuilds += 1
+                logger.info("Prompt source files changed; rebuilt the instruction from %s.", ", ".join(self.files))
+            self._signature = signature
+        return self._text
+
+    def __call__(self, context: Any = None) -> str:
+        return self.text()
+
+
+def _instruction_text(system_instruction: Any) -> str:
+    if system_instruction is None:
+        return ""
+    if isinstance(system_instruction, str):
+        return system_instruction
+    parts = getattr(system_instruction, "parts", None) or []
+    return "".join(part.text or "" for part in parts)
+
+
+def prefix_fingerprint(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+class GeminiContextCacheBackend:
+    """Stores prefixes with Gemini context caching (`client.caches`)."""
+
+    def __init__(self, client: Optional[genai.Client] = None):
+        self._client = client
+
+    @property
+    def client(self) -> genai.Client:
+        if self._client is None:
+            self._client = genai.Client()
+        return self._client
+
+    async def create(self, model: str, system_instruction: str, ttl_seconds: int, display_name: str) -> tuple[str, int]:
+        cache = await self.client.aio.caches.create(
+            model=model,
+            config=types.CreateCachedContentConfig(
+                system_instruction=system_instruction,
+                ttl=f"{ttl_seconds}s",
+                display_name=display_name,
+            ),
+        )
+        usage = cache.usage_metadata
+        tokens = usage.total_token_count if usage and usage.total_token_count else count_tokens(system_instruction)
+        return cache.name, tokens
+
+    async def delete(self, name: str) -> None:
+        await self.client.aio.caches.delete(name=name)
+
+
+class LocalContextCacheBackend:
+    """
+    An in-memory stand-in for context caching. Tokens are counted locally, and
+    prefixes shorter than `min_tokens` are rejected the way the real service rejects them.
+    """
+
+    def __init__(self, min_tokens: int = 0):
+        self.min_tokens = min_tokens
+        self.entries: dict[str, str] = {}
+        self.created = 0
+        self.deleted = 0
+
+    async def create(self, model: str, system_instruction: str, ttl_seconds: int, display_name: str) -> tuple[str, int]:
+        tokens = count_tokens(system_instruction)
+        if tokens < self.min_tokens:
+            raise ValueError(f"Cached content has {tokens} tokens; the minimum is {self.min_tokens}.")
+        self.created += 1
+        name = f"cachedContents/local-{self.created}"
+        self.entries[name] = system_instruction
+        return name, tokens
+
+    async def delete(self, name: str) -> None:
+        if self.entries.pop(name, None) is not None:
+            self.deleted += 1
+
+
+class _CachedPrefix:
+    def __init__(self, name: str, fingerprint: str, tokens: int, expires_at: float):
+        self.name = name
+        self.fingerprint = fingerprint
+        self.tokens = tokens
+        self.expires_at = expires_at
+
+
+class PromptPrefixCache:
+    """Replaces registered agents' static system instructions with context-cache references."""
+
+    def __init__(self, backend: Any, ttl_seconds: int = DEFAULT_TTL_SECONDS):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self._registered: set[str] = set()
+        self._entries: dict[tuple[str, str], _CachedPrefix] = {}
+        self._instructions_by_name: dict[str, str] = {}
+        self._failures: dict[tuple[str, str, str], float] = {}
+        self._locks: dict[tuple[str, str], asyncio.Lock] = {}
+        self._stats: dict[str, dict[str, int]] = {}
+
+    def register(self, agent_name: str) -> None:
+        """Marks an agent's system instruction as a static prefix to cache."""
+        self._registered.add(agent_name)
+
+    def _agent_stats(self, agent_name: str) -> dict[str, int]:
+        return self._stats.setdefault(
+            agent_name,
+            {
+                "cached_calls": 0,
+                "uncached_calls": 0,
+                "cached_prefix_tokens": 0,
+                "uncached_prefix_tokens": 0,
+                "creations": 0,
+                "refreshes": 0,
+                "failures": 0,
+            },
+        )
+
+    async def apply(self, agent_name: str, llm_request: LlmRequest) -> bool:
+        """
+        Points `llm_request` at the cached copy of its system instruction, creating
+        or refreshing the cache as needed. Returns False, leaving the request
+        unchanged, when the agent is not registered or the prefix cannot be cached.
+        """
+        config = llm_request.config
+        if agent_name not in self._registered or config is None:
+            return False
+        instruction = _instruction_text(config.system_instruction)
+        if not instruction:
+            return False
+
+        stats = self._agent_stats(agent_name)
+        # Cached content cannot be combined with tools in the same request.
+        if config.tools or config.cached_content:
+            self._record_uncached(stats, instruction)
+            return False
+
+        fingerprint = prefix_fingerprint(instruction)
+        key = (agent_name, llm_request.model)
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            entry = await self._current_entry(key, fingerprint, instruction, stats)
+        if entry is None:
+            self._record_uncached(stats, instruction)
+            return False
+
+        config.system_instruction = None
+        config.cached_content = entry.name
+        stats["cached_calls"] += 1
+        stats["cached_prefix_tokens"] += entry.tokens
+        return True
+
+    async def _current_entry(
+        self, key: tuple[str, str], fingerprint: str, instruction: str, stats: dict[str, int]
+    ) -> Optional[_CachedPrefix]:
+        agent_name, model = key
+        entry = self._entries.get(key)
+        now = time.time()
+        if entry is not None and entry.fingerprint == fingerprint and entry.expires_at - now > REFRESH_MARGIN_SECONDS:
+            return entry
+
+        failed_at = self._failures.get((agent_name, model, fingerprint))
+        if failed_at is not None and now - failed_at < RETRY_AFTER_FAILURE_SECONDS:
+            return None
+
+        try:
+            name, tokens = await self.backend.create(
+                model, instruction, self.ttl_seconds, f"{agent_name}-{fingerprint}"
+            )
+        except Exception as e:
+            stats["failures"] += 1
+            self._failures[(agent_name, model, fingerprint)] = now
+            logger.warning("Could not cache the %s instruction for %s, sending it uncached: %s", agent_name, model, e)
+            return None
+
+        stats["creations"] += 1
+        self._instructions_by_name[name] = instruction
+        self._entries[key] = _CachedPrefix(name, fingerprint, tokens, now + self.ttl_seconds)
+        if entry is not None:
+            stats["refreshes"] += 1
+            if entry.fingerprint != fingerprint:
+                # The prompt changed, so the old cache will never be used again.
+                logger.info("%s instruction changed; replaced context cache %s with %s.", agent_name, entry.name, name)
+                await self._delete(entry.name)
+        else:
+            logger.info("Cached the %s instruction for %s as %s (%d tokens).", agent_name, model, name, tokens)
+        return self._entries[key]
+
+    async def _delete(self, name: str) -> None:
+        self._instructions_by_name.pop(name, None)
+        try:
+            await self.backend.delete(name)
+        except Exception as e:
+            logger.warning("Could not delete context cache %s: %s", name, e)
+
+    def _record_uncached(self, stats: dict[str, int], instruction: str) -> None:
+        stats["uncached_calls"] += 1
+        stats["uncached_prefix_tokens"] += count_tokens(instruction)
+
+    def detach(self, llm_request: LlmRequest) -> None:
+        """
+        Restores the inline system instruction of a request that references a cache.
+        Caches are model-specific, so this is needed before sending the request to another model.
+        """
+        config = llm_request.config
+        if config is None or not config.cached_content:
+            return
+        instruction = self._instructions_by_name.get(config.cached_content)
+        if instruction is not None:
+            config.system_instruction = instruction
+            config.cached_content = None
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        return {name: dict(values) for name, values in self._stats.items()}
+
+
+_prompt_cache: Optional[PromptPrefixCache] = None
+
+
+def get_prompt_cache() -> Optional[PromptPrefixCache]:
+    """
+    Returns the process-wide prompt-prefix cache. PROMPT_CACHE_BACKEND selects
+    "gemini" (default), "local" or "off".
+    """
+    global _prompt_cache
+    backend_name = os.getenv("PROMPT_CACHE_BACKEND", "gemini").lower()
+    if backend_name == "off":
+        return None
+    if _prompt_cache is None:
+        backend = LocalContextCacheBackend() if backend_name == "local" else GeminiContextCacheBackend()
+        ttl_seconds = int(os.getenv("PROMPT_CACHE_TTL_SECONDS", str(DEFAULT_TTL_SECONDS)))
+        _prompt_cache = PromptPrefixCache(backend, ttl_seconds=ttl_seconds)
+    return _prompt_cache
+
+
+def register_prompt_prefix(agent_name: str) -> None:
+    cache = get_prompt_cache()
+    if cache is not None:
+        cache.register(agent_name)
+
+
+def detach_prompt_prefix(llm_request: LlmRequest) -> None:
+    if _prompt_cache is not None:
+        _prompt_cache.detach(llm_request)
+
+
+def prompt_cache_stats() -> dict[str, dict[str, int]]:
+    return _prompt_cache.stats() if _prompt_cache is not None else {}
@@ -0,0 +1,350 @@
+# FILE: project_agora/session_service.py
+
+"""
+A durable ADK session service on SQLite.
+
+`InMemorySessionService` loses every ticket on restart, and sessions cannot move
+between instances. `SqliteSessionService` implements the same `BaseSessionService`
+contract on a local SQLite database:
+
+- The database runs in WAL mode, so readers do not block the single writer.
+  Connections come from a fixed-size pool and the blocking calls run in worker
+  threads, off the event loop.
+- State is stored one row per key, in separate session, user (`user:`) and app
+  (`app:`) scopes. `append_event` writes only the keys in the event's state delta
+  and never rewrites the whole state. `temp:` keys are not persisted.
+- Events are appended as JSON rows. Sessions, state and events are indexed by
+  app, user and session, so a lookup does not scan other sessions.
+- Appending an event to a session object that is older than the stored session
+  (e.g. the session was updated by another instance) raises ValueError instead of
+  silently overwriting newer state.
+
+Configuration (environment variables):
+- `SESSION_DB_PATH`: The SQLite file (default `.cache/sessions.sqlite3`).
+- `SESSION_DB_POOL_SIZE`: Connections in the pool (default 4).
+"""
+
+import asyncio
+import json
+import os
+import queue
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, Session
+from google.adk.sessions.base_session_service import GetSessionConfig, ListSessionsResponse
+from google.adk.sessions.state import State
+
+DEFAULT_DB_PATH = Path(__file__).resolve().parents[1] / ".cache" / "sessions.sqlite3"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    create_time REAL NOT NULL,
+    update_time REAL NOT NULL,
+    PRIMARY KEY (app_name, user_id, session_id)
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_update_time ON sessions (app_name, user_id, update_time);
+
+CREATE TABLE IF NOT EXISTS session_state (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (app_name, user_id, session_id, key)
+);
+
+CREATE TABLE IF NOT EXISTS user_state (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (app_name, user_id, key)
+);
+
+CREATE TABLE IF NOT EXISTS app_state (
+    app_name TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (app_name, key)
+);
+
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    event_id TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_events_session ON events (app_name, user_id, session_id, timestamp);
+"""
+
+
+class ConnectionPool:
+    """A fixed number of SQLite connections to one WAL-mode database, handed out one per operation."""
+
+    def __init__(self, path: str, size: int = 4):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._idle: queue.Queue[sqlite3.Connection] = queue.Queue()
+        for i in range(size):
+            # Autocommit mode; writes open their own BEGIN IMMEDIATE transactions.
+            connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+            if i == 0:
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.executescript(SCHEMA)
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute("PRAGMA busy_timeout=30000")
+            self._idle.put(connection)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        connection = self._idle.get()
+        try:
+            yield connection
+        finally:
+            self._idle.put(connection)
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        with self.connection() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+    def close(self) -> None:
+        while not self._idle.empty():
+            self._idle.get_nowait().close()
+
+
+def _split_state(state: dict[str, Any]) -> tuple[dict[str, Any], dict[str, Any], dict[str, Any]]:
+    """Splits a state dict into app, user and session scopes, dropping `temp:` keys."""
+    app_state, user_state, session_state = {}, {}, {}
+    for key, value in state.items():
+        if key.startswith(State.APP_PREFIX):
+            app_state[key[len(State.APP_PREFIX):]] = value
+        elif key.startswith(State.USER_PREFIX):
+            user_state[key[len(State.USER_PREFIX):]] = value
+        elif not key.startswith(State.TEMP_PREFIX):
+            session_state[key] = value
+    return app_state, user_state, session_state
+
+
+class SqliteSessionService(BaseSessionService):
+    """A `BaseSessionService` that persists sessions, scoped state and events to SQLite."""
+
+    def __init__(self, db_path: Optional[str] = None, pool_size: int = 4):
+        self.db_path = db_path or str(DEFAULT_DB_PATH)
+        self._pool = ConnectionPool(self.db_path, pool_size)
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        session_id = session_id.strip() if session_id and session_id.strip() else str(uuid.uuid4())
+        return await asyncio.to_thread(self._create_session, app_name, user_id, session_id, state or {})
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        return await asyncio.to_thread(self._get_session, app_name, user_id, session_id, config)
+
+    async def list_sessions(self, *, app_name: str, user_id: Optional[str] = None) -> ListSessionsResponse:
+        return await asyncio.to_thread(self._list_sessions, app_name, user_id)
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        await asyncio.to_thread(self._delete_session, app_name, user_id, session_id)
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+        # Persist first so a stale session object is rejected before it is modified.
+        update_time = await asyncio.to_thread(self._append_event, session, event)
+        await super().append_event(session=session, event=event)
+        session.last_update_time = update_time
+        return event
+
+    def close(self) -> None:
+        self._pool.close()
+
+    # --- Blocking operations (run in worker threads) ---
+
+    def _create_session(self, app_name: str, user_id: str, session_id: str, state: dict[str, Any]) -> Session:
+        now = time.time()
+        app_state, user_state, session_state = _split_state(state)
+        with self._pool.transaction() as db:
+            exists = db.execute(
+                "SELECT 1 FROM sessions WHERE app_name = ? AND user_id = ? AND session_id = ?",
+                (app_name, user_id, session_id),
+            ).fetchone()
+            if exists:
+                raise ValueError(f"Session '{session_id}' already exists for user '{user_id}' in app '{app_name}'.")
+            db.execute(
+                "INSERT INTO sessions (app_name, user_id, session_id, create_time, update_time) VALUES (?, ?, ?, ?, ?)",
+                (app_name, user_id, session_id, now, now),
+            )
+            self._write_state(db, app_name, user_id, session_id, app_state, user_state, session_state)
+            merged = self._read_state(db, app_name, user_id, session_id)
+        return Session(id=session_id, app_name=app_name, user_id=user_id, state=merged, last_update_time=now)
+
+    def _get_session(
+        self, app_name: str, user_id: str, session_id: str, config: Optional[GetSessionConfig]
+    ) -> Optional[Session]:
+        with self._pool.connection() as db:
+            row = db.execute(
+                "SELECT update_time FROM sessions WHERE app_name = ? AND user_id = ? AND session_id = ?",
+                (app_name, user_id, session_id),
+            ).fetchone()
+            if row is None:
+                return None
+
+            where = "app_name = ? AND user_id = ? AND session_id = ?"
+            params: list[Any] = [app_name, user_id, session_id]
+            if config and config.after_timestamp:
+                where += " AND timestamp >= ?"
+                params.append(config.after_timestamp)
+            if config and config.num_recent_events:
+                # The most recent events, returned oldest first.
+                query = (
+                    f"SELECT data FROM (SELECT seq, data FROM events WHERE {where} ORDER BY seq DESC LIMIT ?) "
+                    "ORDER BY seq"
+                )
+                params.append(config.num_recent_events)
+            else:
+                query = f"SELECT data FROM events WHERE {where} ORDER BY seq"
+            events = [Event.model_validate_json(data) for (data,) in db.execute(query, params)]
+            state = self._read_state(db, app_name, user_id, session_id)
+
+        return Session(
+            id=session_id, app_name=app_name, user_id=user_id, state=state, events=events, last_update_time=row[0]
+        )
+
+    def _list_sessions(self, app_name: str, user_id: Optional[str]) -> ListSessionsResponse:
+        """Lists sessions without their events or state, most recently updated first."""
+        query = "SELECT user_id, session_id, update_time FROM sessions WHERE app_name = ?"
+        params: list[Any] = [app_name]
+        if user_id is not None:
+            query += " AND user_id = ?"
+            params.append(user_id)
+        with self._pool.connection() as db:
+            rows = db.execute(query + " ORDER BY update_time DESC", params).fetchall()
+        return ListSessionsResponse(
+            sessions=[
+                Session(id=session_id, app_name=app_name, user_id=uid, state={}, events=[], last_update_time=updated)
+                for uid, session_id, updated in rows
+            ]
+        )
+
+    def _delete_session(self, app_name: str, user_id: str, session_id: str) -> None:
+        with self._pool.transaction() as db:
+            for table in ("events", "session_state", "sessions"):
+                db.execute(
+                    f"DELETE FROM {table} WHERE app_name = ? AND user_id = ? AND session_id = ?",
+                    (app_name, user_id, session_id),
+                )
+
+    def _append_event(self, session: Session, event: Event) -> float:
+        """Writes the event and its state delta, returning the session's new update time."""
+        delta = event.actions.state_delta if event.actions and event.actions.state_delta else {}
+        app_state, user_state, session_state = _split_state(delta)
+        update_time = max(event.timestamp, session.last_update_time)
+        with self._pool.transaction() as db:
+            updated = db.execute(
+                """
+                UPDATE sessions SET update_time = ?
+                WHERE app_name = ? AND user_id = ? AND session_id = ? AND update_time <= ?
+                """,
+                (update_time, session.app_name, session.user_id, session.id, session.last_update_time),
+            ).rowcount
+            if not updated:
+                raise ValueError(
+                    f"Session '{session.id}' was modified in storage after it was loaded, or does not exist; "
+                    "reload it before appending events."
+                )
+            self._write_state(db, session.app_name, session.user_id, session.id, app_state, user_state, session_state)
+            db.execute(
+                """
+                INSERT INTO events (app_name, user_id, session_id, event_id, timestamp, data)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (session.app_name, session.user_id, session.id, event.id, event.timestamp,
+                 event.model_dump_json(exclude_none=True)),
+            )
+        return update_time
+
+    @staticmethod
+    def _write_state(
+        db: sqlite3.Connection,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        app_state: dict[str, Any],
+        user_state: dict[str, Any],
+        session_state: dict[str, Any],
+    ) -> None:
+        if app_state:
+            db.executemany(
+                "INSERT OR REPLACE INTO app_state (app_name, key, value) VALUES (?, ?, ?)",
+                [(app_name, key, json.dumps(value)) for key, value in app_state.items()],
+            )
+        if user_state:
+            db.executemany(
+                "INSERT OR REPLACE INTO user_state (app_name, user_id, key, value) VALUES (?, ?, ?, ?)",
+                [(app_name, user_id, key, json.dumps(value)) for key, value in user_state.items()],
+            )
+        if session_state:
+            db.executemany(
+                """
+                INSERT OR REPLACE INTO session_state (app_name, user_id, session_id, key, value)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                [(app_name, user_id, session_id, key, json.dumps(value)) for key, value in session_state.items()],
+            )
+
+    @staticmethod
+    def _read_state(db: sqlite3.Connection, app_name: str, user_id: str, session_id: str) -> dict[str, Any]:
+        state = {
+            key: json.loads(value)
+            for key, value in db.execute(
+                "SELECT key, value FROM session_state WHERE app_name = ? AND user_id = ? AND session_id = ?",
+                (app_name, user_id, session_id),
+            )
+        }
+        for key, value in db.execute("SELECT key, value FROM app_state WHERE app_name = ?", (app_name,)):
+            state[State.APP_PREFIX + key] = json.loads(value)
+        for key, value in db.execute(
+            "SELECT key, value FROM user_state WHERE app_name = ? AND user_id = ?", (app_name, user_id)
+        ):
+            state[State.USER_PREFIX + key] = json.loads(value)
+        return state
+
+
+def get_session_service() -> SqliteSessionService:
+    """Creates a SqliteSessionService configured from SESSION_DB_PATH and SESSION_DB_POOL_SIZE."""
+    return SqliteSessionService(
+        db_path=os.getenv("SESSION_DB_PATH") or str(DEFAULT_DB_PATH),
+        pool_size=int(os.getenv("SESSION_DB_POOL_SIZE", "4")),
+    )
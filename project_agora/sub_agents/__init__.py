@@ -1,5 +1,7 @@
 from .code_generator.agent import code_generator_agent
+from .context_retrieval.agent import context_retrieval_agent
 from .db_retrieval.agent import db_retrieval_agent
+from .intent_classifier.agent import intent_classifier_agent
 from .knowledge_retrieval.agent import knowledge_retrieval_agent
 from .problem_solver.agent import problem_solver_agent
 from .ticket_analysis.agent import ticket_analysis_agent
@@ -3,12 +3,19 @@
 """Defines the Code Generator Agent, responsible for creating code."""
 
 from google.adk.agents import LlmAgent
-from .prompts import CODE_GENERATOR_PROMPT
+from ...callbacks import route_model_and_cache_prompt
+from ...model_routing import routed_model
+from ...prompt_cache import FilePrompt, register_prompt_prefix
+from .prompts import STYLE_GUIDE_PATH, build_code_generator_prompt
+
+# The instruction inlines the whole style guide; it is rebuilt only when the guide changes
+# and sent through a context cache instead of in full on every call.
+register_prompt_prefix("code_generator_agent")
 
 # The agent instantiation using the imported prompt
 code_generator_agent = LlmAgent(
     name="code_generator_agent",
-    model="gemini-2.5-pro",
-    # Pass the pre-formatted, static string to the agent constructor.
-    instruction=CODE_GENERATOR_PROMPT,
+    model=routed_model("code_generator_agent"),
+    before_model_callback=route_model_and_cache_prompt,
+    instruction=FilePrompt(build_code_generator_prompt, [STYLE_GUIDE_PATH]),
 )
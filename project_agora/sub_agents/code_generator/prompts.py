@@ -1,11 +1,12 @@
 import os
 
+STYLE_GUIDE_PATH = os.path.join(os.path.dirname(__file__), "style_guide.md")
+
 # Helper function to load the style guide from the local file
 def _load_style_guide():
     """Loads the ADK style guide from a local markdown file."""
-    style_guide_path = os.path.join(os.path.dirname(__file__), "style_guide.md")
     try:
-        with open(style_guide_path, "r", encoding="utf-8") as f:
+        with open(STYLE_GUIDE_PATH, "r", encoding="utf-8") as f:
             return f.read()
     except FileNotFoundError:
         print("ERROR: project_agora/sub_agents/code_generator/style_guide.md not found.")
@@ -148,6 +149,10 @@ After all file blocks, you MUST include the "Next Steps" and "Disclaimer" sectio
 **REMEMBER: MODE 1 = Architect and output a JSON plan only. MODE 2 = Build the full code from an approved plan.**
 """
 
+def build_code_generator_prompt() -> str:
+    """Builds the prompt from the current style guide, so edits are picked up without a restart."""
+    return f"{PROMPT_HEADER}{_load_style_guide()}{PROMPT_FOOTER}"
+
 # Construct the final prompt by combining the parts.
 # Now, f-string formatting is only applied where needed.
 CODE_GENERATOR_PROMPT = f"{PROMPT_HEADER}{ADK_STYLE_GUIDE}{PROMPT_FOOTER}" 
\ No newline at end of file
@@ -1,11 +1,17 @@
 # FILE: project_agora/sub_agents/code_reviewer/agent.py
 
 from google.adk.agents import LlmAgent
-from .prompts import CODE_REVIEWER_PROMPT
+from ...callbacks import route_model_and_cache_prompt
+from ...model_routing import routed_model
+from ...prompt_cache import FilePrompt, register_prompt_prefix
+from .prompts import STYLE_GUIDE_PATH, build_code_reviewer_prompt
+
+# Shares the code generator's style guide, so it is cached the same way.
+register_prompt_prefix("code_reviewer_agent")
 
 code_reviewer_agent = LlmAgent(
     name="code_reviewer_agent",
-    model="gemini-2.5-pro",
-    # Pass the pre-formatted string directly.
-    instruction=CODE_REVIEWER_PROMPT,
+    model=routed_model("code_reviewer_agent"),
+    before_model_callback=route_model_and_cache_prompt,
+    instruction=FilePrompt(build_code_reviewer_prompt, [STYLE_GUIDE_PATH]),
 )
\ No newline at end of file
@@ -1,13 +1,14 @@
 import os
 
+# Construct a path relative to the current file's location
+# Note: We point back to the code_generator's style guide to avoid duplication
+STYLE_GUIDE_PATH = os.path.join(os.path.dirname(__file__), "../code_generator/style_guide.md")
+
 # Helper function to load the style guide from the local file
 def _load_style_guide():
     """Loads the ADK style guide from a local markdown file."""
-    # Construct a path relative to the current file's location
-    # Note: We point back to the code_generator's style guide to avoid duplication
-    style_guide_path = os.path.join(os.path.dirname(__file__), "../code_generator/style_guide.md")
     try:
-        with open(style_guide_path, "r", encoding="utf-8") as f:
+        with open(STYLE_GUIDE_PATH, "r", encoding="utf-8") as f:
             return f.read()
     except FileNotFoundError:
         print("ERROR: project_agora/sub_agents/code_generator/style_guide.md not found.")
@@ -83,6 +84,10 @@ PROMPT_FOOTER = """
 **REMEMBER:** Your entire response must be valid JSON that can be parsed by `json.loads()`.
 """
 
+def build_code_reviewer_prompt() -> str:
+    """Builds the prompt from the current style guide, so edits are picked up without a restart."""
+    return f"{PROMPT_HEADER}{_load_style_guide()}{PROMPT_FOOTER}"
+
 # Construct the final prompt by combining the parts.
 # Now, f-string formatting is only applied where needed.
 CODE_REVIEWER_PROMPT = f"{PROMPT_HEADER}{ADK_STYLE_GUIDE}{PROMPT_FOOTER}" 
\ No newline at end of file
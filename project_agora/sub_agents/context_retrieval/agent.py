@@ -0,0 +1,52 @@
+# FILE: project_agora/sub_agents/context_retrieval/agent.py
+
+"""Defines the Context Retrieval Agent, which runs both retrieval agents concurrently."""
+
+from typing import AsyncGenerator
+
+from google.adk.agents import BaseAgent, ParallelAgent, SequentialAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event
+from google.genai import types
+
+from ..db_retrieval.agent import db_retrieval_agent
+from ..knowledge_retrieval.agent import knowledge_retrieval_agent
+
+
+class RetrievalJoinAgent(BaseAgent):
+    """Combines the results the parallel retrieval agents wrote to state into one response."""
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        kb_results = ctx.session.state.get("kb_retrieval_results") or "No knowledge base results."
+        db_results = ctx.session.state.get("db_retrieval_results") or "No historical tickets found."
+        joined = (
+            f"## Knowledge Base Results\n\n{kb_results}\n\n"
+            f"## Historical Ticket Results\n\n{db_results}"
+        )
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=joined)]),
+        )
+
+
+# Both searches run at the same time; each writes its own output_key
+# (kb_retrieval_results / db_retrieval_results) to the shared session state.
+parallel_retrieval_agent = ParallelAgent(
+    name="parallel_retrieval_agent",
+    sub_agents=[knowledge_retrieval_agent, db_retrieval_agent],
+)
+
+# Fan out, then join, so the orchestrator makes a single call for the whole Analyzing stage.
+context_retrieval_agent = SequentialAgent(
+    name="context_retrieval_agent",
+    description=(
+        "Searches the ADK knowledge base and the database of resolved tickets concurrently "
+        "for the given request and returns both result sets."
+    ),
+    sub_agents=[
+        parallel_retrieval_agent,
+        RetrievalJoinAgent(name="retrieval_join_agent"),
+    ],
+)
@@ -2,19 +2,37 @@
 
 """Defines the Database Retrieval Agent for searching historical tickets."""
 
+import os
+
 from google.adk.agents import Agent
 
+from ...callbacks import route_model_for_state
+from ...model_routing import routed_model
 from ...tools import search_resolved_tickets_db
+from ..direct_tool_agent import DirectToolAgent
 from .prompts import DB_RETRIEVAL_PROMPT
 
+# "direct" (default) calls the search tool without a model turn; "llm" uses gemini-2.5-pro.
+RETRIEVAL_AGENT_MODE = os.getenv("RETRIEVAL_AGENT_MODE", "direct").lower()
+
 # This agent's only job is to execute the database search tool.
-db_retrieval_agent = Agent(
-    name="db_retrieval_agent",
-    model="gemini-2.5-pro",
-    instruction=DB_RETRIEVAL_PROMPT,
-    tools=[
-        search_resolved_tickets_db,
-    ],
-    # The output of the tool will be automatically saved to this state key.
-    output_key="db_retrieval_results",
-)
+if RETRIEVAL_AGENT_MODE == "llm":
+    db_retrieval_agent = Agent(
+        name="db_retrieval_agent",
+        model=routed_model("db_retrieval_agent"),
+        before_model_callback=route_model_for_state,
+        instruction=DB_RETRIEVAL_PROMPT,
+        tools=[
+            search_resolved_tickets_db,
+        ],
+        # The output of the tool will be automatically saved to this state key.
+        output_key="db_retrieval_results",
+    )
+else:
+    db_retrieval_agent = DirectToolAgent(
+        name="db_retrieval_agent",
+        description="Searches the database of resolved tickets for similar past problems.",
+        tools=[search_resolved_tickets_db],
+        output_key="db_retrieval_results",
+        empty_result="[]",
+    )
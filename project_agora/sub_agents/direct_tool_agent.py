@@ -0,0 +1,80 @@
+# FILE: project_agora/sub_agents/direct_tool_agent.py
+
+"""Defines DirectToolAgent, a model-free agent that forwards its request straight to a tool."""
+
+import inspect
+from typing import Any, AsyncGenerator, Callable, Optional
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.adk.tools import BaseTool, ToolContext
+from google.genai import types
+
+from ..logging_config import logger
+from ..tools._tool_executor import run_blocking
+
+
+def _is_empty_result(result: Any) -> bool:
+    if result is None:
+        return True
+    text = str(result).strip()
+    return not text or text == "[]" or text.startswith("No matching result found")
+
+
+class DirectToolAgent(BaseAgent):
+    """
+    Calls its tools with the verbatim request, without a model turn.
+
+    This replaces an LlmAgent whose prompt only says "call this tool with the
+    user's request". It is wrapped in an `AgentTool` the same way, so it takes a
+    single `request` argument. The request is passed to each tool as `argument`,
+    in order, until one returns a non-empty result. That result is the agent's
+    response and is written to `output_key`. Plain functions (sync or async) and
+    ADK `BaseTool`s are both accepted. Sync functions run on the bounded tool
+    thread pool so they do not block the event loop.
+    """
+
+    tools: list[Any]
+    output_key: Optional[str] = None
+    argument: str = "query"
+    empty_result: str = "No results found."
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        request = ""
+        if ctx.user_content and ctx.user_content.parts:
+            request = " ".join(part.text for part in ctx.user_content.parts if part.text).strip()
+
+        result = None
+        for tool in self.tools:
+            try:
+                result = await self._call(tool, request, ctx)
+            except Exception as e:
+                logger.warning("Direct tool call '%s' failed: %s", _tool_name(tool), e)
+                continue
+            if not _is_empty_result(result):
+                break
+
+        text = self.empty_result if _is_empty_result(result) else str(result)
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=text)]),
+            actions=EventActions(state_delta={self.output_key: text} if self.output_key else {}),
+        )
+
+    async def _call(self, tool: Any, request: str, ctx: InvocationContext) -> Any:
+        args = {self.argument: request}
+        if isinstance(tool, BaseTool):
+            return await tool.run_async(args=args, tool_context=ToolContext(ctx))
+        func: Callable = tool
+        if "tool_context" in inspect.signature(func).parameters:
+            args["tool_context"] = ToolContext(ctx)
+        if inspect.iscoroutinefunction(func):
+            return await func(**args)
+        return await run_blocking(func, **args)
+
+
+def _tool_name(tool: Any) -> str:
+    return getattr(tool, "name", None) or getattr(tool, "__name__", repr(tool))
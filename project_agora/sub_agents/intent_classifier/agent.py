@@ -0,0 +1,16 @@
+# FILE: project_agora/sub_agents/intent_classifier/agent.py
+
+"""Defines the Intent Classifier Agent, the workflow engine's only judgment call on user replies."""
+
+from google.adk.agents import LlmAgent
+from ...callbacks import route_model_for_state
+from ...model_routing import routed_model
+from .prompts import INTENT_CLASSIFIER_PROMPT
+
+intent_classifier_agent = LlmAgent(
+    name="intent_classifier_agent",
+    model=routed_model("intent_classifier_agent", default="gemini-2.5-flash"),
+    before_model_callback=route_model_for_state,
+    description="Classifies the developer's latest message into one of the given labels.",
+    instruction=INTENT_CLASSIFIER_PROMPT,
+)
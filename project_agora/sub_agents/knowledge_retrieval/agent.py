@@ -7,11 +7,23 @@ import os
 from google.adk.agents import Agent
 from google.adk.tools.retrieval import VertexAiRagRetrieval
 from vertexai.preview import rag
-from .prompts import KNOWLEDGE_RETRIEVAL_PROMPT
+from ...callbacks import check_kb_query_cache, route_model_for_state, store_kb_query_cache
+from ...model_routing import routed_model
+from ...tools import search_local_knowledge_base
+from ..direct_tool_agent import DirectToolAgent
+from .prompts import KNOWLEDGE_RETRIEVAL_PROMPT, LOCAL_KNOWLEDGE_RETRIEVAL_PROMPT
 
 # Load the corpus name from the environment variable
 RAG_CORPUS_RESOURCE_NAME = os.getenv("RAG_CORPUS_NAME")
 
+# "rag" (default): Vertex AI RAG is the primary source, the local BM25 index is the fallback.
+# "local": only the local index is used, so retrieval works fully offline.
+KB_SEARCH_MODE = os.getenv("KB_SEARCH_MODE", "rag").lower()
+
+# "direct" (default): the tools are called with the verbatim request, with no model turn.
+# "llm": a gemini-2.5-pro turn decides the tool calls, as the prompt instructs.
+RETRIEVAL_AGENT_MODE = os.getenv("RETRIEVAL_AGENT_MODE", "direct").lower()
+
 # The VertexAiRagRetrieval tool is a high-level tool that handles retrieval.
 # The `query` parameter of this tool is what will be sent to the RAG engine.
 search_knowledge_base = VertexAiRagRetrieval(
@@ -22,13 +34,33 @@ search_knowledge_base = VertexAiRagRetrieval(
     vector_distance_threshold=0.5,
 )
 
-# This agent's only job is to expose the search_knowledge_base tool.
-knowledge_retrieval_agent = Agent(
-    name="knowledge_retrieval_agent",
-    model="gemini-2.5-pro",
-    instruction=KNOWLEDGE_RETRIEVAL_PROMPT,
-    tools=[
-        search_knowledge_base,
-    ],
-    output_key="kb_retrieval_results",
-)
+if KB_SEARCH_MODE == "local":
+    _instruction = LOCAL_KNOWLEDGE_RETRIEVAL_PROMPT
+    _tools = [search_local_knowledge_base]
+else:
+    _instruction = KNOWLEDGE_RETRIEVAL_PROMPT
+    _tools = [search_knowledge_base, search_local_knowledge_base]
+
+# This agent's only job is to expose the knowledge base search tools.
+if RETRIEVAL_AGENT_MODE == "llm":
+    knowledge_retrieval_agent = Agent(
+        name="knowledge_retrieval_agent",
+        model=routed_model("knowledge_retrieval_agent"),
+        before_model_callback=route_model_for_state,
+        instruction=_instruction,
+        tools=_tools,
+        output_key="kb_retrieval_results",
+        before_agent_callback=check_kb_query_cache,
+        after_agent_callback=store_kb_query_cache,
+    )
+else:
+    # The tools are tried in order, so the local index is still the fallback for RAG.
+    knowledge_retrieval_agent = DirectToolAgent(
+        name="knowledge_retrieval_agent",
+        description="Searches the ADK knowledge base for a given developer query.",
+        tools=_tools,
+        output_key="kb_retrieval_results",
+        empty_result="No relevant documentation found in the knowledge base.",
+        before_agent_callback=check_kb_query_cache,
+        after_agent_callback=store_kb_query_cache,
+    )
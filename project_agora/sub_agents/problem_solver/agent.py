@@ -3,10 +3,13 @@
 """Defines the Problem Solver Agent, which synthesizes context to provide solutions."""
 
 from google.adk.agents import LlmAgent
+from ...callbacks import route_model_for_state
+from ...model_routing import routed_model
 from .prompts import PROBLEM_SOLVER_PROMPT
 
 problem_solver_agent = LlmAgent(
     name="problem_solver_agent",
-    model="gemini-2.5-pro",
+    model=routed_model("problem_solver_agent"),
+    before_model_callback=route_model_for_state,
     instruction=PROBLEM_SOLVER_PROMPT,
 )
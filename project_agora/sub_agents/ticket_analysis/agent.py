@@ -3,13 +3,16 @@
 """Defines the Ticket Analysis Agent for initial request categorization."""
 
 from google.adk.agents import Agent
+from ...callbacks import route_model_for_state
+from ...model_routing import routed_model
 from ...tools.file_reader_tool import read_user_file
 from .prompts import TICKET_ANALYSIS_PROMPT
 
 # This is a specialized agent that uses a targeted prompt
 ticket_analysis_agent = Agent(
     name="ticket_analysis_agent",
-    model="gemini-2.5-flash",
+    model=routed_model("ticket_analysis_agent", default="gemini-2.5-flash"),
+    before_model_callback=route_model_for_state,
     instruction=TICKET_ANALYSIS_PROMPT,
     tools=[read_user_file],
 )
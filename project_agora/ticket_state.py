@@ -0,0 +1,164 @@
+# FILE: project_agora/ticket_state.py
+
+"""
+Typed access to the ticket stored in session state.
+
+The ticket is kept in `state["ticket"]` as a JSON string so the prompt-driven
+orchestrator can read it. Parsing and re-serializing that string on every
+callback and state tool grew with the retrieval results the ticket carries. This
+module keeps the parsed `SupportTicket` of each session for the duration of an
+invocation:
+
+- `load_ticket` parses `state["ticket"]` only when it is not the exact string this
+  module last read or wrote for the same invocation. Any other writer, or a new
+  invocation, therefore causes a fresh parse.
+- `update_ticket` applies field-level updates to a copy of the ticket and writes
+  it back with `save_ticket`.
+- `save_ticket` serializes the ticket once, without indentation, when it is
+  committed to state.
+
+`update_ticket` also keeps the ticket's size independent of the retrieval
+results. Values of the fields in `OFFLOADED_FIELDS` above the blob store's
+threshold are replaced by a summary and a `blob_refs` entry, and `field_text`
+returns the full value. `resolution_history` keeps the last
+`RESOLUTION_HISTORY_LIMIT` entries (default 20) and counts the dropped ones.
+
+The returned ticket is shared within the invocation and must be treated as
+read-only; change it through `update_ticket` or `save_ticket`.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Optional, Union
+
+from .blob_store import load_text, offload_text
+from .entities.ticket import BlobReference, SupportTicket
+
+STATE_KEY = "ticket"
+# Sessions whose parsed ticket is kept; older sessions are parsed again on their next turn.
+MAX_CACHED_SESSIONS = 1024
+# Ticket fields that can grow with the retrieval results or the generated code.
+OFFLOADED_FIELDS = ("retrieved_kb_docs", "retrieved_db_tickets", "suggested_solution")
+
+
+class _CachedTicket:
+    def __init__(self, invocation_id: str, raw: str, ticket: SupportTicket):
+        self.invocation_id = invocation_id
+        self.raw = raw
+        self.ticket = ticket
+
+
+_cache: OrderedDict[str, _CachedTicket] = OrderedDict()
+_cache_lock = threading.Lock()
+_stats = {"loads": 0, "parses": 0, "serializations": 0}
+
+
+def _resolve(context: Any) -> tuple[Any, str, str]:
+    """Returns the state, session id and invocation id of a tool, callback or invocation context."""
+    invocation = getattr(context, "_invocation_context", context)
+    state = context.state if hasattr(context, "state") else invocation.session.state
+    return state, invocation.session.id, invocation.invocation_id
+
+
+def _remember(session_id: str, entry: _CachedTicket) -> None:
+    with _cache_lock:
+        _cache[session_id] = entry
+        _cache.move_to_end(session_id)
+        while len(_cache) > MAX_CACHED_SESSIONS:
+            _cache.popitem(last=False)
+
+
+def load_ticket(context: Any) -> Optional[SupportTicket]:
+    """
+    Returns the session's ticket, or None if there is none. Raises ValueError if the
+    stored ticket cannot be parsed.
+    """
+    state, session_id, invocation_id = _resolve(context)
+    raw = state.get(STATE_KEY)
+    if not raw:
+        return None
+
+    _stats["loads"] += 1
+    with _cache_lock:
+        entry = _cache.get(session_id)
+    if entry is not None and entry.invocation_id == invocation_id and entry.raw is raw:
+        return entry.ticket
+
+    ticket = SupportTicket.model_validate_json(raw)
+    _stats["parses"] += 1
+    _remember(session_id, _CachedTicket(invocation_id, raw, ticket))
+    return ticket
+
+
+def save_ticket(context: Any, ticket: SupportTicket) -> str:
+    """Serializes the ticket compactly, writes it to state and returns the JSON."""
+    state, session_id, invocation_id = _resolve(context)
+    raw = ticket.to_json()
+    _stats["serializations"] += 1
+    state[STATE_KEY] = raw
+    _remember(session_id, _CachedTicket(invocation_id, raw, ticket))
+    return raw
+
+
+def update_ticket(context: Any, note: str = "", **fields: Any) -> SupportTicket:
+    """
+    Sets the given ticket fields, appends `note` to the resolution history and commits
+    the ticket. Large values of offloaded fields are moved to the blob store. Raises
+    LookupError if the session has no ticket.
+    """
+    ticket = load_ticket(context)
+    if ticket is None:
+        raise LookupError("Ticket not found in state.")
+
+    offloaded = [name for name in OFFLOADED_FIELDS if name in fields]
+    if offloaded:
+        blob_refs = dict(ticket.blob_refs)
+        for name in offloaded:
+            blob_refs.pop(name, None)
+            if isinstance(fields[name], str):
+                fields[name], ref = offload_text(fields[name])
+                if ref is not None:
+                    blob_refs[name] = ref
+        fields["blob_refs"] = blob_refs
+
+    if note:
+        history = [*ticket.resolution_history, note]
+        limit = int(os.getenv("RESOLUTION_HISTORY_LIMIT", "20"))
+        if len(history) > limit:
+            fields["resolution_history_dropped"] = ticket.resolution_history_dropped + len(history) - limit
+            history = history[-limit:]
+        fields["resolution_history"] = history
+    # Updating a copy leaves the cached ticket intact if the caller fails before committing.
+    updated = ticket.model_copy(update=fields)
+    save_ticket(context, updated)
+    return updated
+
+
+def field_text(ticket: Union[SupportTicket, dict], name: str) -> str:
+    """Returns the full value of a ticket field, reading it from the blob store if it was offloaded."""
+    if isinstance(ticket, SupportTicket):
+        value, ref = getattr(ticket, name), ticket.blob_refs.get(name)
+    else:
+        value, ref = ticket.get(name), (ticket.get("blob_refs") or {}).get(name)
+    if ref is None:
+        return value or ""
+    if isinstance(ref, dict):
+        ref = BlobReference(**ref)
+    return load_text(ref, fallback=value or "")
+
+
+def ticket_state_stats() -> dict:
+    """Returns how many ticket loads were served without parsing, and the parse and serialization counts."""
+    loads = _stats["loads"]
+    return {
+        **_stats,
+        "cache_hits": loads - _stats["parses"],
+        "hit_rate": (loads - _stats["parses"]) / loads if loads else 0.0,
+        "cached_sessions": len(_cache),
+    }
+
+
+def reset_ticket_state_stats() -> None:
+    for key in _stats:
+        _stats[key] = 0
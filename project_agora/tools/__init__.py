@@ -1,5 +1,6 @@
 # project_agora/tools/__init__.py
 from .tools import (create_ticket, search_resolved_tickets_db,
+                    search_local_knowledge_base,
                     update_ticket_after_analysis, generate_diagram_from_mermaid,
                     format_code_reviewer_output)
 from .file_reader_tool import read_user_file
@@ -0,0 +1,253 @@
+"""
+Approximate nearest-neighbour index over ticket embeddings.
+
+A Hierarchical Navigable Small World (HNSW) graph implemented with NumPy for
+the vector math and plain Python lists for the graph. Vectors are stored
+unit-normalized and compared by inner product, so `1 - similarity` equals the
+cosine distance used by the other ticket search backends.
+
+- `ef` (per query, default `ef_search`) trades recall for latency: a wider
+  beam visits more of the graph and finds more of the true neighbours.
+- New vectors can be inserted at any time with `add`; existing ids never change.
+- `save`/`load` persist the whole graph to a single `.npz` file.
+"""
+
+import heapq
+import json
+import math
+import os
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from .exceptions import VectorStoreError
+
+INDEX_FORMAT_VERSION = 1
+
+
+class HNSWIndex:
+    """An incrementally built HNSW graph over unit-normalized float32 vectors."""
+
+    def __init__(
+        self,
+        dim: int,
+        M: int = 16,
+        ef_construction: int = 100,
+        ef_search: int = 50,
+        seed: int = 42,
+    ):
+        self.dim = dim
+        self.M = M
+        self.max_links_0 = 2 * M
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.seed = seed
+
+        self._level_mult = 1.0 / math.log(M)
+        self._rng = np.random.default_rng(seed)
+        self._vectors = np.zeros((0, dim), dtype=np.float32)
+        self._count = 0
+        # _links[node][level] is the list of neighbour ids of `node` on `level`.
+        self._links: list[list[list[int]]] = []
+        self._entry_point: Optional[int] = None
+        self._max_level = -1
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """The stored (normalized) vectors, indexed by id."""
+        return self._vectors[: self._count]
+
+    def add(self, vectors) -> list[int]:
+        """Inserts vectors into the graph and returns their ids (consecutive, starting at len(self))."""
+        batch = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        if batch.shape[1] != self.dim:
+            raise VectorStoreError(f"Expected vectors of dimension {self.dim}, got {batch.shape[1]}.")
+
+        norms = np.linalg.norm(batch, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        batch = batch / norms
+
+        self._reserve(self._count + len(batch))
+        ids = []
+        for vector in batch:
+            ids.append(self._insert(vector))
+        return ids
+
+    def search(self, query, k: int = 3, ef: Optional[int] = None) -> tuple[np.ndarray, np.ndarray]:
+        """Returns (ids, similarities) of the approximate `k` nearest vectors, best first."""
+        if self._entry_point is None:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+        q = np.asarray(query, dtype=np.float32)
+        norm = np.linalg.norm(q)
+        if norm > 0:
+            q = q / norm
+
+        ef = max(ef or self.ef_search, k)
+        entry = [self._entry_point]
+        for level in range(self._max_level, 0, -1):
+            entry = [self._search_layer(q, entry, 1, level)[0][1]]
+        found = self._search_layer(q, entry, ef, 0)[:k]
+
+        ids = np.array([node for _, node in found], dtype=np.int64)
+        sims = np.array([sim for sim, _ in found], dtype=np.float32)
+        return ids, sims
+
+    # --- Persistence ---
+
+    def save(self, path: str) -> None:
+        """Writes the index to a single `.npz` file (atomically replaced)."""
+        levels = np.array([len(links) - 1 for links in self._links], dtype=np.int32)
+        flat_links, offsets = [], [0]
+        for links in self._links:
+            for neighbours in links:
+                flat_links.extend(neighbours)
+                offsets.append(len(flat_links))
+
+        meta = {
+            "version": INDEX_FORMAT_VERSION,
+            "dim": self.dim,
+            "M": self.M,
+            "ef_construction": self.ef_construction,
+            "ef_search": self.ef_search,
+            "seed": self.seed,
+            "entry_point": self._entry_point,
+            "max_level": self._max_level,
+        }
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                meta=np.array(json.dumps(meta)),
+                vectors=self.vectors,
+                levels=levels,
+                links=np.array(flat_links, dtype=np.int32),
+                offsets=np.array(offsets, dtype=np.int64),
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "HNSWIndex":
+        """Reads an index written by `save`."""
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta.get("version") != INDEX_FORMAT_VERSION:
+                raise VectorStoreError(f"Unsupported ANN index version {meta.get('version')} at '{path}'.")
+
+            index = cls(meta["dim"], meta["M"], meta["ef_construction"], meta["ef_search"], meta["seed"])
+            vectors = data["vectors"]
+            levels, links, offsets = data["levels"], data["links"].tolist(), data["offsets"]
+
+        index._vectors = np.array(vectors, dtype=np.float32)
+        index._count = len(vectors)
+        slot = 0
+        for level in levels:
+            node_links = []
+            for _ in range(int(level) + 1):
+                node_links.append(links[offsets[slot] : offsets[slot + 1]])
+                slot += 1
+            index._links.append(node_links)
+        index._entry_point = meta["entry_point"]
+        index._max_level = meta["max_level"]
+        return index
+
+    # --- Graph construction ---
+
+    def _reserve(self, size: int) -> None:
+        if size <= len(self._vectors):
+            return
+        capacity = max(size, 2 * len(self._vectors), 64)
+        grown = np.zeros((capacity, self.dim), dtype=np.float32)
+        grown[: self._count] = self._vectors[: self._count]
+        self._vectors = grown
+
+    def _insert(self, vector: np.ndarray) -> int:
+        node = self._count
+        self._vectors[node] = vector
+        self._count += 1
+
+        level = int(-math.log(1.0 - self._rng.random()) * self._level_mult)
+        self._links.append([[] for _ in range(level + 1)])
+
+        if self._entry_point is None:
+            self._entry_point, self._max_level = node, level
+            return node
+
+        entry = [self._entry_point]
+        for layer in range(self._max_level, level, -1):
+            entry = [self._search_layer(vector, entry, 1, layer)[0][1]]
+
+        for layer in range(min(level, self._max_level), -1, -1):
+            candidates = self._search_layer(vector, entry, self.ef_construction, layer)
+            max_links = self.max_links_0 if layer == 0 else self.M
+            neighbours = self._select_neighbours(candidates, self.M)
+            self._links[node][layer] = neighbours
+
+            for neighbour in neighbours:
+                links = self._links[neighbour][layer]
+                links.append(node)
+                if len(links) > max_links:
+                    self._links[neighbour][layer] = self._shrink(neighbour, links, max_links)
+            entry = [n for _, n in candidates]
+
+        if level > self._max_level:
+            self._entry_point, self._max_level = node, level
+        return node
+
+    def _search_layer(self, q: np.ndarray, entry: list[int], ef: int, level: int) -> list[tuple[float, int]]:
+        """Beam search on one layer; returns up to `ef` (similarity, id) pairs, best first."""
+        visited = set(entry)
+        entry_sims = self._vectors[entry] @ q
+        candidates = [(-float(s), n) for s, n in zip(entry_sims, entry)]
+        results = [(float(s), n) for s, n in zip(entry_sims, entry)]
+        heapq.heapify(candidates)
+        heapq.heapify(results)
+        while len(results) > ef:
+            heapq.heappop(results)
+
+        while candidates:
+            neg_sim, node = heapq.heappop(candidates)
+            if -neg_sim < results[0][0] and len(results) >= ef:
+                break
+
+            fresh = [n for n in self._links[node][level] if n not in visited]
+            if not fresh:
+                continue
+            visited.update(fresh)
+
+            for sim, neighbour in zip((self._vectors[fresh] @ q).tolist(), fresh):
+                if len(results) < ef or sim > results[0][0]:
+                    heapq.heappush(candidates, (-sim, neighbour))
+                    heapq.heappush(results, (sim, neighbour))
+                    if len(results) > ef:
+                        heapq.heappop(results)
+
+        return sorted(results, reverse=True)
+
+    def _select_neighbours(self, candidates: list[tuple[float, int]], m: int) -> list[int]:
+        """
+        HNSW neighbour-selection heuristic: keep a candidate only if it is closer to
+        the new node than to every neighbour already kept, which preserves links
+        towards distinct regions of the graph. Remaining slots are filled with the
+        closest pruned candidates.
+        """
+        selected, pruned = [], []
+        for sim, candidate in candidates:
+            if len(selected) >= m:
+                break
+            if selected and float(np.max(self._vectors[selected] @ self._vectors[candidate])) > sim:
+                pruned.append(candidate)
+            else:
+                selected.append(candidate)
+        return selected + pruned[: m - len(selected)]
+
+    def _shrink(self, node: int, links: list[int], max_links: int) -> list[int]:
+        sims = (self._vectors[links] @ self._vectors[node]).tolist()
+        candidates = sorted(zip(sims, links), reverse=True)
+        return self._select_neighbours(candidates, max_links)
@@ -0,0 +1,161 @@
+"""
+Process-wide BigQuery client pool and query-result cache.
+
+Creating a `bigquery.Client` repeats credential discovery and HTTP session
+setup, so clients are created once per (project, location) and shared by every
+thread and session in the process.
+
+Vector search results are cached per table, keyed on the query embedding and
+`top_k`. Each entry is tagged with the table's last-modified time, so a reload
+of `resolved_tickets` (e.g. by `scripts/setup_bigquery.py`) invalidates the
+cache even when it happens in another process. The table metadata is
+re-checked at most once every `validate_interval_seconds`.
+"""
+
+import hashlib
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Optional
+
+from google.cloud import bigquery
+
+_clients: dict[tuple[str, Optional[str]], bigquery.Client] = {}
+_clients_lock = threading.Lock()
+_pool_stats = {"clients_created": 0, "client_reuses": 0, "client_setup_seconds": 0.0}
+
+
+def get_bigquery_client(project_id: str, location: Optional[str] = None) -> bigquery.Client:
+    """Returns the shared BigQuery client for (project, location), creating it on first use."""
+    key = (project_id, location)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            start = time.perf_counter()
+            client = bigquery.Client(project=project_id, location=location)
+            _pool_stats["client_setup_seconds"] += time.perf_counter() - start
+            _pool_stats["clients_created"] += 1
+            _clients[key] = client
+        else:
+            _pool_stats["client_reuses"] += 1
+        return client
+
+
+def bigquery_pool_stats() -> dict:
+    """Returns how many clients were created and reused, and the setup time the reuses saved."""
+    with _clients_lock:
+        created = _pool_stats["clients_created"]
+        avg_setup = _pool_stats["client_setup_seconds"] / created if created else 0.0
+        return {
+            **_pool_stats,
+            "pooled_clients": len(_clients),
+            "setup_seconds_saved": avg_setup * _pool_stats["client_reuses"],
+        }
+
+
+def embedding_cache_key(query_embedding: list[float], top_k: int) -> str:
+    """Hashes a query embedding (as float32) and `top_k` into a compact cache key."""
+    digest = hashlib.sha256(array("f", query_embedding).tobytes()).hexdigest()
+    return f"{digest}:{top_k}"
+
+
+class QueryResultCache:
+    """A bounded LRU of search results, invalidated whenever the source table is modified."""
+
+    def __init__(self, max_entries: int = 256, validate_interval_seconds: float = 30.0):
+        self.max_entries = max_entries
+        self.validate_interval_seconds = validate_interval_seconds
+        self.hits = 0
+        self.misses = 0
+        self.seconds_saved = 0.0
+
+        self._entries: OrderedDict[tuple[str, str], tuple[str, list[dict], float]] = OrderedDict()
+        self._versions: dict[str, tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def table_version(self, client: bigquery.Client, table_id: str) -> Optional[str]:
+        """Returns the table's last-modified time, refreshing it at most once per interval."""
+        now = time.monotonic()
+        with self._lock:
+            cached = self._versions.get(table_id)
+            if cached and now - cached[1] < self.validate_interval_seconds:
+                return cached[0]
+
+        try:
+            modified = client.get_table(table_id).modified
+        except Exception as e:
+            print(f"WARNING: Could not read metadata for '{table_id}'; bypassing result cache: {e}")
+            return None
+
+        version = modified.isoformat() if modified else "unknown"
+        with self._lock:
+            self._versions[table_id] = (version, now)
+        return version
+
+    def get(self, table_id: str, key: str, version: str) -> Optional[tuple[list[dict], float]]:
+        """Returns (results, original query seconds) for a fresh entry, or None."""
+        with self._lock:
+            entry = self._entries.get((table_id, key))
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((table_id, key))
+            self.hits += 1
+            return entry[1], entry[2]
+
+    def put(self, table_id: str, key: str, version: str, results: list[dict], query_seconds: float) -> None:
+        with self._lock:
+            self._entries[(table_id, key)] = (version, results, query_seconds)
+            self._entries.move_to_end((table_id, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def record_saving(self, seconds: float) -> None:
+        with self._lock:
+            self.seconds_saved += max(seconds, 0.0)
+
+    def invalidate(self, table_id: Optional[str] = None) -> None:
+        """Drops cached results for one table, or for every table when `table_id` is None."""
+        with self._lock:
+            if table_id is None:
+                self._entries.clear()
+                self._versions.clear()
+                return
+            for key in [k for k in self._entries if k[0] == table_id]:
+                del self._entries[key]
+            self._versions.pop(table_id, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            calls = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / calls if calls else 0.0,
+                "entries": len(self._entries),
+                "seconds_saved": self.seconds_saved,
+                "avg_seconds_saved_per_call": self.seconds_saved / calls if calls else 0.0,
+            }
+
+
+_result_cache: Optional[QueryResultCache] = None
+_result_cache_lock = threading.Lock()
+
+
+def get_query_result_cache(
+    max_entries: int = 256, validate_interval_seconds: float = 30.0
+) -> QueryResultCache:
+    """Returns the process-wide query-result cache."""
+    global _result_cache
+    if _result_cache is None:
+        with _result_cache_lock:
+            if _result_cache is None:
+                _result_cache = QueryResultCache(max_entries, validate_interval_seconds)
+    return _result_cache
+
+
+def invalidate_query_result_cache(table_id: Optional[str] = None) -> None:
+    """Invalidates cached search results, e.g. after the table has been reloaded."""
+    if _result_cache is not None:
+        _result_cache.invalidate(table_id)
@@ -0,0 +1,447 @@
+"""
+Streaming chunker for the knowledge base, plus a memory-mapped chunk store.
+
+Chunking mirrors the `rag.ChunkingConfig` used by `scripts/setup_rag.py`
+(`chunk_size=1024`, `chunk_overlap=200`, both in tokens), so local chunks line up
+with what the RAG corpus holds. Tokens are estimated as words and punctuation marks.
+
+Files are read line by line and grouped into blocks: paragraphs, headings and
+fenced code blocks. Chunks are packed from whole blocks and:
+
+- start at a heading whenever the current chunk is at least half full, so chunks
+  follow the document's sections;
+- never cut through a fenced code block unless the block alone exceeds
+  `chunk_size`, in which case each piece is re-wrapped in the original fence;
+- carry up to `chunk_overlap` tokens of trailing blocks into the next chunk,
+  except after a section break.
+
+Every chunk gets a stable ID derived from its source file and text, so an
+unchanged chunk keeps its ID across runs.
+
+A chunk store is a directory holding:
+
+- `chunks.bin`: the UTF-8 chunk texts back to back, memory-mapped on load;
+- `offsets.npy`: (N + 1) byte offsets into `chunks.bin`;
+- `chunks.jsonl`: one metadata object per chunk (`id`, `source`, `heading`, `tokens`);
+- `manifest.json`: chunking parameters and a content hash per source file.
+  It is written last, so a reader never sees a half-written store as valid.
+"""
+
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+
+from ._tokens import TOKEN_RE, count_tokens
+from .exceptions import VectorStoreError
+
+CHUNK_SIZE = 1024
+CHUNK_OVERLAP = 200
+KNOWLEDGE_BASE_SUFFIXES = (".md", ".txt")
+
+FORMAT_NAME = "agora-chunk-store"
+FORMAT_VERSION = 1
+
+DEFAULT_CHUNK_STORE_PATH = Path(__file__).resolve().parents[2] / ".cache" / "knowledge_base_chunks"
+
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.*?)\s*$")
+_ANCHOR_RE = re.compile(r"\[¶\]\(#[^)]*\)")
+
+
+def chunk_id(source: str, text: str) -> str:
+    """Stable ID of a chunk: a hash of its source file name and text."""
+    return hashlib.blake2b(f"{source}\0{text}".encode("utf-8"), digest_size=8).hexdigest()
+
+
+def file_content_hash(path) -> str:
+    """SHA-256 of a file's bytes, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# Content hashes by file path, with the (size, mtime, ctime) they were computed for.
+_content_hashes: dict[str, tuple[tuple[int, int, int], str]] = {}
+
+
+def knowledge_base_hashes(kb_dir) -> dict[str, str]:
+    """
+    The SHA-256 of every knowledge base file, by file name. A file is only re-read
+    when its size, mtime or ctime changed; copies that keep the original mtime
+    still get a new ctime.
+    """
+    hashes = {}
+    for path in iter_knowledge_base_files(kb_dir):
+        st = path.stat()
+        signature = (st.st_size, st.st_mtime_ns, st.st_ctime_ns)
+        cached = _content_hashes.get(str(path))
+        if cached is None or cached[0] != signature:
+            cached = _content_hashes[str(path)] = (signature, file_content_hash(path))
+        hashes[path.name] = cached[1]
+    return hashes
+
+
+def chunk_store_fingerprint(manifest: dict) -> str:
+    """Identifies the chunks of a store: its chunking parameters and the content hash of every source file."""
+    key = {
+        "chunk_size": manifest.get("chunk_size"),
+        "chunk_overlap": manifest.get("chunk_overlap"),
+        "files": {name: entry["sha256"] for name, entry in manifest.get("files", {}).items()},
+    }
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def iter_knowledge_base_files(kb_dir) -> list[Path]:
+    """The `.md` and `.txt` files of the knowledge base, in a stable order."""
+    return sorted(
+        p for p in Path(kb_dir).glob("*") if p.is_file() and p.suffix in KNOWLEDGE_BASE_SUFFIXES
+    )
+
+
+# --- Chunking ---
+
+
+class _Block:
+    __slots__ = ("lines", "tokens", "heading", "is_heading", "fence")
+
+    def __init__(self, heading: str, is_heading: bool = False, fence: Optional[str] = None):
+        self.lines: list[str] = []
+        self.tokens = 0
+        self.heading = heading
+        self.is_heading = is_heading
+        self.fence = fence
+
+    def add(self, line: str) -> None:
+        self.lines.append(line)
+        self.tokens += count_tokens(line)
+
+
+def _iter_blocks(lines: Iterable[str], markdown: bool = True) -> Iterator[_Block]:
+    """Groups lines into paragraphs, headings and fenced code blocks, tracking the heading path."""
+    path: list[tuple[int, str]] = []
+    block: Optional[_Block] = None
+
+    for raw in lines:
+        line = raw.rstrip("\n")
+        stripped = line.lstrip()
+
+        if block is not None and block.fence is not None:
+            block.add(line)
+            if stripped.startswith(block.fence):
+                yield block
+                block = None
+            continue
+
+        heading = _HEADING_RE.match(line) if markdown else None
+        if stripped.startswith(("```", "~~~")) or heading or not stripped:
+            if block is not None:
+                yield block
+                block = None
+
+        if not stripped:
+            continue
+        if heading:
+            level = len(heading.group(1))
+            title = _ANCHOR_RE.sub("", heading.group(2)).strip()
+            path = [(lvl, t) for lvl, t in path if lvl < level] + [(level, title)]
+            block = _Block(" > ".join(t for _, t in path), is_heading=True)
+            block.add(line)
+            yield block
+            block = None
+            continue
+
+        if block is None:
+            fence = stripped[:3] if stripped.startswith(("```", "~~~")) else None
+            block = _Block(" > ".join(t for _, t in path), fence=fence)
+            block.add(line)
+            continue
+        block.add(line)
+
+    if block is not None:
+        yield block
+
+
+def _split_block(block: _Block, chunk_size: int) -> Iterator[_Block]:
+    """Splits a block larger than `chunk_size` by lines, re-wrapping code pieces in their fence."""
+    lines = block.lines
+    opening, closing = None, None
+    if block.fence is not None:
+        opening = lines[0]
+        closing = lines[-1] if len(lines) > 1 and lines[-1].lstrip().startswith(block.fence) else None
+        lines = lines[1:-1] if closing is not None else lines[1:]
+    wrap_tokens = count_tokens(opening or "") + count_tokens(closing or block.fence or "")
+
+    def _new_piece() -> _Block:
+        piece = _Block(block.heading)
+        if opening is not None:
+            piece.add(opening)
+        return piece
+
+    def _finish(piece: _Block) -> _Block:
+        if opening is not None:
+            piece.add(closing or block.fence)
+        return piece
+
+    piece = _new_piece()
+    for line in lines:
+        for part in _split_long_line(line, chunk_size - wrap_tokens):
+            tokens = count_tokens(part)
+            if len(piece.lines) > (1 if opening is not None else 0) and piece.tokens + tokens + wrap_tokens > chunk_size:
+                yield _finish(piece)
+                piece = _new_piece()
+            piece.add(part)
+    yield _finish(piece)
+
+
+def _split_long_line(line: str, max_tokens: int) -> Iterator[str]:
+    if count_tokens(line) <= max_tokens:
+        yield line
+        return
+    tokens = list(TOKEN_RE.finditer(line))
+    start = 0
+    for i in range(max_tokens, len(tokens), max_tokens):
+        end = tokens[i].start()
+        yield line[start:end]
+        start = end
+    yield line[start:]
+
+
+def iter_chunks(
+    lines: Iterable[str],
+    source: str,
+    chunk_size: int = CHUNK_SIZE,
+    chunk_overlap: int = CHUNK_OVERLAP,
+    markdown: bool = True,
+) -> Iterator[dict]:
+    """
+    Chunks one document, given as an iterable of lines. Headings are only
+    recognized when `markdown` is set: in the plain-text code dumps, a leading
+    `#` starts a comment.
+
+    Yields dicts with `id`, `source`, `heading` (the heading path at the start of
+    the chunk), `tokens` and `text`.
+    """
+    if chunk_overlap >= chunk_size:
+        raise VectorStoreError("chunk_overlap must be smaller than chunk_size.")
+
+    current: list[_Block] = []
+    size = 0
+
+    def _emit(blocks: list[_Block]) -> dict:
+        text = "\n\n".join("\n".join(b.lines) for b in blocks)
+        return {
+            "id": chunk_id(source, text),
+            "source": source,
+            "heading": blocks[0].heading,
+            "tokens": sum(b.tokens for b in blocks),
+            "text": text,
+        }
+
+    def _overlap(blocks: list[_Block]) -> list[_Block]:
+        kept, total = [], 0
+        for b in reversed(blocks[1:]):
+            if total + b.tokens > chunk_overlap:
+                break
+            kept.insert(0, b)
+            total += b.tokens
+        return kept
+
+    for block in _iter_blocks(lines, markdown):
+        pieces = _split_block(block, chunk_size) if block.tokens > chunk_size else [block]
+        for piece in pieces:
+            if current and block.is_heading and size >= chunk_size // 2:
+                yield _emit(current)
+                current, size = [], 0
+            elif current and size + piece.tokens > chunk_size:
+                yield _emit(current)
+                current = _overlap(current)
+                size = sum(b.tokens for b in current)
+                if size + piece.tokens > chunk_size:
+                    current, size = [], 0
+            current.append(piece)
+            size += piece.tokens
+
+    if current:
+        yield _emit(current)
+
+
+def iter_file_chunks(path, chunk_size: int = CHUNK_SIZE, chunk_overlap: int = CHUNK_OVERLAP) -> Iterator[dict]:
+    """Streams the chunks of one file without reading it into memory at once."""
+    path = Path(path)
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        yield from iter_chunks(f, path.name, chunk_size, chunk_overlap, markdown=path.suffix == ".md")
+
+
+def iter_corpus_chunks(kb_dir, chunk_size: int = CHUNK_SIZE, chunk_overlap: int = CHUNK_OVERLAP) -> Iterator[dict]:
+    """Streams the chunks of every knowledge base file, file by file."""
+    for path in iter_knowledge_base_files(kb_dir):
+        yield from iter_file_chunks(path, chunk_size, chunk_overlap)
+
+
+# --- Chunk store ---
+
+
+class ChunkStore:
+    """Read access to a chunk store; texts are sliced out of a memory-mapped file on demand."""
+
+    def __init__(self, path, chunks: list[dict], offsets: np.ndarray, data: np.ndarray, manifest: dict):
+        self.path = Path(path)
+        self.chunks = chunks
+        self.offsets = offsets
+        self.data = data
+        self.manifest = manifest
+        self.positions = {c["id"]: i for i, c in enumerate(chunks)}
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+    def __contains__(self, chunk_id: str) -> bool:
+        return chunk_id in self.positions
+
+    @property
+    def files(self) -> dict:
+        """Content hash and chunk count of every source file, keyed by file name."""
+        return self.manifest.get("files", {})
+
+    def text(self, i: int) -> str:
+        return self.data[self.offsets[i] : self.offsets[i + 1]].tobytes().decode("utf-8")
+
+    def get(self, chunk_id: str) -> Optional[dict]:
+        i = self.positions.get(chunk_id)
+        if i is None:
+            return None
+        return {**self.chunks[i], "text": self.text(i)}
+
+    def __iter__(self) -> Iterator[dict]:
+        for i, chunk in enumerate(self.chunks):
+            yield {**chunk, "text": self.text(i)}
+
+
+def write_chunk_store(
+    path,
+    kb_dir,
+    chunk_size: int = CHUNK_SIZE,
+    chunk_overlap: int = CHUNK_OVERLAP,
+    previous: Optional[ChunkStore] = None,
+) -> ChunkStore:
+    """
+    Chunks every knowledge base file into a new store at `path`, streaming texts to disk.
+
+    With a `previous` store built with the same parameters, files whose content
+    hash is unchanged are copied from it instead of being re-chunked.
+    """
+    out_dir = Path(path)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    reusable = (
+        previous is not None
+        and previous.manifest.get("chunk_size") == chunk_size
+        and previous.manifest.get("chunk_overlap") == chunk_overlap
+    )
+    by_source: dict[str, list[int]] = {}
+    if reusable:
+        for i, chunk in enumerate(previous.chunks):
+            by_source.setdefault(chunk["source"], []).append(i)
+
+    files, offsets, position, reused = {}, [0], 0, 0
+    data_tmp, meta_tmp = out_dir / "chunks.bin.tmp", out_dir / "chunks.jsonl.tmp"
+    with open(data_tmp, "wb") as data_file, open(meta_tmp, "w", encoding="utf-8") as meta_file:
+        for filepath in iter_knowledge_base_files(kb_dir):
+            content_hash = file_content_hash(filepath)
+            if reusable and previous.files.get(filepath.name, {}).get("sha256") == content_hash:
+                chunks = (
+                    {**previous.chunks[i], "text": previous.text(i)} for i in by_source.get(filepath.name, [])
+                )
+                reused += 1
+            else:
+                chunks = iter_file_chunks(filepath, chunk_size, chunk_overlap)
+
+            count = 0
+            for chunk in chunks:
+                encoded = chunk.pop("text").encode("utf-8")
+                data_file.write(encoded)
+                position += len(encoded)
+                offsets.append(position)
+                meta_file.write(json.dumps(chunk) + "\n")
+                count += 1
+            files[filepath.name] = {"sha256": content_hash, "chunks": count}
+
+    # The previous store may be memory-mapping the files that are about to be replaced.
+    if previous is not None:
+        previous.data = None
+    os.replace(data_tmp, out_dir / "chunks.bin")
+    os.replace(meta_tmp, out_dir / "chunks.jsonl")
+    offsets_tmp = out_dir / "offsets.npy.tmp"
+    with open(offsets_tmp, "wb") as f:
+        np.save(f, np.array(offsets, dtype=np.int64))
+    os.replace(offsets_tmp, out_dir / "offsets.npy")
+
+    manifest = {
+        "format": FORMAT_NAME,
+        "version": FORMAT_VERSION,
+        "chunk_size": chunk_size,
+        "chunk_overlap": chunk_overlap,
+        "count": len(offsets) - 1,
+        "files": files,
+    }
+    manifest_tmp = out_dir / "manifest.json.tmp"
+    with open(manifest_tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(manifest_tmp, out_dir / "manifest.json")
+
+    print(
+        f"INFO: Wrote {manifest['count']} chunks from {len(files)} files to '{out_dir}' "
+        f"({reused} unchanged files reused)."
+    )
+    return load_chunk_store(out_dir)
+
+
+def load_chunk_store(path) -> ChunkStore:
+    """Opens a chunk store written by `write_chunk_store`, memory-mapping the chunk texts."""
+    store_dir = Path(path)
+    manifest_path = store_dir / "manifest.json"
+    if not manifest_path.exists():
+        raise VectorStoreError(f"No chunk store manifest found at '{manifest_path}'.")
+
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != FORMAT_NAME or manifest.get("version") != FORMAT_VERSION:
+        raise VectorStoreError(f"Unsupported chunk store '{manifest.get('format')}' version {manifest.get('version')}.")
+
+    offsets = np.load(store_dir / "offsets.npy")
+    with open(store_dir / "chunks.jsonl", "r", encoding="utf-8") as f:
+        chunks = [json.loads(line) for line in f if line.strip()]
+    if len(chunks) != manifest["count"] or len(offsets) != manifest["count"] + 1:
+        raise VectorStoreError(f"Chunk store at '{store_dir}' does not match its manifest.")
+
+    data_path = store_dir / "chunks.bin"
+    if os.path.getsize(data_path):
+        data = np.memmap(data_path, dtype=np.uint8, mode="r")
+    else:
+        data = np.zeros(0, dtype=np.uint8)
+    return ChunkStore(store_dir, chunks, offsets, data, manifest)
+
+
+def chunk_store_is_current(store: ChunkStore, kb_dir, chunk_size: int = CHUNK_SIZE, chunk_overlap: int = CHUNK_OVERLAP) -> bool:
+    """Whether `store` was built with these parameters from exactly the current knowledge base files."""
+    if store.manifest.get("chunk_size") != chunk_size or store.manifest.get("chunk_overlap") != chunk_overlap:
+        return False
+    return knowledge_base_hashes(kb_dir) == {name: entry["sha256"] for name, entry in store.files.items()}
+
+
+def load_or_build_chunk_store(path, kb_dir, chunk_size: int = CHUNK_SIZE, chunk_overlap: int = CHUNK_OVERLAP) -> ChunkStore:
+    """Opens the store at `path`, re-chunking only changed files when the knowledge base has changed."""
+    previous = None
+    try:
+        previous = load_chunk_store(path)
+        if chunk_store_is_current(previous, kb_dir, chunk_size, chunk_overlap):
+            return previous
+    except (OSError, ValueError, VectorStoreError) as e:
+        if Path(path, "manifest.json").exists():
+            print(f"WARN: Could not open chunk store at '{path}', rebuilding: {e}")
+    return write_chunk_store(path, kb_dir, chunk_size, chunk_overlap, previous=previous)
@@ -1,76 +1,80 @@
-"""Data retrieval tools for Project Agora."""
+"""
+Data retrieval tools for Project Agora.
 
-import os
+The tools are coroutines. Their embedding, BigQuery and index calls are
+sync-only, so each search runs on the bounded tool thread pool
+(`_tool_executor.py`) instead of blocking the event loop.
+"""
 
-from google.cloud import bigquery
-from vertexai.language_models import TextEmbeddingModel
-
-from .exceptions import ConfigurationError, BigQueryError, EmbeddingError
+from ._embedding_cache import DEFAULT_EMBEDDING_MODEL, embed_texts
+from ._lexical_search import get_knowledge_base_index, hybrid_search_enabled
+from ._tool_executor import run_blocking
+from ._vector_store import get_ticket_search_backend
+from .exceptions import EmbeddingError
 
 
 def _get_embedding_for_query(
-    text: str, model_name: str = "text-embedding-004"
+    text: str, model_name: str = DEFAULT_EMBEDDING_MODEL
 ) -> list[float]:
-    """Helper function to generate an embedding for the user's query."""
+    """Helper function to generate an embedding for the user's query, served from the cache when possible."""
     try:
-        model = TextEmbeddingModel.from_pretrained(model_name)
-        embeddings = model.get_embeddings([text])
-        return embeddings[0].values
+        return embed_texts([text], model_name)[0]
     except Exception as e:
         print(f"ERROR: Could not get embedding for query: {e}")
         raise EmbeddingError(f"Could not get embedding for query: {e}")
 
 
-def search_resolved_tickets_db(query: str) -> str:
-    """Performs a semantic vector search on the BigQuery database of resolved tickets."""
-    print(f"INFO: Starting semantic search for query: '{query}'")
+async def search_resolved_tickets_db(query: str) -> str:
+    """Performs a semantic vector search on the database of resolved tickets."""
+    return await run_blocking(_search_resolved_tickets_db, query)
 
-    bq_project_id = os.getenv("BQ_PROJECT_ID")
-    bq_dataset_id = os.getenv("BQ_DATASET_ID")
 
-    if not bq_project_id or not bq_dataset_id:
-        raise ConfigurationError("BigQuery project ID or dataset ID is not configured.")
+def _search_resolved_tickets_db(query: str) -> str:
+    print(f"INFO: Starting semantic search for query: '{query}'")
+
+    # Resolve the backend first so configuration errors surface before the embedding call.
+    backend = get_ticket_search_backend()
 
     try:
         query_embedding = _get_embedding_for_query(query)
     except EmbeddingError:
         raise
 
-    client = bigquery.Client(project=bq_project_id)
-    table_id = f"{bq_project_id}.{bq_dataset_id}.resolved_tickets"
-
-    sql_query = f"""
-        SELECT
-            ticket_id,
-            request,
-            category,
-            suggested_solution,
-            -- Calculate the cosine distance between the query vector and the stored embeddings
-            COSINE_DISTANCE(request_embedding, @query_embedding) as distance
-        FROM
-            `{table_id}`
-        -- Order by distance (smaller is better) and return the top 3 matches
-        ORDER BY
-            distance
-        LIMIT 3
+    results = backend.search(query_embedding, top_k=3)
+
+    if not results:
+        return "[]"
+
+    return str(results)
+
+
+async def search_local_knowledge_base(query: str) -> str:
     """
+    Searches the local copy of the ADK documentation (`data/knowledge_base/`) with BM25.
 
-    job_config = bigquery.QueryJobConfig(
-        query_parameters=[
-            bigquery.ArrayQueryParameter("query_embedding", "FLOAT64", query_embedding),
-        ]
-    )
+    Works fully offline. When hybrid search is enabled and the index holds passage
+    embeddings, the lexical ranking is fused with a semantic ranking of the query;
+    if the embedding call fails, the lexical results are returned on their own.
+    """
+    return await run_blocking(_search_local_knowledge_base, query)
 
-    try:
-        print(f"INFO: Executing BigQuery vector search...")
-        query_job = client.query(sql_query, job_config=job_config)
-        results = [dict(row) for row in query_job.result()]
 
-        if not results:
-            return "[]"
+def _search_local_knowledge_base(query: str) -> str:
+    print(f"INFO: Starting local knowledge base search for query: '{query}'")
+    index = get_knowledge_base_index()
 
-        return str(results)
+    query_embedding = None
+    if hybrid_search_enabled() and index.embeddings is not None:
+        try:
+            query_embedding = _get_embedding_for_query(query)
+        except EmbeddingError:
+            print("WARN: Falling back to lexical-only knowledge base search.")
 
-    except Exception as e:
-        print(f"ERROR: BigQuery vector search failed: {e}")
-        raise BigQueryError(f"Failed to execute database vector search. Details: {e}") 
\ No newline at end of file
+    results = index.search(query, top_k=5, query_embedding=query_embedding)
+    if not results:
+        return "No matching passages found in the local knowledge base."
+
+    return "\n\n".join(
+        f"[{i}] Source: {r['source']} ({r['heading'] or 'top of document'}, score {r['score']:.3f})\n{r['text']}"
+        for i, r in enumerate(results, 1)
+    )
@@ -0,0 +1,331 @@
+"""
+Embedding model handle and two-tier embedding cache for Project Agora.
+
+Query embeddings are looked up in an in-memory LRU first, then in an on-disk
+SQLite store, and only the remaining misses are sent to the embedding model.
+They are sent in as few requests as the model's per-request limits allow
+(`MAX_BATCH_TEXTS` texts and `MAX_BATCH_TOKENS` tokens). Entries are keyed by
+the model name and a hash of the normalized text, and are evicted by size
+(both tiers) and age (disk tier). The disk tier commits once per batch of puts
+and evicts every `DISK_EVICT_INTERVAL` puts, deleting only the expired rows and
+the least recently used rows beyond the size limit. A disk hit does not write:
+its `last_used` time is buffered and written with the next commit, or once
+`DISK_TOUCH_INTERVAL` hits are buffered.
+
+Configuration (environment variables):
+- `EMBEDDING_CACHE_PATH`: SQLite file for the disk tier. Set to an empty string
+  to keep the cache in memory only. Defaults to `.cache/embeddings.sqlite3`.
+- `EMBEDDING_CACHE_MEMORY_SIZE`: Maximum entries held in memory (default 1024).
+- `EMBEDDING_CACHE_MAX_ENTRIES`: Maximum entries kept on disk (default 50000).
+- `EMBEDDING_CACHE_TTL_SECONDS`: Age after which disk entries expire (default 30 days).
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+from vertexai.language_models import TextEmbeddingModel
+
+from ._tokens import count_tokens
+
+DEFAULT_EMBEDDING_MODEL = "text-embedding-004"
+# text-embedding-004 accepts at most 250 texts and 20,000 tokens per request. Tokens
+# are estimated as words and punctuation marks, which undercounts subword tokens,
+# so the token cap leaves a margin.
+MAX_BATCH_TEXTS = 250
+MAX_BATCH_TOKENS = 14000
+DEFAULT_CACHE_PATH = Path(__file__).resolve().parents[2] / ".cache" / "embeddings.sqlite3"
+
+_models: dict[str, TextEmbeddingModel] = {}
+_models_lock = threading.Lock()
+
+
+def get_embedding_model(model_name: str = DEFAULT_EMBEDDING_MODEL) -> TextEmbeddingModel:
+    """Returns a process-wide `TextEmbeddingModel` handle, loading it on first use."""
+    model = _models.get(model_name)
+    if model is None:
+        with _models_lock:
+            model = _models.get(model_name)
+            if model is None:
+                model = TextEmbeddingModel.from_pretrained(model_name)
+                _models[model_name] = model
+    return model
+
+
+def normalize_text(text: str) -> str:
+    """Normalizes unicode and whitespace so trivially different queries share an entry."""
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+def cache_key(model_name: str, text: str) -> str:
+    """Builds the cache key for a (model name, normalized text) pair."""
+    digest = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+    return f"{model_name}:{digest}"
+
+
+# Disk puts between two TTL and size evictions; the size limit may be exceeded by this many rows.
+DISK_EVICT_INTERVAL = 256
+# Disk hits whose `last_used` update is buffered before it is written on its own.
+DISK_TOUCH_INTERVAL = 256
+
+
+class EmbeddingCache:
+    """A bounded in-memory LRU backed by an optional SQLite store with size and TTL eviction."""
+
+    def __init__(
+        self,
+        disk_path: Optional[str] = None,
+        memory_size: int = 1024,
+        disk_max_entries: int = 50000,
+        ttl_seconds: float = 30 * 24 * 3600,
+    ):
+        self.memory_size = memory_size
+        self.disk_max_entries = disk_max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+
+        self._memory: OrderedDict[str, list[float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = self._open_disk_store(disk_path) if disk_path else None
+        self._puts_since_evict = 0
+        # key -> last_used of disk hits not written yet.
+        self._touched: dict[str, float] = {}
+
+    @staticmethod
+    def _open_disk_store(disk_path: str) -> Optional[sqlite3.Connection]:
+        try:
+            Path(disk_path).parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(disk_path, check_same_thread=False)
+            db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    key TEXT PRIMARY KEY,
+                    vector BLOB NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )
+                """
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used)")
+            db.commit()
+            return db
+        except sqlite3.Error as e:
+            print(f"WARNING: Could not open embedding cache at '{disk_path}', using memory only: {e}")
+            return None
+
+    def get(self, model_name: str, text: str) -> Optional[list[float]]:
+        """Returns the cached embedding for `text`, or None on a miss."""
+        key = cache_key(model_name, text)
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.hits_memory += 1
+                return vector
+
+            vector = self._disk_get(key)
+            if vector is not None:
+                self._memory_put(key, vector)
+                self.hits_disk += 1
+                return vector
+
+            self.misses += 1
+            return None
+
+    def put(self, model_name: str, text: str, vector: list[float]) -> None:
+        """Stores an embedding in both tiers."""
+        self.put_many(model_name, [(text, vector)])
+
+    def put_many(self, model_name: str, items: list[tuple[str, list[float]]]) -> None:
+        """Stores (text, embedding) pairs in both tiers with a single disk commit."""
+        with self._lock:
+            for text, vector in items:
+                key, vector = cache_key(model_name, text), list(vector)
+                self._memory_put(key, vector)
+                self._disk_put(key, vector)
+            if self._db:
+                self._flush_touches()
+                self._db.commit()
+
+    def get_or_compute(
+        self,
+        model_name: str,
+        texts: list[str],
+        compute: Callable[[list[str]], list[list[float]]],
+    ) -> list[list[float]]:
+        """Returns embeddings for `texts`, calling `compute` once with only the uncached ones."""
+        results: list[Optional[list[float]]] = [self.get(model_name, text) for text in texts]
+
+        # Deduplicate the misses so repeated texts in one batch are embedded once.
+        pending: dict[str, list[int]] = {}
+        for i, vector in enumerate(results):
+            if vector is None:
+                pending.setdefault(normalize_text(texts[i]), []).append(i)
+
+        if pending:
+            missing_texts = [texts[indices[0]] for indices in pending.values()]
+            vectors = compute(missing_texts)
+            self.put_many(model_name, list(zip(missing_texts, vectors)))
+            for indices, vector in zip(pending.values(), vectors):
+                for i in indices:
+                    results[i] = list(vector)
+
+        return results
+
+    def stats(self) -> dict:
+        """Returns hit/miss counters and the current size of each tier."""
+        with self._lock:
+            lookups = self.hits_memory + self.hits_disk + self.misses
+            disk_entries = (
+                self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0] if self._db else 0
+            )
+            return {
+                "hits_memory": self.hits_memory,
+                "hits_disk": self.hits_disk,
+                "misses": self.misses,
+                "hit_rate": (self.hits_memory + self.hits_disk) / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_entries": disk_entries,
+            }
+
+    def clear(self) -> None:
+        """Empties both tiers and resets the counters."""
+        with self._lock:
+            self._memory.clear()
+            self._touched.clear()
+            if self._db:
+                self._db.execute("DELETE FROM embeddings")
+                self._db.commit()
+            self.hits_memory = self.hits_disk = self.misses = 0
+
+    # --- Tier helpers (called with the lock held) ---
+
+    def _memory_put(self, key: str, vector: list[float]) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _disk_get(self, key: str) -> Optional[list[float]]:
+        if not self._db:
+            return None
+        row = self._db.execute(
+            "SELECT vector, created_at FROM embeddings WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        now = time.time()
+        if now - row[1] > self.ttl_seconds:
+            self._touched.pop(key, None)
+            self._db.execute("DELETE FROM embeddings WHERE key = ?", (key,))
+            self._db.commit()
+            return None
+
+        self._touched[key] = now
+        if len(self._touched) >= DISK_TOUCH_INTERVAL:
+            self._flush_touches()
+            self._db.commit()
+        return array("f", row[0]).tolist()
+
+    def _flush_touches(self) -> None:
+        """Writes the buffered `last_used` times of disk hits without committing."""
+        if self._touched:
+            self._db.executemany(
+                "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                [(last_used, key) for key, last_used in self._touched.items()],
+            )
+            self._touched.clear()
+
+    def _disk_put(self, key: str, vector: list[float]) -> None:
+        """Inserts a row without committing; the caller commits once per batch."""
+        if not self._db:
+            return
+        now = time.time()
+        self._db.execute(
+            "INSERT OR REPLACE INTO embeddings (key, vector, created_at, last_used) VALUES (?, ?, ?, ?)",
+            (key, array("f", vector).tobytes(), now, now),
+        )
+        self._touched.pop(key, None)
+        self._puts_since_evict += 1
+        if self._puts_since_evict >= DISK_EVICT_INTERVAL:
+            self._disk_evict(now)
+
+    def _disk_evict(self, now: float) -> None:
+        """Expires old entries, then trims the least recently used ones beyond the size limit."""
+        self._puts_since_evict = 0
+        # Written first, so the trim below sees the latest use of every row.
+        self._flush_touches()
+        self._db.execute("DELETE FROM embeddings WHERE created_at < ?", (now - self.ttl_seconds,))
+        excess = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0] - self.disk_max_entries
+        if excess > 0:
+            # Walks the last_used index from the oldest end, so only the excess rows are visited.
+            self._db.execute(
+                "DELETE FROM embeddings WHERE key IN (SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+                (excess,),
+            )
+
+
+_cache: Optional[EmbeddingCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Returns the process-wide embedding cache configured from the environment."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = EmbeddingCache(
+                    disk_path=os.getenv("EMBEDDING_CACHE_PATH", str(DEFAULT_CACHE_PATH)),
+                    memory_size=int(os.getenv("EMBEDDING_CACHE_MEMORY_SIZE", "1024")),
+                    disk_max_entries=int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "50000")),
+                    ttl_seconds=float(os.getenv("EMBEDDING_CACHE_TTL_SECONDS", str(30 * 24 * 3600))),
+                )
+    return _cache
+
+
+def embedding_batches(
+    texts: list[str], max_texts: int = MAX_BATCH_TEXTS, max_tokens: int = MAX_BATCH_TOKENS
+) -> Iterator[list[str]]:
+    """
+    Splits `texts` into consecutive batches of at most `max_texts` texts and
+    `max_tokens` estimated tokens. A text over the token cap is sent on its own;
+    the model truncates it.
+    """
+    batch, tokens = [], 0
+    for text in texts:
+        text_tokens = count_tokens(text)
+        if batch and (len(batch) >= max_texts or tokens + text_tokens > max_tokens):
+            yield batch
+            batch, tokens = [], 0
+        batch.append(text)
+        tokens += text_tokens
+    if batch:
+        yield batch
+
+
+def embed_texts(texts: list[str], model_name: str = DEFAULT_EMBEDDING_MODEL) -> list[list[float]]:
+    """Embeds `texts` through the cache, sending only the misses to the model in as few requests as fit."""
+
+    def _compute(missing: list[str]) -> list[list[float]]:
+        model = get_embedding_model(model_name)
+        return [
+            embedding.values for batch in embedding_batches(missing) for embedding in model.get_embeddings(batch)
+        ]
+
+    return get_embedding_cache().get_or_compute(model_name, texts, _compute)
+
+
+def embedding_cache_stats() -> dict:
+    """Returns the hit/miss counters of the process-wide embedding cache."""
+    return get_embedding_cache().stats()
@@ -0,0 +1,348 @@
+"""
+Local BM25 search over the chunks of the markdown and text files in `data/knowledge_base/`.
+
+The index is an inverted index stored in CSR form: a sorted vocabulary with
+offsets into flat arrays of passage ids and term frequencies. It is persisted
+to a single `.npz` file and loads in a few milliseconds. Queries are scored
+with vectorized NumPy accumulation, so no remote service is involved.
+
+When the index was built with passage embeddings, `search` can also fuse the
+BM25 ranking with a cosine ranking of a query embedding, using reciprocal rank
+fusion.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+
+from ._chunking import (
+    DEFAULT_CHUNK_STORE_PATH,
+    chunk_store_fingerprint,
+    knowledge_base_hashes,
+    load_or_build_chunk_store,
+)
+from .exceptions import VectorStoreError
+
+INDEX_FORMAT_VERSION = 1
+
+DEFAULT_KNOWLEDGE_BASE_DIR = Path(__file__).resolve().parents[2] / "data" / "knowledge_base"
+DEFAULT_INDEX_PATH = Path(__file__).resolve().parents[2] / ".cache" / "knowledge_base_bm25.npz"
+
+_TOKEN_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*|\d+")
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Lowercased identifier-aware tokens.
+
+    Symbols like `before_tool_callback` are kept whole, so exact ADK names match
+    precisely, and their underscore-separated parts are added so that a plain
+    "tool callback" query still finds them.
+    """
+    tokens = []
+    for token in _TOKEN_RE.findall(text):
+        token = token.lower()
+        tokens.append(token)
+        if "_" in token.strip("_"):
+            tokens.extend(part for part in token.split("_") if part)
+    return tokens
+
+
+class BM25Index:
+    """An immutable BM25 index over knowledge-base passages."""
+
+    def __init__(
+        self,
+        vocabulary: list[str],
+        offsets: np.ndarray,
+        postings: np.ndarray,
+        frequencies: np.ndarray,
+        doc_lengths: np.ndarray,
+        passages: list[dict],
+        text_blob: bytes,
+        text_offsets: np.ndarray,
+        embeddings: Optional[np.ndarray] = None,
+        k1: float = 1.5,
+        b: float = 0.75,
+        corpus: str = "",
+    ):
+        self.vocabulary = vocabulary
+        self.term_ids = {term: i for i, term in enumerate(vocabulary)}
+        self.offsets = offsets
+        self.postings = postings
+        self.frequencies = frequencies
+        self.doc_lengths = doc_lengths
+        # Passage metadata (`id`, `source`); texts stay UTF-8 encoded until a passage is returned.
+        self.passages = passages
+        self.text_blob = text_blob
+        self.text_offsets = text_offsets
+        self.embeddings = embeddings
+        self.k1 = k1
+        self.b = b
+        # Fingerprint of the chunk store the index was built from (see `chunk_store_fingerprint`).
+        self.corpus = corpus
+
+        count = len(passages)
+        self.avg_length = float(doc_lengths.mean()) if count else 0.0
+        doc_freq = np.diff(offsets)
+        self.idf = np.log(1.0 + (count - doc_freq + 0.5) / (doc_freq + 0.5)).astype(np.float32)
+
+    def __len__(self) -> int:
+        return len(self.passages)
+
+    def text(self, i: int) -> str:
+        return self.text_blob[self.text_offsets[i] : self.text_offsets[i + 1]].decode("utf-8")
+
+    def _result(self, i: int, score: float) -> dict:
+        return {**self.passages[i], "text": self.text(i), "score": float(score)}
+
+    @classmethod
+    def build(cls, passages: Iterable[dict], embeddings: Optional[np.ndarray] = None) -> "BM25Index":
+        """
+        Builds an index from passages, each a dict with at least `id`, `source` and `text`.
+        `embeddings`, if given, must have one row per passage.
+        """
+        passages = list(passages)
+        encoded = [p["text"].encode("utf-8") for p in passages]
+        text_offsets = np.zeros(len(passages) + 1, dtype=np.int64)
+        text_offsets[1:] = np.cumsum([len(t) for t in encoded])
+        term_postings: dict[str, list[tuple[int, int]]] = {}
+        doc_lengths = np.zeros(len(passages), dtype=np.int32)
+        for doc_id, passage in enumerate(passages):
+            counts = Counter(tokenize(passage["text"]))
+            doc_lengths[doc_id] = sum(counts.values())
+            for term, tf in counts.items():
+                term_postings.setdefault(term, []).append((doc_id, tf))
+
+        vocabulary = sorted(term_postings)
+        offsets = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        flat_docs, flat_tfs = [], []
+        for i, term in enumerate(vocabulary):
+            entries = term_postings[term]
+            flat_docs.extend(doc for doc, _ in entries)
+            flat_tfs.extend(tf for _, tf in entries)
+            offsets[i + 1] = len(flat_docs)
+
+        if embeddings is not None:
+            embeddings = np.asarray(embeddings, dtype=np.float32)
+            if embeddings.shape[0] != len(passages):
+                raise VectorStoreError("Passage embeddings do not match the number of passages.")
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            embeddings = embeddings / norms
+
+        return cls(
+            vocabulary,
+            offsets,
+            np.array(flat_docs, dtype=np.int32),
+            np.array(flat_tfs, dtype=np.float32),
+            doc_lengths,
+            [{key: value for key, value in p.items() if key != "text"} for p in passages],
+            b"".join(encoded),
+            text_offsets,
+            embeddings,
+        )
+
+    def bm25_scores(self, query: str) -> np.ndarray:
+        """BM25 score of every passage for `query` (zeros for passages sharing no terms)."""
+        scores = np.zeros(len(self.passages), dtype=np.float32)
+        if not len(self.passages):
+            return scores
+        norm = self.k1 * (1.0 - self.b + self.b * self.doc_lengths / max(self.avg_length, 1e-9))
+        for term in set(tokenize(query)):
+            term_id = self.term_ids.get(term)
+            if term_id is None:
+                continue
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            docs, tfs = self.postings[start:end], self.frequencies[start:end]
+            scores[docs] += self.idf[term_id] * tfs * (self.k1 + 1.0) / (tfs + norm[docs])
+        return scores
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 5,
+        query_embedding: Optional[list[float]] = None,
+        rrf_k: int = 60,
+    ) -> list[dict]:
+        """
+        Returns the best passages for `query` as dicts with `id`, `source`, `text` and `score`.
+
+        With a `query_embedding` (and an index built with embeddings) the BM25 and
+        cosine rankings are combined by reciprocal rank fusion:
+        score = sum(1 / (rrf_k + rank)).
+        """
+        bm25 = self.bm25_scores(query)
+        if query_embedding is None or self.embeddings is None:
+            ranked = [i for i in np.argsort(-bm25, kind="stable")[:top_k] if bm25[i] > 0]
+            return [self._result(i, bm25[i]) for i in ranked]
+
+        q = np.asarray(query_embedding, dtype=np.float32)
+        q = q / (np.linalg.norm(q) or 1.0)
+        cosine = self.embeddings @ q
+
+        fused = np.zeros(len(self.passages), dtype=np.float32)
+        lexical_order = [i for i in np.argsort(-bm25, kind="stable") if bm25[i] > 0]
+        fused[lexical_order] += 1.0 / (rrf_k + np.arange(1, len(lexical_order) + 1))
+        vector_order = np.argsort(-cosine, kind="stable")
+        fused[vector_order] += 1.0 / (rrf_k + np.arange(1, len(vector_order) + 1))
+
+        ranked = np.argsort(-fused, kind="stable")[:top_k]
+        return [self._result(i, fused[i]) for i in ranked]
+
+    # --- Persistence ---
+
+    def save(self, path: str) -> None:
+        """Writes the index to a single `.npz` file (atomically replaced)."""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        meta = {"version": INDEX_FORMAT_VERSION, "k1": self.k1, "b": self.b, "corpus": self.corpus}
+        arrays = {
+            "meta": _encode(json.dumps(meta)),
+            "vocabulary": _encode("\n".join(self.vocabulary)),
+            "passages": _encode(json.dumps(self.passages)),
+            "texts": np.frombuffer(self.text_blob, dtype=np.uint8),
+            "text_offsets": self.text_offsets,
+            "offsets": self.offsets,
+            "postings": self.postings,
+            "frequencies": self.frequencies,
+            "doc_lengths": self.doc_lengths,
+        }
+        if self.embeddings is not None:
+            arrays["embeddings"] = self.embeddings
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "BM25Index":
+        """Reads an index written by `save`."""
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(_decode(data["meta"]))
+            if meta.get("version") != INDEX_FORMAT_VERSION:
+                raise VectorStoreError(f"Unsupported BM25 index version {meta.get('version')} at '{path}'.")
+            vocabulary_blob = _decode(data["vocabulary"])
+            return cls(
+                vocabulary_blob.split("\n") if vocabulary_blob else [],
+                data["offsets"],
+                data["postings"],
+                data["frequencies"],
+                data["doc_lengths"],
+                json.loads(_decode(data["passages"])),
+                data["texts"].tobytes(),
+                data["text_offsets"],
+                data["embeddings"] if "embeddings" in data.files else None,
+                k1=meta["k1"],
+                b=meta["b"],
+                corpus=meta.get("corpus", ""),
+            )
+
+
+def _encode(text: str) -> np.ndarray:
+    # Strings are stored as UTF-8 bytes: NumPy unicode arrays use 4 bytes per character.
+    return np.frombuffer(text.encode("utf-8"), dtype=np.uint8)
+
+
+def _decode(array: np.ndarray) -> str:
+    return array.tobytes().decode("utf-8")
+
+
+def build_knowledge_base_index(
+    kb_dir: str,
+    index_path: Optional[str] = None,
+    embed: bool = False,
+    chunk_store_path: Optional[str] = None,
+) -> BM25Index:
+    """
+    Builds the BM25 index over the chunks of `kb_dir` and optionally persists it.
+
+    Chunks come from the chunk store (see `_chunking.py`), which only re-chunks
+    files that changed since it was last written. With `embed=True`, chunk
+    embeddings are stored as well so the index supports hybrid search.
+    """
+    store = load_or_build_chunk_store(chunk_store_path or DEFAULT_CHUNK_STORE_PATH, kb_dir)
+    passages = list(store)
+    embeddings = None
+    if embed:
+        from ._embedding_cache import embed_texts
+
+        embeddings = embed_texts([p["text"] for p in passages])
+    index = BM25Index.build(passages, embeddings)
+    index.corpus = chunk_store_fingerprint(store.manifest)
+    if index_path:
+        index.save(index_path)
+    print(f"INFO: Built local knowledge base index with {len(index)} chunks from '{kb_dir}'.")
+    return index
+
+
+def knowledge_base_fingerprint(kb_dir: str) -> str:
+    """A digest of the knowledge base files' names and content hashes; changes when a file is added, edited or removed."""
+    hashes = json.dumps(knowledge_base_hashes(kb_dir), sort_keys=True)
+    return hashlib.sha256(hashes.encode("utf-8")).hexdigest()
+
+
+def load_or_build_knowledge_base_index(
+    kb_dir: str, index_path: str, embed: bool = False, chunk_store_path: Optional[str] = None
+) -> BM25Index:
+    """
+    Loads the persisted index if it was built from the current chunk store, and
+    rebuilds it otherwise. The chunk store is brought up to date first, so an
+    added, edited or removed file makes the index stale whatever its mtime.
+    """
+    store = load_or_build_chunk_store(chunk_store_path or DEFAULT_CHUNK_STORE_PATH, kb_dir)
+    if os.path.exists(index_path):
+        try:
+            index = BM25Index.load(index_path)
+        except (OSError, ValueError, KeyError, VectorStoreError) as e:
+            print(f"WARN: Could not load local knowledge base index, rebuilding: {e}")
+        else:
+            if index.corpus == chunk_store_fingerprint(store.manifest):
+                return index
+            print(f"INFO: Local knowledge base index at '{index_path}' is stale; rebuilding.")
+    return build_knowledge_base_index(kb_dir, index_path, embed=embed, chunk_store_path=chunk_store_path)
+
+
+def hybrid_search_enabled() -> bool:
+    return os.getenv("KB_LOCAL_SEARCH_HYBRID", "false").lower() in ("1", "true", "yes")
+
+
+_index: Optional[BM25Index] = None
+_index_lock = threading.Lock()
+
+
+def get_knowledge_base_index() -> BM25Index:
+    """
+    Returns the process-wide knowledge base index, loading it on first use.
+
+    Configured with `KNOWLEDGE_BASE_DIR`, `KB_LOCAL_INDEX_PATH` and `KB_CHUNK_STORE_PATH`. When
+    `KB_LOCAL_SEARCH_HYBRID` is enabled, a rebuilt index also stores passage embeddings.
+    """
+    global _index
+    with _index_lock:
+        if _index is None:
+            kb_dir = os.getenv("KNOWLEDGE_BASE_DIR") or str(DEFAULT_KNOWLEDGE_BASE_DIR)
+            index_path = os.getenv("KB_LOCAL_INDEX_PATH") or str(DEFAULT_INDEX_PATH)
+            if not os.path.isdir(kb_dir):
+                raise VectorStoreError(f"Knowledge base directory '{kb_dir}' does not exist.")
+            _index = load_or_build_knowledge_base_index(
+                kb_dir,
+                index_path,
+                embed=hybrid_search_enabled(),
+                chunk_store_path=os.getenv("KB_CHUNK_STORE_PATH") or None,
+            )
+        return _index
+
+
+def reset_knowledge_base_index() -> None:
+    """Drops the cached index so the next call reloads it (used after the corpus changes)."""
+    global _index
+    with _index_lock:
+        _index = None
@@ -0,0 +1,193 @@
+"""
+Quantized representations of the ticket embedding matrix.
+
+Both quantizers keep only compact codes in memory and score a full-precision
+float32 query directly against those codes (asymmetric distance computation):
+
+- `Int8Quantizer`: one signed byte per dimension plus a float32 scale per row
+  (~4x smaller than float32, ~8x smaller than float64).
+- `ProductQuantizer`: the vector is split into `subspaces` chunks, and each
+  chunk is replaced by the id of its nearest k-means centroid. This costs one
+  byte per subspace (~32x smaller than float32 with 96 subspaces of 8 dims).
+
+The scores are approximate, so callers re-rank the best candidates against the
+original vectors (see `QuantizedTicketBackend` in `_vector_store.py`).
+
+`encode` accepts rows in any dtype, e.g. a memory-mapped dataset, and scales them
+to unit length `SCORE_BLOCK_ROWS` at a time, so no float32 copy of the matrix is
+made. `ProductQuantizer.fit` trains on a sample of at most `FIT_SAMPLE_ROWS` rows.
+
+Queries are scored `SCORE_BLOCK_ROWS` codes at a time into a preallocated
+output, so the float32 temporaries of a query stay a few MiB however many rows
+are encoded, instead of a float32 copy of the whole code matrix.
+"""
+
+import copy
+
+import numpy as np
+
+from .exceptions import VectorStoreError
+
+SCORE_BLOCK_ROWS = 1024
+FIT_SAMPLE_ROWS = 16384
+
+
+class Int8Quantizer:
+    """Symmetric per-row int8 scalar quantization."""
+
+    name = "int8"
+
+    def fit(self, matrix: np.ndarray) -> "Int8Quantizer":
+        return self
+
+    def encode(self, matrix: np.ndarray) -> None:
+        """Quantizes the rows scaled to unit length; the largest magnitude in each row maps to 127."""
+        matrix = _as_rows(matrix)
+        self.codes = np.empty(matrix.shape, dtype=np.int8)
+        self.scales = np.empty(len(matrix), dtype=np.float32)
+        for start, block in _unit_blocks(matrix):
+            scales = np.abs(block).max(axis=1) / 127.0
+            scales[scales == 0] = 1.0
+            self.codes[start : start + len(block)] = np.round(block / scales[:, None])
+            self.scales[start : start + len(block)] = scales
+
+    def scores(self, query: np.ndarray) -> np.ndarray:
+        """Approximate inner products between `query` and every encoded row."""
+        query = np.asarray(query, dtype=np.float32)
+        out = np.empty(len(self.codes), dtype=np.float32)
+        # `codes @ query` would upcast the whole int8 matrix to a float32 temporary.
+        block = np.empty((min(SCORE_BLOCK_ROWS, len(self.codes)), self.codes.shape[1]), dtype=np.float32)
+        for start in range(0, len(self.codes), SCORE_BLOCK_ROWS):
+            rows = self.codes[start : start + SCORE_BLOCK_ROWS]
+            np.copyto(block[: len(rows)], rows)
+            np.dot(block[: len(rows)], query, out=out[start : start + len(rows)])
+        out *= self.scales
+        return out
+
+    def extended(self, matrix: np.ndarray) -> "Int8Quantizer":
+        """Returns a copy that also holds the codes of the rows in `matrix`."""
+        other = Int8Quantizer()
+        other.encode(matrix)
+        other.codes = np.concatenate([self.codes, other.codes])
+        other.scales = np.concatenate([self.scales, other.scales])
+        return other
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + self.scales.nbytes
+
+
+class ProductQuantizer:
+    """Product quantization with per-subspace k-means codebooks and ADC lookup tables."""
+
+    name = "pq"
+
+    def __init__(self, subspaces: int = 96, centroids: int = 256, iterations: int = 20, seed: int = 0):
+        if centroids > 256:
+            raise VectorStoreError("ProductQuantizer stores codes as uint8, so centroids must be <= 256.")
+        self.subspaces = subspaces
+        self.centroids = centroids
+        self.iterations = iterations
+        self.seed = seed
+
+    def fit(self, matrix: np.ndarray) -> "ProductQuantizer":
+        """Trains one k-means codebook per subspace on a sample of the rows scaled to unit length."""
+        matrix = _as_rows(matrix)
+        dim = matrix.shape[1]
+        if dim % self.subspaces:
+            raise VectorStoreError(f"Dimension {dim} is not divisible by {self.subspaces} subspaces.")
+
+        self.sub_dim = dim // self.subspaces
+        rng = np.random.default_rng(self.seed)
+        if len(matrix) > FIT_SAMPLE_ROWS:
+            matrix = matrix[np.sort(rng.choice(len(matrix), size=FIT_SAMPLE_ROWS, replace=False))]
+        matrix = _unit_rows(matrix)
+        k = min(self.centroids, len(matrix))
+        self.codebooks = np.stack(
+            [
+                _kmeans(self._subspace(matrix, s), k, self.iterations, rng)
+                for s in range(self.subspaces)
+            ]
+        )
+        return self
+
+    def encode(self, matrix: np.ndarray) -> None:
+        """Replaces each subspace of the rows, scaled to unit length, with its nearest centroid id."""
+        matrix = _as_rows(matrix)
+        self.codes = np.empty((len(matrix), self.subspaces), dtype=np.uint8)
+        for start, block in _unit_blocks(matrix):
+            for s in range(self.subspaces):
+                self.codes[start : start + len(block), s] = _nearest(self._subspace(block, s), self.codebooks[s])
+
+    def scores(self, query: np.ndarray) -> np.ndarray:
+        """ADC: build a (subspaces x centroids) table of partial inner products, then sum lookups."""
+        table = np.einsum("skd,sd->sk", self.codebooks, query.reshape(self.subspaces, self.sub_dim))
+        out = np.empty(len(self.codes), dtype=table.dtype)
+        subspaces = np.arange(self.subspaces)
+        # The lookup gathers one float per code, so it is done a block of rows at a time.
+        for start in range(0, len(self.codes), SCORE_BLOCK_ROWS):
+            rows = self.codes[start : start + SCORE_BLOCK_ROWS]
+            table[subspaces, rows].sum(axis=1, out=out[start : start + len(rows)])
+        return out
+
+    def extended(self, matrix: np.ndarray) -> "ProductQuantizer":
+        """Returns a copy that also holds the codes of the rows in `matrix`, using the trained codebooks."""
+        other = copy.copy(self)
+        other.encode(matrix)
+        other.codes = np.concatenate([self.codes, other.codes])
+        return other
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + self.codebooks.nbytes
+
+    def _subspace(self, matrix: np.ndarray, s: int) -> np.ndarray:
+        return matrix[:, s * self.sub_dim : (s + 1) * self.sub_dim]
+
+
+def create_quantizer(mode: str, **options):
+    """Returns an unfitted quantizer for `mode` ('int8' or 'pq')."""
+    if mode == "int8":
+        return Int8Quantizer()
+    if mode == "pq":
+        return ProductQuantizer(**options)
+    raise VectorStoreError(f"Unknown quantization mode '{mode}'. Expected 'int8' or 'pq'.")
+
+
+def _as_rows(matrix) -> np.ndarray:
+    """Returns `matrix` as a 2-D array without copying an existing (possibly memory-mapped) array."""
+    return matrix if isinstance(matrix, np.ndarray) else np.asarray(matrix, dtype=np.float32)
+
+
+def _unit_rows(rows: np.ndarray) -> np.ndarray:
+    rows = np.asarray(rows, dtype=np.float32)
+    norms = np.linalg.norm(rows, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return rows / norms
+
+
+def _unit_blocks(matrix: np.ndarray):
+    """Yields (start, float32 unit-length rows) for `SCORE_BLOCK_ROWS` rows at a time."""
+    for start in range(0, len(matrix), SCORE_BLOCK_ROWS):
+        yield start, _unit_rows(matrix[start : start + SCORE_BLOCK_ROWS])
+
+
+def _nearest(points: np.ndarray, centers: np.ndarray) -> np.ndarray:
+    # argmin ||p - c||^2 == argmax (2 p.c - ||c||^2)
+    return np.argmax(2 * points @ centers.T - np.sum(centers**2, axis=1), axis=1)
+
+
+def _kmeans(points: np.ndarray, k: int, iterations: int, rng: np.random.Generator) -> np.ndarray:
+    centers = points[rng.choice(len(points), size=k, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = _nearest(points, centers)
+        counts = np.bincount(assignment, minlength=k)
+        sums = np.zeros_like(centers)
+        np.add.at(sums, assignment, points)
+        filled = counts > 0
+        centers[filled] = sums[filled] / counts[filled, None]
+        # Re-seed empty clusters with random points so every code stays useful.
+        empty = np.flatnonzero(~filled)
+        if len(empty):
+            centers[empty] = points[rng.choice(len(points), size=len(empty), replace=False)]
+    return centers
@@ -0,0 +1,227 @@
+"""
+Semantic cache keyed on query embeddings.
+
+A lookup embeds nothing itself: callers pass the query embedding, and the cache
+returns the value stored for the most similar past query if its cosine
+similarity is at least `threshold`. Entries expire after `ttl_seconds`, the
+least recently used entry is evicted when the cache is full, and the cache
+remembers the corpus version its entries were computed against, so that a
+re-imported knowledge base invalidates the whole cache on the next lookup.
+
+Embeddings live in one preallocated float32 matrix, so a lookup is a single
+matrix-vector product over at most `max_entries` rows.
+
+Configuration of the knowledge retrieval cache (environment variables):
+- `KB_QUERY_CACHE_ENABLED`: Set to "false" to disable the cache (default "true").
+- `KB_QUERY_CACHE_THRESHOLD`: Minimum cosine similarity for a hit (default 0.95).
+- `KB_QUERY_CACHE_SIZE`: Maximum cached queries (default 256).
+- `KB_QUERY_CACHE_TTL_SECONDS`: Age after which entries expire (default 3600).
+- `KB_CORPUS_VERSION`: Written by `scripts/setup_rag.py` after each import.
+"""
+
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+from ._lexical_search import DEFAULT_KNOWLEDGE_BASE_DIR, knowledge_base_fingerprint
+
+
+class SemanticCache:
+    """A thread-safe LRU + TTL cache whose lookups match by cosine similarity."""
+
+    def __init__(
+        self,
+        threshold: float = 0.95,
+        max_entries: int = 256,
+        ttl_seconds: float = 3600,
+        version: Optional[Callable[[], str]] = None,
+    ):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._version_fn = version
+
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        self._matrix: Optional[np.ndarray] = None
+        self._slot_keys: list[Optional[str]] = [None] * max_entries
+        self._valid = np.zeros(max_entries, dtype=bool)
+        self._free_slots = list(range(max_entries - 1, -1, -1))
+        self._version: Optional[str] = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.saved_seconds = 0.0
+
+    def lookup(self, embedding) -> Optional[dict]:
+        """
+        Returns the entry of the most similar cached query (with its `similarity`),
+        or None if no live entry reaches the threshold.
+        """
+        query = _unit(embedding)
+        with self._lock:
+            self._check_version()
+            while self._entries:
+                sims = self._matrix @ query
+                sims[~self._valid] = -np.inf
+                slot = int(np.argmax(sims))
+                if sims[slot] < self.threshold:
+                    break
+                key = self._slot_keys[slot]
+                entry = self._entries[key]
+                if time.time() - entry["created_at"] > self.ttl_seconds:
+                    self._remove(key)
+                    self.expirations += 1
+                    continue
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self.saved_seconds += entry.get("compute_seconds", 0.0)
+                return {**entry, "similarity": float(sims[slot])}
+
+            self.misses += 1
+            return None
+
+    def store(
+        self, embedding, value: Any, compute_seconds: float = 0.0, created_at: Optional[float] = None, **metadata
+    ) -> str:
+        """
+        Caches `value` for a query embedding and returns the entry key. A query within
+        the threshold of an existing entry replaces that entry rather than adding a near-duplicate.
+        `created_at` backdates an entry restored from elsewhere so it expires on its original schedule.
+        """
+        vector = _unit(embedding)
+        with self._lock:
+            self._check_version()
+            if self._matrix is None:
+                self._matrix = np.zeros((self.max_entries, len(vector)), dtype=np.float32)
+
+            if self._entries:
+                sims = self._matrix @ vector
+                sims[~self._valid] = -np.inf
+                slot = int(np.argmax(sims))
+                if sims[slot] >= self.threshold:
+                    self._remove(self._slot_keys[slot])
+
+            while not self._free_slots:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+            slot = self._free_slots.pop()
+            key = uuid.uuid4().hex
+            self._matrix[slot] = vector
+            self._valid[slot] = True
+            self._slot_keys[slot] = key
+            self._entries[key] = {
+                "key": key,
+                "slot": slot,
+                "value": value,
+                "created_at": created_at if created_at is not None else time.time(),
+                "compute_seconds": compute_seconds,
+                **metadata,
+            }
+            return key
+
+    def invalidate(self) -> None:
+        """Drops every entry (e.g. after the knowledge base was re-imported)."""
+        with self._lock:
+            self._clear()
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        """Returns hit/miss counters, the hit rate and the time saved by hits."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "saved_seconds": self.saved_seconds,
+            }
+
+    # --- Helpers (called with the lock held) ---
+
+    def _check_version(self) -> None:
+        if self._version_fn is None:
+            return
+        version = self._version_fn()
+        if self._version is not None and version != self._version and self._entries:
+            self._clear()
+            self.invalidations += 1
+        self._version = version
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._valid[entry["slot"]] = False
+        self._slot_keys[entry["slot"]] = None
+        self._free_slots.append(entry["slot"])
+
+    def _clear(self) -> None:
+        for key in list(self._entries):
+            self._remove(key)
+
+
+def _unit(embedding) -> np.ndarray:
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+
+def knowledge_base_version() -> str:
+    """
+    Identifies the current knowledge base: the RAG corpus and the version stamp written by
+    `scripts/setup_rag.py`, plus the local files' content hashes for the offline search.
+    """
+    kb_dir = os.getenv("KNOWLEDGE_BASE_DIR") or str(DEFAULT_KNOWLEDGE_BASE_DIR)
+    return ":".join(
+        [
+            os.getenv("RAG_CORPUS_NAME", ""),
+            os.getenv("KB_CORPUS_VERSION", ""),
+            str(knowledge_base_fingerprint(kb_dir)),
+        ]
+    )
+
+
+_kb_query_cache: Optional[SemanticCache] = None
+_kb_query_cache_lock = threading.Lock()
+
+
+def get_kb_query_cache() -> Optional[SemanticCache]:
+    """Returns the process-wide knowledge retrieval cache, or None if it is disabled."""
+    global _kb_query_cache
+    if os.getenv("KB_QUERY_CACHE_ENABLED", "true").lower() in ("0", "false", "no"):
+        return None
+    with _kb_query_cache_lock:
+        if _kb_query_cache is None:
+            _kb_query_cache = SemanticCache(
+                threshold=float(os.getenv("KB_QUERY_CACHE_THRESHOLD", "0.95")),
+                max_entries=int(os.getenv("KB_QUERY_CACHE_SIZE", "256")),
+                ttl_seconds=float(os.getenv("KB_QUERY_CACHE_TTL_SECONDS", "3600")),
+                version=knowledge_base_version,
+            )
+        return _kb_query_cache
+
+
+def invalidate_kb_query_cache() -> None:
+    """Drops all cached knowledge retrieval results."""
+    cache = get_kb_query_cache()
+    if cache is not None:
+        cache.invalidate()
+
+
+def kb_query_cache_stats() -> dict:
+    """Hit-rate metrics of the knowledge retrieval cache (empty if it is disabled)."""
+    cache = get_kb_query_cache()
+    return cache.stats() if cache is not None else {}
@@ -0,0 +1,342 @@
+"""
+Store of resolved problem_solver answers, reused for near-identical new tickets.
+
+When a ticket is resolved by `problem_solver_agent`, its request embedding and
+`suggested_solution` are recorded together with the time the full pipeline took
+(analysis, retrieval and solution). When a new request is at least `threshold`
+similar to a recorded one, the workflow engine offers the stored answer with its
+provenance (source ticket, resolution date, similarity) before running the
+pipeline, and the developer decides whether it solves the problem.
+
+Matching runs in memory on a `SemanticCache` (LRU + TTL). Solutions and every
+offer made are also written to SQLite, so the store survives restarts and
+`scripts/solution_store_report.py` can report hit rate, acceptance rate and the
+pipeline time saved.
+
+Configuration (environment variables):
+- `SOLUTION_STORE_ENABLED`: Set to "false" to disable reuse (default "true").
+- `SOLUTION_STORE_PATH`: SQLite file. Set to an empty string to keep the store in
+  memory only. Defaults to `.cache/solution_store.sqlite3`.
+- `SOLUTION_STORE_THRESHOLD`: Minimum cosine similarity to offer a stored answer (default 0.92).
+- `SOLUTION_STORE_SIZE`: Maximum stored solutions (default 1000).
+- `SOLUTION_STORE_TTL_SECONDS`: Age after which solutions expire and logged offers
+  are deleted (default 90 days).
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Optional
+
+from ._data_tools import _get_embedding_for_query
+from ._semantic_cache import SemanticCache
+from .exceptions import EmbeddingError
+
+DEFAULT_STORE_PATH = Path(__file__).resolve().parents[2] / ".cache" / "solution_store.sqlite3"
+# Generated code is specific to the plan the developer approved, so it is never offered again.
+EXCLUDED_CATEGORIES = {"Code Generation"}
+
+
+class SolutionStore:
+    """Resolved solutions matched by request embedding, with offers and their outcome logged to SQLite."""
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        threshold: float = 0.92,
+        max_entries: int = 1000,
+        ttl_seconds: float = 90 * 24 * 3600,
+    ):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.accepted = 0
+        self.declined = 0
+        self.saved_seconds = 0.0
+
+        self._cache = SemanticCache(threshold=threshold, max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self._lock = threading.Lock()
+        self._db = self._open_disk_store(path) if path else None
+        self._load()
+
+    @staticmethod
+    def _open_disk_store(path: str) -> Optional[sqlite3.Connection]:
+        try:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(path, check_same_thread=False)
+            db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS solutions (
+                    ticket_id TEXT PRIMARY KEY,
+                    request TEXT NOT NULL,
+                    category TEXT,
+                    suggested_solution TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    compute_seconds REAL NOT NULL,
+                    resolved_at REAL NOT NULL
+                )
+                """
+            )
+            db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS offers (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    created_at REAL NOT NULL,
+                    hit INTEGER NOT NULL,
+                    source_ticket_id TEXT,
+                    similarity REAL,
+                    compute_seconds REAL,
+                    accepted INTEGER
+                )
+                """
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS idx_solutions_resolved_at ON solutions (resolved_at)")
+            db.execute("CREATE INDEX IF NOT EXISTS idx_offers_created_at ON offers (created_at)")
+            db.commit()
+            return db
+        except sqlite3.Error as e:
+            print(f"WARNING: Could not open solution store at '{path}', using memory only: {e}")
+            return None
+
+    def _load(self) -> None:
+        """Loads the live solutions from disk into the in-memory matcher, oldest first."""
+        if not self._db:
+            return
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            self._db.commit()
+        rows = self._db.execute(
+            """
+            SELECT ticket_id, request, category, suggested_solution, vector, compute_seconds, resolved_at
+            FROM solutions WHERE resolved_at >= ? ORDER BY resolved_at DESC LIMIT ?
+            """,
+            (now - self.ttl_seconds, self.max_entries),
+        ).fetchall()
+        for ticket_id, request, category, solution, vector, compute_seconds, resolved_at in reversed(rows):
+            # The TTL counts from the resolution, not from the restart.
+            self._cache.store(
+                array("f", vector).tolist(), solution, compute_seconds=compute_seconds, created_at=resolved_at,
+                ticket_id=ticket_id, request=request, category=category, resolved_at=resolved_at,
+            )
+        if rows:
+            print(f"INFO: Loaded {len(rows)} stored solutions from the solution store.")
+
+    def find(self, embedding: list[float]) -> Optional[dict]:
+        """
+        Returns the stored solution most similar to a request embedding, with its
+        `similarity` and an `offer_id` for `record_outcome`, or None below the threshold.
+        """
+        with self._lock:
+            entry = self._cache.lookup(embedding)
+            offer_id = self._log_offer(entry)
+        if entry is None:
+            return None
+        return {
+            "offer_id": offer_id,
+            "ticket_id": entry["ticket_id"],
+            "request": entry["request"],
+            "category": entry["category"],
+            "suggested_solution": entry["value"],
+            "resolved_at": entry["resolved_at"],
+            "compute_seconds": entry["compute_seconds"],
+            "similarity": entry["similarity"],
+        }
+
+    def record(
+        self,
+        embedding: list[float],
+        ticket_id: str,
+        request: str,
+        suggested_solution: str,
+        category: str = "",
+        compute_seconds: float = 0.0,
+    ) -> None:
+        """Stores the solution of a resolved ticket, replacing any near-duplicate request."""
+        now = time.time()
+        with self._lock:
+            self._cache.store(
+                embedding, suggested_solution, compute_seconds=compute_seconds, created_at=now,
+                ticket_id=ticket_id, request=request, category=category, resolved_at=now,
+            )
+            if not self._db:
+                return
+            self._db.execute(
+                """
+                INSERT OR REPLACE INTO solutions
+                    (ticket_id, request, category, suggested_solution, vector, compute_seconds, resolved_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (ticket_id, request, category, suggested_solution,
+                 array("f", embedding).tobytes(), compute_seconds, now),
+            )
+            # Expire old solutions and offers, then trim the oldest solutions beyond the size limit.
+            self._expire(now)
+            self._db.execute(
+                """
+                DELETE FROM solutions WHERE ticket_id IN (
+                    SELECT ticket_id FROM solutions ORDER BY resolved_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,),
+            )
+            self._db.commit()
+
+    def record_outcome(self, offer_id: Optional[int], accepted: bool, compute_seconds: float = 0.0) -> None:
+        """Records whether the developer accepted an offered solution; accepted offers count as time saved."""
+        with self._lock:
+            if accepted:
+                self.accepted += 1
+                self.saved_seconds += compute_seconds
+            else:
+                self.declined += 1
+            if self._db and offer_id is not None:
+                self._db.execute("UPDATE offers SET accepted = ? WHERE id = ?", (int(accepted), offer_id))
+                self._db.commit()
+
+    def stats(self) -> dict:
+        """Returns this process's lookup counters together with offer acceptance and time saved."""
+        cache_stats = self._cache.stats()
+        with self._lock:
+            offers = self.accepted + self.declined
+            return {
+                "entries": cache_stats["entries"],
+                "lookups": cache_stats["hits"] + cache_stats["misses"],
+                "hits": cache_stats["hits"],
+                "hit_rate": cache_stats["hit_rate"],
+                "evictions": cache_stats["evictions"],
+                "expirations": cache_stats["expirations"],
+                "accepted": self.accepted,
+                "declined": self.declined,
+                "acceptance_rate": self.accepted / offers if offers else 0.0,
+                "saved_seconds": self.saved_seconds,
+            }
+
+    def report(self, since: float = 0.0) -> dict:
+        """Summarizes the offers logged on disk since `since` (a Unix timestamp), across restarts."""
+        if not self._db:
+            return self.stats()
+        with self._lock:
+            lookups, hits, accepted, declined, saved, mean_similarity = self._db.execute(
+                """
+                SELECT COUNT(*), COALESCE(SUM(hit), 0),
+                       COALESCE(SUM(accepted = 1), 0), COALESCE(SUM(accepted = 0), 0),
+                       COALESCE(SUM(CASE WHEN accepted = 1 THEN compute_seconds ELSE 0 END), 0.0),
+                       AVG(CASE WHEN hit = 1 THEN similarity END)
+                FROM offers WHERE created_at >= ?
+                """,
+                (since,),
+            ).fetchone()
+            entries = self._db.execute("SELECT COUNT(*) FROM solutions").fetchone()[0]
+        answered = accepted + declined
+        return {
+            "entries": entries,
+            "lookups": lookups,
+            "hits": hits,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "mean_hit_similarity": mean_similarity or 0.0,
+            "accepted": accepted,
+            "declined": declined,
+            "acceptance_rate": accepted / answered if answered else 0.0,
+            "saved_seconds": saved,
+        }
+
+    def _expire(self, now: float) -> None:
+        """Deletes solutions and logged lookups older than the TTL; the caller commits."""
+        self._db.execute("DELETE FROM solutions WHERE resolved_at < ?", (now - self.ttl_seconds,))
+        self._db.execute("DELETE FROM offers WHERE created_at < ?", (now - self.ttl_seconds,))
+
+    def _log_offer(self, entry: Optional[dict]) -> Optional[int]:
+        if not self._db:
+            return None
+        cursor = self._db.execute(
+            "INSERT INTO offers (created_at, hit, source_ticket_id, similarity, compute_seconds) VALUES (?, ?, ?, ?, ?)",
+            (
+                time.time(),
+                int(entry is not None),
+                entry["ticket_id"] if entry else None,
+                entry["similarity"] if entry else None,
+                entry["compute_seconds"] if entry else None,
+            ),
+        )
+        self._db.commit()
+        return cursor.lastrowid
+
+
+_store: Optional[SolutionStore] = None
+_store_lock = threading.Lock()
+
+
+def get_solution_store() -> Optional[SolutionStore]:
+    """Returns the process-wide solution store, or None if reuse is disabled."""
+    global _store
+    if os.getenv("SOLUTION_STORE_ENABLED", "true").lower() in ("0", "false", "no"):
+        return None
+    with _store_lock:
+        if _store is None:
+            _store = SolutionStore(
+                path=os.getenv("SOLUTION_STORE_PATH", str(DEFAULT_STORE_PATH)),
+                threshold=float(os.getenv("SOLUTION_STORE_THRESHOLD", "0.92")),
+                max_entries=int(os.getenv("SOLUTION_STORE_SIZE", "1000")),
+                ttl_seconds=float(os.getenv("SOLUTION_STORE_TTL_SECONDS", str(90 * 24 * 3600))),
+            )
+        return _store
+
+
+def find_stored_solution(request: str) -> Optional[dict]:
+    """Looks up a stored solution for a new request. Returns None on a miss or if the request cannot be embedded."""
+    store = get_solution_store()
+    if store is None or not request.strip():
+        return None
+    try:
+        embedding = _get_embedding_for_query(request)
+    except EmbeddingError:
+        print("WARNING: Solution store lookup skipped: could not embed the request.")
+        return None
+    return store.find(embedding)
+
+
+def record_resolved_ticket(ticket: dict, compute_seconds: float = 0.0, embedding=None) -> bool:
+    """
+    Records a resolved ticket's solution for reuse. Code-generation tickets and tickets
+    that were themselves resolved with a stored solution are skipped. The request is
+    embedded unless its `embedding` is passed in.
+    """
+    store = get_solution_store()
+    category = (ticket.get("analysis") or {}).get("category", "")
+    if (
+        store is None
+        or not ticket.get("suggested_solution")
+        or ticket.get("solution_source")
+        or category in EXCLUDED_CATEGORIES
+    ):
+        return False
+    try:
+        if embedding is None:
+            embedding = _get_embedding_for_query(ticket["request"])
+    except EmbeddingError:
+        print(f"WARNING: Could not record the solution of {ticket.get('ticket_id')}: the request could not be embedded.")
+        return False
+    try:
+        store.record(
+            embedding,
+            ticket_id=ticket["ticket_id"],
+            request=ticket["request"],
+            suggested_solution=ticket["suggested_solution"],
+            category=category,
+            compute_seconds=compute_seconds,
+        )
+    except sqlite3.Error as e:
+        print(f"WARNING: Could not record the solution of {ticket['ticket_id']}: {e}")
+        return False
+    print(f"INFO: Recorded the solution of {ticket['ticket_id']} in the solution store.")
+    return True
+
+
+def solution_store_stats() -> dict:
+    """Hit-rate and time-saved metrics of the solution store (empty if it is disabled)."""
+    store = get_solution_store()
+    return store.stats() if store is not None else {}
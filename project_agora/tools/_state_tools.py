@@ -6,7 +6,12 @@ import uuid
 from google.adk.tools import ToolContext
 
 from ..entities.ticket import SupportTicket, TicketAnalysis
-from .exceptions import StateError
+from ..ticket_state import field_text, load_ticket, save_ticket, update_ticket
+from ._data_tools import _get_embedding_for_query
+from ._solution_store import get_solution_store, record_resolved_ticket
+from ._ticket_ingest import get_ticket_ingestor, ingest_resolved_ticket
+from ._tool_executor import run_blocking
+from .exceptions import EmbeddingError, StateError
 
 
 def create_ticket(request: str, tool_context: ToolContext) -> str:
@@ -18,8 +23,7 @@ def create_ticket(request: str, tool_context: ToolContext) -> str:
             request=request,
             status="New",
         )
-        ticket_json = ticket.to_json()
-        tool_context.state["ticket"] = ticket_json
+        ticket_json = save_ticket(tool_context, ticket)
         print("INFO: New developer request created via tool and state initialized.")
         return ticket_json
     except Exception as e:
@@ -39,9 +43,7 @@ def update_ticket_after_analysis(analysis_json: str, tool_context: ToolContext)
             cleaned_json = cleaned_json[:-3]
         cleaned_json = cleaned_json.strip()
 
-        # Get ticket from state
-        ticket_dict = json.loads(tool_context.state.get("ticket", "{}"))
-        if not ticket_dict:
+        if load_ticket(tool_context) is None:
             raise StateError("Request not found in state.")
 
         # Parse analysis
@@ -57,14 +59,12 @@ def update_ticket_after_analysis(analysis_json: str, tool_context: ToolContext)
             }
             print(f"WARNING: Could not parse analysis JSON: {cleaned_json[:200]}")
 
-        # Update ticket
-        ticket_dict["analysis"] = TicketAnalysis(**analysis_data).model_dump()
-        ticket_dict["status"] = "Analyzing"
-        ticket_dict["resolution_history"].append(f"Analysis completed: {analysis_data.get('category', 'Unknown')}")
-
-        # Save to state
-        updated_ticket_json = json.dumps(ticket_dict, indent=2)
-        tool_context.state["ticket"] = updated_ticket_json
+        update_ticket(
+            tool_context,
+            note=f"Analysis completed: {analysis_data.get('category', 'Unknown')}",
+            analysis=TicketAnalysis(**analysis_data),
+            status="Analyzing",
+        )
 
         print(f"INFO: Ticket status updated to 'Analyzing'. Category: {analysis_data.get('category')}")
         return f"Ticket updated successfully. Status: Analyzing. Category: {analysis_data.get('category')}"
@@ -76,23 +76,35 @@ def update_ticket_after_analysis(analysis_json: str, tool_context: ToolContext)
 
 
 def update_ticket_after_retrieval(
-    kb_results: str, db_results: str, tool_context: ToolContext
+    tool_context: ToolContext, kb_results: str = "", db_results: str = ""
 ) -> str:
-    """Updates the ticket after knowledge retrieval and sets status to AwaitingContextConfirmation."""
+    """
+    Updates the ticket after knowledge retrieval and sets status to AwaitingContextConfirmation.
+    Results not passed explicitly are read from the `kb_retrieval_results` and
+    `db_retrieval_results` state keys written by the retrieval agents.
+    """
     try:
-        ticket_dict = json.loads(tool_context.state.get("ticket", "{}"))
-        if not ticket_dict:
+        kb_results = kb_results or tool_context.state.get("kb_retrieval_results", "")
+        db_results = db_results or tool_context.state.get("db_retrieval_results", "")
+
+        if load_ticket(tool_context) is None:
             raise StateError("Ticket not found in state.")
 
-        # Store retrieval results
-        ticket_dict["retrieved_kb_docs"] = kb_results
-        ticket_dict["retrieved_db_tickets"] = db_results
-        ticket_dict["status"] = "AwaitingContextConfirmation"
-        ticket_dict["resolution_history"].append("Retrieval completed - awaiting user confirmation")
+        ticket = update_ticket(
+            tool_context,
+            note="Retrieval completed - awaiting user confirmation",
+            retrieved_kb_docs=kb_results,
+            retrieved_db_tickets=db_results,
+            status="AwaitingContextConfirmation",
+        )
 
-        # Save to state
-        updated_ticket_json = json.dumps(ticket_dict, indent=2)
-        tool_context.state["ticket"] = updated_ticket_json
+        # Offloaded results live in the blob store; keep only their summaries in the session state.
+        for state_key, field in (
+            ("kb_retrieval_results", "retrieved_kb_docs"),
+            ("db_retrieval_results", "retrieved_db_tickets"),
+        ):
+            if field in ticket.blob_refs and tool_context.state.get(state_key):
+                tool_context.state[state_key] = getattr(ticket, field)
 
         print("INFO: Ticket status updated to 'AwaitingContextConfirmation'.")
         return "Ticket updated successfully. Status: AwaitingContextConfirmation. Ready for user confirmation."
@@ -100,4 +112,64 @@ def update_ticket_after_retrieval(
     except Exception as e:
         error_msg = f"Error updating ticket after retrieval: {e}"
         print(f"ERROR: {error_msg}")
-        raise StateError(error_msg) 
\ No newline at end of file
+        raise StateError(error_msg)
+
+
+async def update_ticket_status(
+    status: str,
+    tool_context: ToolContext,
+    note: str = "",
+    suggested_solution: str = "",
+    solution_source: str = "",
+) -> str:
+    """
+    Sets the ticket status (e.g. 'Pending Solution', 'AwaitingPlanApproval', 'Resolved'),
+    optionally recording the suggested solution and a note in the resolution history.
+    `solution_source` is the ID of the earlier ticket whose stored solution was reused.
+    Resolved tickets with a fresh solution are recorded in the solution store and
+    queued for the historical ticket search, on the tool thread pool.
+    """
+    try:
+        if load_ticket(tool_context) is None:
+            raise StateError("Ticket not found in state.")
+
+        fields = {"status": status}
+        if suggested_solution:
+            fields["suggested_solution"] = suggested_solution
+        if solution_source:
+            fields["solution_source"] = solution_source
+        ticket = update_ticket(tool_context, note=note or f"Status changed to {status}", **fields)
+
+        if status == "Resolved":
+            resolved = {**ticket.model_dump(), "suggested_solution": field_text(ticket, "suggested_solution")}
+            # `pipeline_seconds` is the analysis, retrieval and solution time the workflow engine measured.
+            await run_blocking(
+                _record_resolved_ticket, resolved, tool_context.state.get("pipeline_seconds", 0.0)
+            )
+
+        print(f"INFO: Ticket status updated to '{status}'.")
+        return f"Ticket updated successfully. Status: {status}."
+
+    except Exception as e:
+        error_msg = f"Error updating ticket status: {e}"
+        print(f"ERROR: {error_msg}")
+        raise StateError(error_msg)
+
+
+def _record_resolved_ticket(ticket: dict, compute_seconds: float) -> None:
+    """
+    Records a resolved ticket in the solution store and queues it for the historical
+    ticket search. Blocking (embedding, fsynced log append, SQLite commit), and the
+    request is embedded once for both.
+    """
+    if not ticket.get("suggested_solution") or ticket.get("solution_source"):
+        return
+    if get_solution_store() is None and get_ticket_ingestor() is None:
+        return
+    try:
+        embedding = _get_embedding_for_query(ticket["request"])
+    except EmbeddingError:
+        print(f"WARNING: Could not record {ticket.get('ticket_id')}: the request could not be embedded.")
+        return
+    record_resolved_ticket(ticket, compute_seconds=compute_seconds, embedding=embedding)
+    ingest_resolved_ticket(ticket, embedding=embedding)
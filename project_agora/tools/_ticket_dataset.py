@@ -0,0 +1,272 @@
+"""
+Compact binary format for the resolved-tickets dataset.
+
+A dataset is a directory holding:
+
+- `embeddings.npy`: an (N, dim) matrix stored as float32, float16 or int8,
+  memory-mapped on load so consumers read it without copying or parsing.
+- `scales.npy`: per-row float32 scales, only present for int8 (value = q * scale).
+- `metadata.jsonl`: one JSON object per ticket, in the same order as the rows.
+- `manifest.json`: format name and version, dtype, shape, embedding model and
+  whether the rows are already unit-normalized.
+
+`manifest.json` is written last, so a reader never sees a half-written dataset
+as valid. `append_ticket_dataset` adds rows the same way: rows and metadata lines
+beyond the manifest's `count` belong to an unfinished append and are ignored.
+"""
+
+import csv
+import json
+import os
+from pathlib import Path
+from typing import Iterator, Optional
+
+import numpy as np
+
+from .exceptions import VectorStoreError
+
+FORMAT_NAME = "agora-ticket-dataset"
+FORMAT_VERSION = 1
+SUPPORTED_DTYPES = ("float32", "float16", "int8")
+METADATA_FIELDS = ("ticket_id", "customer_id", "request", "category", "suggested_solution")
+
+DEFAULT_DATASET_PATH = Path(__file__).resolve().parents[2] / "data" / "resolved_tickets"
+
+
+class TicketDataset:
+    """A loaded ticket dataset: ticket metadata plus a (possibly memory-mapped) embedding matrix."""
+
+    def __init__(self, tickets: list[dict], embeddings: np.ndarray, manifest: dict, scales: Optional[np.ndarray] = None):
+        self.tickets = tickets
+        self.embeddings = embeddings
+        self.manifest = manifest
+        self.scales = scales
+
+    def __len__(self) -> int:
+        return len(self.tickets)
+
+    @property
+    def normalized(self) -> bool:
+        return bool(self.manifest.get("normalized"))
+
+    def vectors(self) -> np.ndarray:
+        """Returns the embeddings as float32, without copying when they are stored as float32."""
+        if self.embeddings.dtype == np.float32:
+            return self.embeddings
+        if self.scales is not None:
+            return self.embeddings.astype(np.float32) * self.scales[:, None]
+        return self.embeddings.astype(np.float32)
+
+    def iter_rows(self) -> Iterator[dict]:
+        """Yields each ticket with its `request_embedding` as a list of floats, one row at a time."""
+        for i, ticket in enumerate(self.tickets):
+            row = self.embeddings[i].astype(np.float32)
+            if self.scales is not None:
+                row = row * self.scales[i]
+            yield {**ticket, "request_embedding": row.tolist()}
+
+
+def write_ticket_dataset(
+    path: str,
+    tickets: list[dict],
+    embeddings,
+    dtype: str = "float16",
+    embedding_model: str = "text-embedding-004",
+) -> str:
+    """Writes tickets and their embeddings to `path` in the binary dataset format."""
+    if dtype not in SUPPORTED_DTYPES:
+        raise VectorStoreError(f"Unsupported dataset dtype '{dtype}'. Expected one of {SUPPORTED_DTYPES}.")
+
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    if matrix.ndim != 2 or matrix.shape[0] != len(tickets):
+        raise VectorStoreError(f"Embedding matrix shape {matrix.shape} does not match {len(tickets)} tickets.")
+
+    out_dir = Path(path)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    norms = np.linalg.norm(matrix, axis=1)
+    stored, scales = _encode_rows(matrix, dtype)
+    if scales is not None:
+        _atomic_save_npy(out_dir / "scales.npy", scales)
+    elif (out_dir / "scales.npy").exists():
+        (out_dir / "scales.npy").unlink()
+    _atomic_save_npy(out_dir / "embeddings.npy", stored)
+
+    metadata_tmp = out_dir / "metadata.jsonl.tmp"
+    with open(metadata_tmp, "w", encoding="utf-8") as f:
+        for ticket in tickets:
+            f.write(json.dumps({field: ticket.get(field) for field in METADATA_FIELDS}) + "\n")
+    os.replace(metadata_tmp, out_dir / "metadata.jsonl")
+
+    manifest = {
+        "format": FORMAT_NAME,
+        "version": FORMAT_VERSION,
+        "dtype": dtype,
+        "count": int(matrix.shape[0]),
+        "dim": int(matrix.shape[1]),
+        "embedding_model": embedding_model,
+        "normalized": bool(np.allclose(norms, 1.0, atol=1e-3)),
+    }
+    _write_manifest(out_dir, manifest)
+
+    print(f"INFO: Wrote {manifest['count']} tickets ({dtype}) to '{out_dir}'.")
+    return str(out_dir)
+
+
+def append_ticket_dataset(path: str, tickets: list[dict], embeddings) -> int:
+    """
+    Appends tickets to an existing dataset in its stored dtype and returns the new count.
+
+    The embedding files are rewritten with the new rows and the metadata lines are
+    appended before the manifest is updated, so a crash leaves the dataset at its
+    previous count.
+    """
+    dataset = load_ticket_dataset(path)
+    manifest = dict(dataset.manifest)
+    matrix = np.asarray(embeddings, dtype=np.float32).reshape(len(tickets), -1)
+    if matrix.shape[1] != manifest["dim"]:
+        raise VectorStoreError(f"Expected embeddings of dimension {manifest['dim']}, got {matrix.shape[1]}.")
+    if not tickets:
+        return manifest["count"]
+
+    dataset_dir = Path(path)
+    if manifest["normalized"]:
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        matrix = matrix / norms
+    stored, scales = _encode_rows(matrix, manifest["dtype"])
+    if scales is not None:
+        _atomic_save_npy(dataset_dir / "scales.npy", np.concatenate([dataset.scales, scales]))
+    _atomic_save_npy(dataset_dir / "embeddings.npy", np.concatenate([dataset.embeddings, stored]))
+
+    # Drop metadata lines left behind by an unfinished append before adding the new ones.
+    with open(dataset_dir / "metadata.jsonl", "r+b") as f:
+        for _ in range(manifest["count"]):
+            f.readline()
+        f.truncate(f.tell())
+        f.seek(0, os.SEEK_END)
+        for ticket in tickets:
+            f.write((json.dumps({field: ticket.get(field) for field in METADATA_FIELDS}) + "\n").encode("utf-8"))
+        f.flush()
+        os.fsync(f.fileno())
+
+    manifest["count"] += len(tickets)
+    _write_manifest(dataset_dir, manifest)
+    return manifest["count"]
+
+
+def load_ticket_dataset(path: str, mmap: bool = True) -> TicketDataset:
+    """Loads a dataset written by `write_ticket_dataset`, memory-mapping the embeddings."""
+    dataset_dir = Path(path)
+    manifest_path = dataset_dir / "manifest.json"
+    if not manifest_path.exists():
+        raise VectorStoreError(f"No ticket dataset manifest found at '{manifest_path}'.")
+
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != FORMAT_NAME or manifest.get("version") != FORMAT_VERSION:
+        raise VectorStoreError(
+            f"Unsupported ticket dataset '{manifest.get('format')}' version {manifest.get('version')}."
+        )
+
+    mmap_mode = "r" if mmap else None
+    embeddings = np.load(dataset_dir / "embeddings.npy", mmap_mode=mmap_mode)
+    scales = np.load(dataset_dir / "scales.npy") if manifest["dtype"] == "int8" else None
+
+    with open(dataset_dir / "metadata.jsonl", "r", encoding="utf-8") as f:
+        tickets = [json.loads(line) for line in f if line.strip()]
+
+    count = manifest["count"]
+    if embeddings.ndim != 2 or embeddings.shape[1] != manifest["dim"] or min(len(embeddings), len(tickets)) < count:
+        raise VectorStoreError(f"Ticket dataset at '{dataset_dir}' does not match its manifest.")
+
+    if scales is not None:
+        scales = scales[:count]
+    return TicketDataset(tickets[:count], embeddings[:count], manifest, scales)
+
+
+def read_tickets_csv(csv_filepath: str) -> tuple[list[dict], list[list[float]]]:
+    """Reads the CSV written by `scripts/create_mock_db.py` into tickets and embeddings."""
+    tickets, embeddings = [], []
+    with open(csv_filepath, "r", encoding="utf-8", newline="") as source_file:
+        for row in csv.DictReader(source_file):
+            try:
+                embeddings.append(json.loads(row["request_embedding"]))
+            except (json.JSONDecodeError, TypeError, KeyError) as e:
+                print(f"WARN: Could not parse embedding for ticket {row.get('ticket_id')}. Skipping. Error: {e}")
+                continue
+            tickets.append({field: row.get(field) for field in METADATA_FIELDS})
+    return tickets, embeddings
+
+
+def convert_csv_to_dataset(csv_filepath: str, path: str, dtype: str = "float16") -> TicketDataset:
+    """Converts the legacy CSV (embeddings as JSON text) into the binary dataset format."""
+    tickets, embeddings = read_tickets_csv(csv_filepath)
+    write_ticket_dataset(path, tickets, embeddings, dtype=dtype)
+    return load_ticket_dataset(path)
+
+
+def verify_round_trip(csv_filepath: str, path: str, top_k: int = 3) -> dict:
+    """
+    Compares a binary dataset against the CSV it was converted from.
+
+    Reports the largest absolute element error, the lowest cosine similarity
+    between an original and a decoded row, and the fraction of tickets whose
+    top-k neighbours (using every ticket as a query) are unchanged.
+    """
+    tickets, embeddings = read_tickets_csv(csv_filepath)
+    dataset = load_ticket_dataset(path)
+    if [t["ticket_id"] for t in tickets] != [t["ticket_id"] for t in dataset.tickets]:
+        raise VectorStoreError("Ticket order differs between the CSV and the binary dataset.")
+
+    original = np.asarray(embeddings, dtype=np.float32)
+    decoded = np.asarray(dataset.vectors(), dtype=np.float32)
+
+    def _unit(m):
+        norms = np.linalg.norm(m, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return m / norms
+
+    original_unit, decoded_unit = _unit(original), _unit(decoded)
+    k = min(top_k, len(tickets))
+    original_top = np.argsort(-(original_unit @ original_unit.T), axis=1, kind="stable")[:, :k]
+    decoded_top = np.argsort(-(decoded_unit @ decoded_unit.T), axis=1, kind="stable")[:, :k]
+    agreement = np.mean([set(a) == set(b) for a, b in zip(original_top, decoded_top)]) if len(tickets) else 1.0
+
+    return {
+        "dtype": dataset.manifest["dtype"],
+        "tickets": len(tickets),
+        "bytes_on_disk": sum(p.stat().st_size for p in Path(path).iterdir() if p.is_file()),
+        "bytes_csv": os.path.getsize(csv_filepath),
+        "max_abs_error": float(np.abs(original - decoded).max()) if len(tickets) else 0.0,
+        "min_cosine_similarity": float(np.min(np.sum(original_unit * decoded_unit, axis=1))) if len(tickets) else 1.0,
+        f"top{k}_agreement": float(agreement),
+    }
+
+
+def _encode_rows(matrix: np.ndarray, dtype: str) -> tuple[np.ndarray, Optional[np.ndarray]]:
+    """Returns the rows in the stored dtype, plus their scales for int8."""
+    if dtype != "int8":
+        return matrix.astype(dtype), None
+    # Symmetric per-row quantization: the largest magnitude in each row maps to 127.
+    scales = np.abs(matrix).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    return np.round(matrix / scales[:, None]).astype(np.int8), scales.astype(np.float32)
+
+
+def _write_manifest(dataset_dir: Path, manifest: dict) -> None:
+    manifest_tmp = dataset_dir / "manifest.json.tmp"
+    with open(manifest_tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(manifest_tmp, dataset_dir / "manifest.json")
+
+
+def _atomic_save_npy(path: Path, array: np.ndarray) -> None:
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        np.save(f, array)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
@@ -0,0 +1,255 @@
+"""
+Online ingestion of resolved tickets into the historical ticket search.
+
+When a ticket is resolved, its request, category, solution and request
+embedding are appended to the write-ahead log (`_ticket_wal.py`) before the tool
+returns. A background merger thread wakes up on every append, or every
+`TICKET_INGEST_INTERVAL_SECONDS`, and adds the new records to the live search
+backend with `add_tickets`. `search_resolved_tickets_db` finds a resolved ticket
+within about one interval, and nothing is reloaded.
+
+The `bigquery` backend appends each merge to the shared table with a load job,
+so it only ingests with `TICKET_INGEST_BIGQUERY=true`. The checkpoint is
+advanced as soon as the job succeeds: the table is the durable copy, so a
+restart does not append the same tickets again.
+
+Once the log holds `TICKET_INGEST_COMPACT_AFTER` records, the merger compacts
+it: for the `local`/`hnsw` backends loading a dataset directory, the merged
+records are appended to the binary dataset and the checkpoint is advanced. The
+records at or below the checkpoint are then removed from the log. With a CSV or `bq://` source the log is never compacted and is
+replayed on every start; convert the CSV with `scripts/convert_resolved_tickets.py`
+to enable compaction.
+
+Code-generation tickets are not ingested: their solution is code written for the
+plan the developer approved, not an answer to a support question.
+
+Recovery: a torn last record is discarded when the log is opened, and the local
+backends replay every record past the checkpoint when they are built, skipping
+tickets the loaded data already holds.
+
+Configuration (environment variables):
+- `TICKET_INGEST_ENABLED`: Set to "true" to enable online ingestion (default "false").
+- `TICKET_INGEST_BIGQUERY`: Set to "true" to also ingest when `TICKET_SEARCH_BACKEND`
+  is `bigquery`, appending resolved tickets to the shared table (default "false").
+- `TICKET_INGEST_WAL_PATH`: The log file (default `.cache/resolved_tickets_wal.log`).
+- `TICKET_INGEST_INTERVAL_SECONDS`: Longest wait between merges (default 2).
+- `TICKET_INGEST_COMPACT_AFTER`: Merged records that trigger a compaction (default 500).
+"""
+
+import os
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+
+from ._data_tools import _get_embedding_for_query
+from ._solution_store import EXCLUDED_CATEGORIES
+from ._ticket_dataset import append_ticket_dataset, load_ticket_dataset
+from ._ticket_wal import TicketWriteAheadLog, get_ticket_wal, record_embedding, reset_ticket_wal
+from ._vector_store import get_ticket_search_backend, ticket_search_backend_name, ticket_search_source
+from .exceptions import EmbeddingError
+
+
+class TicketIngestor:
+    """Merges the resolved-ticket log into the live search backend and compacts it."""
+
+    def __init__(self, wal: TicketWriteAheadLog, interval_seconds: float = 2.0, compact_after: int = 500):
+        self.wal = wal
+        self.interval_seconds = interval_seconds
+        self.compact_after = compact_after
+        self.merged = 0
+        self.compactions = 0
+        self.last_merge_seconds = 0.0
+        self._offset = 0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._compaction_skipped = False
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="ticket-ingest-merger", daemon=True)
+                self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Stops the merger after a final merge."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def submit(self, ticket: dict, embedding) -> Optional[int]:
+        """Logs a resolved ticket and wakes the merger. Returns its sequence number, or None if it was logged before."""
+        seq = self.wal.append(ticket, embedding)
+        self.start()
+        self._wake.set()
+        return seq
+
+    def merge(self) -> int:
+        """Adds the logged tickets the backend does not hold yet and returns how many were added."""
+        backend = get_ticket_search_backend()
+        started = time.perf_counter()
+        records, end = [], self._offset
+        for record, offset in self.wal.read(after_seq=backend.wal_seq, offset=self._offset):
+            records.append(record)
+            end = offset
+        if not records:
+            return 0
+
+        backend.add_tickets(records, np.stack([record_embedding(r) for r in records]))
+        backend.wal_seq = records[-1]["seq"]
+        if backend.persists_added_tickets:
+            self.wal.commit_checkpoint(backend.wal_seq)
+        self._offset = end
+        self.merged += len(records)
+        self.last_merge_seconds = time.perf_counter() - started
+        print(
+            f"INFO: Merged {len(records)} resolved tickets into the '{backend.name}' backend "
+            f"in {self.last_merge_seconds * 1000:.0f} ms."
+        )
+        return len(records)
+
+    def compact(self) -> bool:
+        """Folds the merged records into the base data, then checkpoints and truncates the log."""
+        backend = get_ticket_search_backend()
+        if not backend.persists_added_tickets:
+            records = [r for r, _ in self.wal.read(after_seq=self.wal.checkpoint) if r["seq"] <= backend.wal_seq]
+            if not records:
+                return False
+            source = ticket_search_source()
+            if not os.path.isdir(source):
+                if not self._compaction_skipped:
+                    print(f"INFO: Not compacting '{self.wal.path}': '{source}' is not a ticket dataset directory.")
+                    self._compaction_skipped = True
+                return False
+            # A crash after an earlier append but before its checkpoint leaves some tickets in both.
+            known = {t["ticket_id"] for t in load_ticket_dataset(source).tickets}
+            new = [r for r in records if r["ticket_id"] not in known]
+            if new:
+                count = append_ticket_dataset(source, new, np.stack([record_embedding(r) for r in new]))
+                print(f"INFO: Appended {len(new)} resolved tickets to '{source}' ({count} tickets).")
+            self.wal.commit_checkpoint(records[-1]["seq"])
+        elif self.wal.record_count == self.wal.last_seq - self.wal.checkpoint:
+            # Every record in the log is still waiting for its load job.
+            return False
+
+        removed = self.wal.truncate()
+        # The log was rewritten, so the next merge reads it from the start.
+        self._offset = 0
+        self.compactions += 1
+        backend.save()
+        print(f"INFO: Compacted '{self.wal.path}' up to record {self.wal.checkpoint} ({removed} bytes freed).")
+        return True
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.interval_seconds)
+            self._wake.clear()
+            try:
+                self.merge()
+                if self.wal.record_count >= self.compact_after:
+                    self.compact()
+            except Exception as e:
+                # The records stay in the log and are retried on the next wake-up.
+                print(f"WARNING: Resolved-ticket ingestion failed, retrying: {e}")
+            if self._stop.is_set():
+                return
+
+    def stats(self) -> dict:
+        return {
+            "logged": self.wal.last_seq,
+            "merged": self.merged,
+            "wal_records": self.wal.record_count,
+            "compactions": self.compactions,
+            "wal_bytes": self.wal.size_bytes(),
+            "last_merge_ms": self.last_merge_seconds * 1000,
+        }
+
+
+_ingestor: Optional[TicketIngestor] = None
+_ingestor_lock = threading.Lock()
+_bigquery_writes_refused = False
+
+
+def bigquery_ingest_enabled() -> bool:
+    return os.getenv("TICKET_INGEST_BIGQUERY", "false").lower() in ("1", "true", "yes")
+
+
+def get_ticket_ingestor() -> Optional[TicketIngestor]:
+    """
+    Returns the process-wide ingestor, or None if online ingestion is disabled or
+    would write to BigQuery without `TICKET_INGEST_BIGQUERY`.
+    """
+    global _ingestor, _bigquery_writes_refused
+    wal = get_ticket_wal()
+    if wal is None:
+        return None
+    if ticket_search_backend_name() == "bigquery" and not bigquery_ingest_enabled():
+        if not _bigquery_writes_refused:
+            print(
+                "WARN: Not ingesting resolved tickets: the 'bigquery' backend would append them to the shared "
+                "table. Set TICKET_INGEST_BIGQUERY=true to allow it."
+            )
+            _bigquery_writes_refused = True
+        return None
+    with _ingestor_lock:
+        if _ingestor is None:
+            _ingestor = TicketIngestor(
+                wal,
+                interval_seconds=float(os.getenv("TICKET_INGEST_INTERVAL_SECONDS", "2")),
+                compact_after=int(os.getenv("TICKET_INGEST_COMPACT_AFTER", "500")),
+            )
+        return _ingestor
+
+
+def reset_ticket_ingestor() -> None:
+    """Stops the merger and drops the ingestor and its log, e.g. to simulate a restart."""
+    global _ingestor
+    with _ingestor_lock:
+        if _ingestor is not None:
+            _ingestor.stop()
+        _ingestor = None
+    reset_ticket_wal()
+
+
+def ingest_resolved_ticket(ticket: dict, embedding=None) -> bool:
+    """
+    Queues a resolved ticket for the historical ticket search. Code-generation
+    tickets and tickets resolved with a stored solution are skipped; the source
+    ticket of the latter is already searchable. The request is embedded unless its
+    `embedding` is passed in.
+    """
+    ingestor = get_ticket_ingestor()
+    category = (ticket.get("analysis") or {}).get("category")
+    if (
+        ingestor is None
+        or not ticket.get("suggested_solution")
+        or ticket.get("solution_source")
+        or category in EXCLUDED_CATEGORIES
+    ):
+        return False
+    try:
+        if embedding is None:
+            embedding = _get_embedding_for_query(ticket["request"])
+    except EmbeddingError:
+        print(f"WARNING: Could not ingest {ticket.get('ticket_id')}: the request could not be embedded.")
+        return False
+    row = {**ticket, "category": category}
+    try:
+        seq = ingestor.submit(row, embedding)
+    except OSError as e:
+        print(f"WARNING: Could not log {ticket['ticket_id']} for ingestion: {e}")
+        return False
+    if seq is not None:
+        print(f"INFO: Logged {ticket['ticket_id']} for the historical ticket search (record {seq}).")
+    return seq is not None
+
+
+def ticket_ingest_stats() -> dict:
+    """Merge and compaction counters of the online ingestion (empty if it is disabled)."""
+    ingestor = get_ticket_ingestor()
+    return ingestor.stats() if ingestor is not None else {}
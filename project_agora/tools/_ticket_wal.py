@@ -0,0 +1,202 @@
+"""
+Write-ahead log of resolved tickets waiting to be folded into the historical index.
+
+Each record is one line: the CRC-32 of the JSON payload, a tab, and the payload
+(`seq`, the ticket fields in `METADATA_FIELDS` and the float32 request embedding
+encoded as base64). `append` flushes and fsyncs the line before returning, so a
+ticket that was reported as ingested survives a crash.
+
+On open, a torn or corrupt tail (a crash in the middle of a write) is cut off at
+the last valid record. `<log>.checkpoint.json` holds the highest `seq`
+already folded into the base data (the binary dataset or the BigQuery table).
+Records at or below it are skipped when the log is replayed, and `truncate`
+removes them from the log. `record_count` is the number of records still in the
+file, folded or not.
+"""
+
+import base64
+import json
+import os
+import threading
+import zlib
+from pathlib import Path
+from typing import Iterator, Optional
+
+import numpy as np
+
+from ._ticket_dataset import METADATA_FIELDS
+
+DEFAULT_WAL_PATH = Path(__file__).resolve().parents[2] / ".cache" / "resolved_tickets_wal.log"
+
+
+def _encode_record(record: dict) -> bytes:
+    payload = json.dumps(record, separators=(",", ":")).encode("utf-8")
+    return b"%08x\t%s\n" % (zlib.crc32(payload), payload)
+
+
+def _decode_line(line: bytes) -> Optional[dict]:
+    """Returns the record of a complete line, or None if the line is torn or corrupt."""
+    if not line.endswith(b"\n"):
+        return None
+    checksum, _, payload = line.rstrip(b"\n").partition(b"\t")
+    try:
+        if int(checksum, 16) != zlib.crc32(payload):
+            return None
+        return json.loads(payload)
+    except ValueError:
+        return None
+
+
+def record_embedding(record: dict) -> np.ndarray:
+    """Decodes the float32 request embedding of a log record."""
+    return np.frombuffer(base64.b64decode(record["embedding"]), dtype=np.float32)
+
+
+class TicketWriteAheadLog:
+    """An append-only, fsynced log of resolved tickets with a separate checkpoint."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.checkpoint_path = self.path.with_name(self.path.name + ".checkpoint.json")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.checkpoint = self._read_checkpoint()
+        self.last_seq = self.checkpoint
+        self.record_count = 0
+        self.ticket_ids: set[str] = set()
+        self._recover()
+
+    def _read_checkpoint(self) -> int:
+        try:
+            with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+                return int(json.load(f)["seq"])
+        except FileNotFoundError:
+            return 0
+        except (OSError, ValueError, KeyError) as e:
+            # A missing checkpoint only causes a replay; duplicates are skipped by ticket ID.
+            print(f"WARN: Could not read WAL checkpoint '{self.checkpoint_path}', replaying the whole log: {e}")
+            return 0
+
+    def _recover(self) -> None:
+        """Scans the log, cutting off a torn tail, and restores the last sequence number."""
+        if not self.path.exists():
+            return
+        valid_bytes = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                record = _decode_line(line)
+                if record is None:
+                    break
+                valid_bytes += len(line)
+                self.record_count += 1
+                self.last_seq = max(self.last_seq, record["seq"])
+                self.ticket_ids.add(record["ticket_id"])
+        size = self.path.stat().st_size
+        if valid_bytes < size:
+            print(f"WARN: Discarding {size - valid_bytes} bytes of a torn record at the end of '{self.path}'.")
+            with open(self.path, "r+b") as f:
+                f.truncate(valid_bytes)
+                os.fsync(f.fileno())
+
+    def append(self, ticket: dict, embedding) -> Optional[int]:
+        """
+        Durably appends a resolved ticket and returns its sequence number, or None if
+        the ticket is already in the log.
+        """
+        vector = np.asarray(embedding, dtype=np.float32)
+        with self._lock:
+            if ticket["ticket_id"] in self.ticket_ids:
+                return None
+            record = {
+                "seq": self.last_seq + 1,
+                **{field: ticket.get(field) for field in METADATA_FIELDS},
+                "embedding": base64.b64encode(vector.tobytes()).decode("ascii"),
+            }
+            with open(self.path, "ab") as f:
+                f.write(_encode_record(record))
+                f.flush()
+                os.fsync(f.fileno())
+            self.last_seq = record["seq"]
+            self.record_count += 1
+            self.ticket_ids.add(ticket["ticket_id"])
+            return record["seq"]
+
+    def read(self, after_seq: int = 0, offset: int = 0) -> Iterator[tuple[dict, int]]:
+        """
+        Yields (record, end offset) for every valid record with `seq > after_seq`,
+        starting at byte `offset` (the end offset of a record read earlier).
+        """
+        if not self.path.exists():
+            return
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            position = offset
+            for line in f:
+                record = _decode_line(line)
+                if record is None:
+                    # Only a write still in progress can be incomplete once the log is open.
+                    return
+                position += len(line)
+                if record["seq"] > after_seq:
+                    yield record, position
+
+    def pending(self) -> list[dict]:
+        """Returns the records not yet folded into the base data."""
+        return [record for record, _ in self.read(after_seq=self.checkpoint)]
+
+    def commit_checkpoint(self, seq: int) -> None:
+        """Records that every ticket up to `seq` is in the base data."""
+        tmp_path = self.checkpoint_path.with_name(self.checkpoint_path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"seq": seq}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
+        self.checkpoint = seq
+
+    def truncate(self) -> int:
+        """Rewrites the log without the records at or below the checkpoint. Returns the bytes removed."""
+        with self._lock:
+            if not self.path.exists():
+                return 0
+            before = self.path.stat().st_size
+            tmp_path = self.path.with_name(self.path.name + ".tmp")
+            kept = 0
+            with open(tmp_path, "wb") as f:
+                for record, _ in self.read(after_seq=self.checkpoint):
+                    f.write(_encode_record(record))
+                    kept += 1
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            self.record_count = kept
+            return before - self.path.stat().st_size
+
+    def size_bytes(self) -> int:
+        return self.path.stat().st_size if self.path.exists() else 0
+
+
+_wal: Optional[TicketWriteAheadLog] = None
+_wal_lock = threading.Lock()
+
+
+def ticket_ingest_enabled() -> bool:
+    return os.getenv("TICKET_INGEST_ENABLED", "false").lower() in ("1", "true", "yes")
+
+
+def get_ticket_wal() -> Optional[TicketWriteAheadLog]:
+    """Returns the process-wide resolved-ticket log, or None if online ingestion is disabled."""
+    global _wal
+    if not ticket_ingest_enabled():
+        return None
+    with _wal_lock:
+        if _wal is None:
+            _wal = TicketWriteAheadLog(os.getenv("TICKET_INGEST_WAL_PATH") or str(DEFAULT_WAL_PATH))
+        return _wal
+
+
+def reset_ticket_wal() -> None:
+    """Drops the process-wide log so the next use reopens (and recovers) the file."""
+    global _wal
+    with _wal_lock:
+        _wal = None
@@ -0,0 +1,13 @@
+"""
+Approximate token counting shared by the knowledge base chunker, the embedding
+request batching and the prompt cache: words and punctuation marks.
+"""
+
+import re
+
+TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def count_tokens(text: str) -> int:
+    """Approximate token count: words and punctuation marks."""
+    return len(TOKEN_RE.findall(text))
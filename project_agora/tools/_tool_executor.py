@@ -0,0 +1,77 @@
+"""
+Bounded thread pool for the blocking calls made by async tools.
+
+The BigQuery, Vertex AI and Cloud Storage clients are sync-only. Called from a
+tool on the event loop, they would stall every other session's turn while they
+wait on the network. The async tools hand those calls to `run_blocking`, which
+runs them on a process-wide pool of `TOOL_THREAD_POOL_SIZE` threads (default 16).
+Calls beyond that many wait in the pool's queue, so a burst of sessions cannot
+open an unbounded number of connections.
+
+`tool_executor_stats()` reports calls, the peak number running at once and the
+time calls spent queued.
+"""
+
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_stats = {"pool_size": 0, "calls": 0, "running": 0, "peak_running": 0, "queued_seconds": 0.0}
+
+
+def get_tool_executor() -> ThreadPoolExecutor:
+    """Returns the process-wide tool thread pool, sized by TOOL_THREAD_POOL_SIZE."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _stats["pool_size"] = int(os.getenv("TOOL_THREAD_POOL_SIZE", "16"))
+            _executor = ThreadPoolExecutor(max_workers=_stats["pool_size"], thread_name_prefix="agora-tool")
+        return _executor
+
+
+def _timed(func: Callable, submitted: float) -> Callable:
+    def call(*args, **kwargs):
+        with _stats_lock:
+            _stats["calls"] += 1
+            _stats["running"] += 1
+            _stats["peak_running"] = max(_stats["peak_running"], _stats["running"])
+            _stats["queued_seconds"] += time.perf_counter() - submitted
+        try:
+            return func(*args, **kwargs)
+        finally:
+            with _stats_lock:
+                _stats["running"] -= 1
+
+    return call
+
+
+async def run_blocking(func: Callable, *args: Any, **kwargs: Any) -> Any:
+    """Runs a blocking call on the tool thread pool and awaits its result, keeping context variables."""
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, _timed(func, time.perf_counter()), *args, **kwargs)
+    return await loop.run_in_executor(get_tool_executor(), call)
+
+
+def tool_executor_stats() -> dict:
+    with _stats_lock:
+        return dict(_stats)
+
+
+def reset_tool_executor() -> None:
+    """Shuts the pool down so the next call creates one with the current TOOL_THREAD_POOL_SIZE."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+        _executor = None
+    with _stats_lock:
+        _stats.update(pool_size=0, calls=0, running=0, peak_running=0, queued_seconds=0.0)
@@ -0,0 +1,151 @@
+"""
+Bounded, streaming reads of user-uploaded files.
+
+A user can attach a crash log of hundreds of megabytes. Only a bounded span of
+it is ever read, so memory use does not depend on the size of the file:
+
+- `open_user_file` opens the file as a seekable binary stream without reading it.
+  `gs://bucket/object` is read through a `BlobReader` that downloads
+  `GCS_READ_CHUNK_BYTES` ranges on demand. `file:///path` and plain paths are read
+  from disk, but only below `USER_FILE_ROOT`. With the variable unset, local files
+  are refused, so a model cannot read arbitrary files from the server.
+- `iter_lines` yields the lines of a byte range one chunk at a time. A line longer
+  than `max_line_bytes` is split.
+- `read_span` returns the head, the tail or a byte window of at most
+  `USER_FILE_MAX_BYTES` (default 64 KiB), cut at line boundaries, together with
+  its position in the file.
+"""
+
+import os
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional
+from urllib.parse import unquote, urlparse
+
+from google.cloud import storage
+
+READ_MODES = ("head", "tail", "window")
+CHUNK_BYTES = 64 * 1024
+# Range size of each Cloud Storage download; the BlobReader default is 40 MiB.
+GCS_READ_CHUNK_BYTES = 256 * 1024
+
+_client = None
+
+
+def _get_storage_client() -> storage.Client:
+    """Returns a process-wide Storage client, so each read reuses its connections."""
+    global _client
+    if _client is None:
+        # Assumes the client is authenticated via Application Default Credentials
+        _client = storage.Client()
+    return _client
+
+
+def max_read_bytes() -> int:
+    """The hard cap on the bytes returned by one read."""
+    return int(os.getenv("USER_FILE_MAX_BYTES", str(64 * 1024)))
+
+
+@dataclass
+class FileSpan:
+    """A span of a user file: its text and where it lies in the file."""
+
+    text: str
+    start: int
+    end: int
+    size: int
+
+    @property
+    def complete(self) -> bool:
+        return self.start == 0 and self.end == self.size
+
+
+def _local_path(file_uri: str) -> Path:
+    """Resolves a `file://` URI or plain path, refusing anything outside USER_FILE_ROOT."""
+    root = os.getenv("USER_FILE_ROOT")
+    if not root:
+        raise PermissionError("Local files cannot be read: USER_FILE_ROOT is not set.")
+    path = unquote(urlparse(file_uri).path) if file_uri.startswith("file://") else file_uri
+    resolved = Path(root, path).resolve()
+    if not resolved.is_relative_to(Path(root).resolve()):
+        raise PermissionError(f"'{file_uri}' is outside USER_FILE_ROOT.")
+    return resolved
+
+
+@contextmanager
+def open_user_file(file_uri: str) -> Iterator[tuple[BinaryIO, int]]:
+    """Opens a `gs://`, `file://` or local file and yields (binary stream, size in bytes)."""
+    if file_uri.startswith("gs://"):
+        # The URI is in the format gs://<bucket>/<object_path>
+        bucket_name, _, blob_name = file_uri[5:].partition("/")
+        blob = _get_storage_client().bucket(bucket_name).get_blob(blob_name)
+        if blob is None:
+            raise FileNotFoundError(f"No object found at '{file_uri}'.")
+        with blob.open("rb", chunk_size=GCS_READ_CHUNK_BYTES) as stream:
+            yield stream, blob.size
+    else:
+        path = _local_path(file_uri)
+        with open(path, "rb") as stream:
+            yield stream, path.stat().st_size
+
+
+def iter_lines(
+    stream: BinaryIO,
+    start: int = 0,
+    end: Optional[int] = None,
+    chunk_bytes: int = CHUNK_BYTES,
+    max_line_bytes: int = CHUNK_BYTES,
+) -> Iterator[bytes]:
+    """
+    Yields the lines (with their line endings) between byte offsets `start` and `end`.
+    Reads `chunk_bytes` at a time; a line longer than `max_line_bytes` is yielded in pieces.
+    """
+    stream.seek(start)
+    position, pending = start, b""
+    while end is None or position < end:
+        chunk = stream.read(chunk_bytes if end is None else min(chunk_bytes, end - position))
+        if not chunk:
+            break
+        position += len(chunk)
+        pending += chunk
+        lines = pending.split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line + b"\n"
+        while len(pending) > max_line_bytes:
+            yield pending[:max_line_bytes]
+            pending = pending[max_line_bytes:]
+    if pending:
+        yield pending
+
+
+def read_span(file_uri: str, mode: str = "head", max_bytes: int = 0, offset: int = 0) -> FileSpan:
+    """
+    Reads at most `max_bytes` (capped at USER_FILE_MAX_BYTES) from the start (`head`),
+    the end (`tail`) or `offset` (`window`) of a file. A line cut by the limit is
+    dropped unless it is the only one.
+    """
+    if mode not in READ_MODES:
+        raise ValueError(f"Unknown read mode '{mode}'. Expected one of {READ_MODES}.")
+    cap = max_read_bytes()
+    limit = min(max_bytes, cap) if max_bytes > 0 else cap
+
+    with open_user_file(file_uri) as (stream, size):
+        if mode == "tail":
+            start = max(size - limit, 0)
+            stream.seek(start)
+            data = stream.read(limit)
+            if start > 0 and b"\n" in data[:-1]:
+                # Skip the partial first line.
+                cut = data.index(b"\n") + 1
+                data, start = data[cut:], start + cut
+        else:
+            start = min(max(offset, 0), size) if mode == "window" else 0
+            data = bytearray()
+            for line in iter_lines(stream, start, min(start + limit, size), max_line_bytes=limit):
+                if data and not line.endswith(b"\n") and start + len(data) + len(line) < size:
+                    # The limit cut this line; stop at the previous one.
+                    break
+                data += line
+        return FileSpan(data.decode("utf-8", errors="replace"), start, start + len(data), size)
@@ -0,0 +1,644 @@
+"""Retrieval backends for the historical ticket search.
+
+`search_resolved_tickets_db` delegates the nearest-neighbour lookup to one of
+the backends below. Every backend returns the same result shape: a list of
+dicts with `ticket_id`, `request`, `category`, `suggested_solution` and the
+cosine `distance` to the query (smaller is better), ordered by distance.
+
+The backend is selected with the `TICKET_SEARCH_BACKEND` environment variable:
+
+- `bigquery` (default): a `COSINE_DISTANCE` scan over the BigQuery table, using
+  a pooled client and a result cache (see `_bigquery_pool.py`).
+- `local`: an exact in-process search over a normalized float32 matrix loaded
+  once from `RESOLVED_TICKETS_PATH`: a binary dataset directory (memory-mapped,
+  see `_ticket_dataset.py`), a CSV file, or `bq://project.dataset.table` to
+  export the BigQuery table at startup. Defaults to `data/resolved_tickets/`
+  when it exists, otherwise `data/resolved_tickets.csv`.
+  `TICKET_SEARCH_QUANTIZATION=int8|pq` keeps only quantized codes in memory
+  and re-ranks the best `TICKET_SEARCH_RERANK` candidates exactly, reading
+  their rows from disk.
+- `hnsw`: approximate search over the same data through a persisted HNSW graph
+  (`TICKET_INDEX_PATH`), with `TICKET_INDEX_EF` as the recall/latency knob.
+
+Tickets resolved since the data was loaded are added with `add_tickets` by the
+online ingestion merger (see `_ticket_ingest.py`). The local backends also
+replay the ingestion log when they are built, so a restart loses none of them.
+"""
+
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+from google.cloud import bigquery
+
+from ._ann_index import HNSWIndex
+from ._quantization import create_quantizer
+from ._bigquery_pool import (
+    bigquery_pool_stats,
+    embedding_cache_key,
+    get_bigquery_client,
+    get_query_result_cache,
+)
+from ._ticket_dataset import DEFAULT_DATASET_PATH, load_ticket_dataset, read_tickets_csv
+from ._ticket_wal import get_ticket_wal, record_embedding
+from .exceptions import BigQueryError, ConfigurationError, VectorStoreError
+
+# The columns returned for every matching ticket, in addition to `distance`.
+TICKET_RESULT_FIELDS = ("ticket_id", "request", "category", "suggested_solution")
+
+DEFAULT_TICKETS_PATH = Path(__file__).resolve().parents[2] / "data" / "resolved_tickets.csv"
+DEFAULT_INDEX_PATH = Path(__file__).resolve().parents[2] / ".cache" / "resolved_tickets_hnsw.npz"
+
+
+class TicketSearchBackend:
+    """Base class for backends that find the resolved tickets closest to a query embedding."""
+
+    name = "base"
+    # Sequence number of the last ingestion-log record this backend holds (see `_ticket_wal.py`).
+    wal_seq = 0
+    # Whether `add_tickets` writes the tickets to durable storage, so the log can be checkpointed at once.
+    persists_added_tickets = False
+
+    def search(self, query_embedding: list[float], top_k: int = 3) -> list[dict]:
+        """Returns the `top_k` closest tickets, ordered by cosine distance."""
+        raise NotImplementedError
+
+    def add_tickets(self, tickets: list[dict], embeddings) -> None:
+        """Makes newly resolved tickets searchable without reloading the existing ones."""
+        raise NotImplementedError
+
+    def save(self) -> None:
+        """Persists state built from added tickets; called when the ingestion log is compacted."""
+
+
+class BigQueryTicketBackend(TicketSearchBackend):
+    """
+    Runs a `COSINE_DISTANCE` scan over the `resolved_tickets` table in BigQuery.
+
+    Queries go through the pooled client for (project, location), and results are
+    served from the shared query-result cache until the table is reloaded.
+    """
+
+    name = "bigquery"
+    persists_added_tickets = True
+
+    def __init__(
+        self,
+        project_id: str,
+        dataset_id: str,
+        table_name: str = "resolved_tickets",
+        location: Optional[str] = None,
+        result_cache_size: int = 256,
+        cache_validate_seconds: float = 30.0,
+    ):
+        self.project_id = project_id
+        self.location = location
+        self.table_id = f"{project_id}.{dataset_id}.{table_name}"
+        self.result_cache = (
+            get_query_result_cache(result_cache_size, cache_validate_seconds)
+            if result_cache_size > 0
+            else None
+        )
+
+    def search(self, query_embedding: list[float], top_k: int = 3) -> list[dict]:
+        start = time.perf_counter()
+        client = get_bigquery_client(self.project_id, self.location)
+
+        version = key = None
+        if self.result_cache is not None:
+            key = embedding_cache_key(query_embedding, top_k)
+            version = self.result_cache.table_version(client, self.table_id)
+            cached = self.result_cache.get(self.table_id, key, version) if version else None
+            if cached is not None:
+                results, query_seconds = cached
+                saved = query_seconds - (time.perf_counter() - start)
+                self.result_cache.record_saving(saved)
+                print(f"INFO: BigQuery vector search served from cache (saved ~{saved * 1000:.0f} ms).")
+                return [dict(row) for row in results]
+
+        results = self._query(client, query_embedding, top_k)
+
+        if self.result_cache is not None and version:
+            self.result_cache.put(self.table_id, key, version, results, time.perf_counter() - start)
+        return results
+
+    def _query(self, client: bigquery.Client, query_embedding: list[float], top_k: int) -> list[dict]:
+        sql_query = f"""
+            SELECT
+                ticket_id,
+                request,
+                category,
+                suggested_solution,
+                -- Calculate the cosine distance between the query vector and the stored embeddings
+                COSINE_DISTANCE(request_embedding, @query_embedding) as distance
+            FROM
+                `{self.table_id}`
+            -- Order by distance (smaller is better) and return the top matches
+            ORDER BY
+                distance
+            LIMIT @top_k
+        """
+
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=[
+                bigquery.ArrayQueryParameter("query_embedding", "FLOAT64", query_embedding),
+                bigquery.ScalarQueryParameter("top_k", "INT64", top_k),
+            ]
+        )
+
+        try:
+            print("INFO: Executing BigQuery vector search...")
+            query_job = client.query(sql_query, job_config=job_config)
+            return [dict(row) for row in query_job.result()]
+        except Exception as e:
+            print(f"ERROR: BigQuery vector search failed: {e}")
+            raise BigQueryError(f"Failed to execute database vector search. Details: {e}")
+
+    def add_tickets(self, tickets: list[dict], embeddings) -> None:
+        """
+        Appends the tickets the table does not hold yet with a load job and drops
+        the table's cached results. Tickets already in the table (e.g. loaded just
+        before a crash, ahead of the log checkpoint) are skipped.
+        """
+        client = get_bigquery_client(self.project_id, self.location)
+        existing = self._existing_ticket_ids(client, [t.get("ticket_id") for t in tickets])
+        rows = [
+            {
+                "ticket_id": t.get("ticket_id"),
+                "customer_id": t.get("customer_id"),
+                "request": t.get("request"),
+                "category": t.get("category"),
+                "suggested_solution": t.get("suggested_solution"),
+                "request_embedding": np.asarray(e, dtype=np.float32).tolist(),
+            }
+            for t, e in zip(tickets, embeddings)
+            if t.get("ticket_id") not in existing
+        ]
+        if not rows:
+            return
+        job_config = bigquery.LoadJobConfig(write_disposition=bigquery.WriteDisposition.WRITE_APPEND)
+        try:
+            client.load_table_from_json(rows, self.table_id, job_config=job_config).result()
+        except Exception as e:
+            raise BigQueryError(f"Failed to append {len(rows)} tickets to '{self.table_id}'. Details: {e}")
+        if self.result_cache is not None:
+            self.result_cache.invalidate(self.table_id)
+
+    def _existing_ticket_ids(self, client: bigquery.Client, ticket_ids: list[str]) -> set[str]:
+        sql_query = f"""
+            SELECT ticket_id
+            FROM `{self.table_id}`
+            WHERE ticket_id IN UNNEST(@ticket_ids)
+        """
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=[bigquery.ArrayQueryParameter("ticket_ids", "STRING", ticket_ids)]
+        )
+        try:
+            return {row["ticket_id"] for row in client.query(sql_query, job_config=job_config).result()}
+        except Exception as e:
+            raise BigQueryError(f"Failed to look up existing tickets in '{self.table_id}'. Details: {e}")
+
+
+class LocalTicketBackend(TicketSearchBackend):
+    """
+    Exact in-process cosine search over the resolved tickets.
+
+    All embeddings are held in a single row-normalized float32 matrix, so a
+    query is answered by one matrix-vector product followed by a partial sort.
+    """
+
+    name = "local"
+
+    def __init__(self, tickets: list[dict], embeddings, normalized: bool = False):
+        # float32 input (including a memory-mapped dataset) is used without copying.
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        if matrix.ndim != 2 or matrix.shape[0] != len(tickets):
+            raise VectorStoreError(
+                f"Embedding matrix shape {matrix.shape} does not match {len(tickets)} tickets."
+            )
+        self.tickets = [{field: t.get(field) for field in TICKET_RESULT_FIELDS} for t in tickets]
+        self.matrix = matrix if normalized else _normalize_rows(matrix)
+        self._rows = None
+
+    @classmethod
+    def from_csv(cls, csv_filepath: str) -> "LocalTicketBackend":
+        """Loads the tickets and embeddings written by `scripts/create_mock_db.py`."""
+        return cls(*_read_csv_source(csv_filepath))
+
+    @classmethod
+    def from_dataset(cls, path: str) -> "LocalTicketBackend":
+        """Memory-maps a binary ticket dataset (see `_ticket_dataset.py`)."""
+        dataset = load_ticket_dataset(path)
+        print(f"INFO: Loaded {len(dataset)} resolved tickets ({dataset.manifest['dtype']}) from '{path}'.")
+        # Only float32 rows are used as stored; decoded float16/int8 rows are renormalized.
+        zero_copy = dataset.normalized and dataset.embeddings.dtype == np.float32
+        return cls(dataset.tickets, dataset.vectors(), normalized=zero_copy)
+
+    @classmethod
+    def from_bigquery(cls, table_id: str) -> "LocalTicketBackend":
+        """Exports the `resolved_tickets` table from BigQuery into memory."""
+        return cls(*_export_bigquery_source(table_id))
+
+    def search(self, query_embedding: list[float], top_k: int = 3) -> list[dict]:
+        if not self.tickets:
+            return []
+
+        query = self._prepare_query(query_embedding)
+        scores = self.matrix @ query
+        return self._results(np.arange(len(scores)), scores, top_k)
+
+    def add_tickets(self, tickets: list[dict], embeddings) -> None:
+        self._append(tickets, _normalize_rows(self._check_rows(embeddings)))
+
+    def _check_rows(self, embeddings) -> np.ndarray:
+        rows = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+        if rows.ndim != 2 or rows.shape[1] != self.matrix.shape[1]:
+            raise VectorStoreError(f"Expected embeddings of dimension {self.matrix.shape[1]}, got {rows.shape[1]}.")
+        return rows
+
+    def _append(self, tickets: list[dict], rows: np.ndarray) -> None:
+        """
+        Appends rows to the matrix. The tickets are added before the wider view
+        replaces the matrix, so a concurrent search sees either the old or the new
+        matrix.
+        """
+        self._rows, matrix = _append_rows(self._rows, self.matrix, rows)
+        self.tickets.extend({field: t.get(field) for field in TICKET_RESULT_FIELDS} for t in tickets)
+        self.matrix = matrix
+
+    def _prepare_query(self, query_embedding: list[float]) -> np.ndarray:
+        """Validates the query dimension and scales it to unit length."""
+        query = np.asarray(query_embedding, dtype=np.float32)
+        if query.shape != (self.matrix.shape[1],):
+            raise VectorStoreError(
+                f"Query embedding has dimension {query.shape}, expected {self.matrix.shape[1]}."
+            )
+        norm = np.linalg.norm(query)
+        return query / norm if norm > 0 else query
+
+    def _results(self, candidate_ids, scores, top_k: int) -> list[dict]:
+        """Builds the shared result shape from candidate row ids and their cosine similarities."""
+        k = min(top_k, len(candidate_ids))
+        if k <= 0:
+            return []
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [
+            {**self.tickets[int(candidate_ids[i])], "distance": float(1.0 - scores[i])}
+            for i in best
+        ]
+
+
+class QuantizedTicketBackend(LocalTicketBackend):
+    """
+    Exact-search quality from quantized codes (see `_quantization.py`).
+
+    Only the int8 or PQ codes are held in memory. Each query is scored against
+    the codes, and the best `rerank_candidates` are re-ranked exactly against
+    `embeddings`, which is used as given and only read for those rows. Pass a
+    memory-mapped array, as `from_source` does: a dataset's rows in their stored
+    dtype, or a temporary file the rows of a CSV or BigQuery export are written
+    to. Tickets added after loading keep their float32 rows in memory until the
+    backend is reloaded. Set `rerank_candidates=0` to return the approximate
+    scores as they are.
+    """
+
+    name = "quantized"
+
+    def __init__(self, tickets: list[dict], embeddings, mode: str = "int8", rerank_candidates: int = 30, **options):
+        self.matrix = embeddings if isinstance(embeddings, np.ndarray) else np.asarray(embeddings, dtype=np.float32)
+        if self.matrix.ndim != 2 or self.matrix.shape[0] != len(tickets):
+            raise VectorStoreError(
+                f"Embedding matrix shape {self.matrix.shape} does not match {len(tickets)} tickets."
+            )
+        self.tickets = [{field: t.get(field) for field in TICKET_RESULT_FIELDS} for t in tickets]
+        self.rerank_candidates = rerank_candidates
+        self.added = np.empty((0, self.matrix.shape[1]), dtype=np.float32)
+        self._rows = None
+
+        # The quantizer scales the rows to unit length a block at a time.
+        self.quantizer = create_quantizer(mode, **options).fit(self.matrix)
+        self.quantizer.encode(self.matrix)
+        self.name = f"quantized-{mode}"
+
+    @classmethod
+    def from_source(cls, source: str, **kwargs) -> "QuantizedTicketBackend":
+        """
+        Loads `source` (see `ticket_search_source`) without a float32 copy in memory:
+        a dataset is memory-mapped as stored, and CSV or BigQuery rows are spilled
+        to a temporary file.
+        """
+        if os.path.isdir(source):
+            dataset = load_ticket_dataset(source)
+            print(f"INFO: Loaded {len(dataset)} resolved tickets ({dataset.manifest['dtype']}) from '{source}'.")
+            return cls(dataset.tickets, dataset.embeddings, **kwargs)
+        if source.startswith("bq://"):
+            tickets, embeddings = _export_bigquery_source(source[5:])
+        else:
+            tickets, embeddings = _read_csv_source(source)
+        return cls(tickets, _spill_rows(embeddings), **kwargs)
+
+    def search(self, query_embedding: list[float], top_k: int = 3) -> list[dict]:
+        if not self.tickets:
+            return []
+
+        query = self._prepare_query(query_embedding)
+        approx = self.quantizer.scores(query)
+        if not self.rerank_candidates:
+            return self._results(np.arange(len(approx)), approx, top_k)
+
+        n_candidates = min(max(self.rerank_candidates, top_k), len(approx))
+        candidates = np.sort(np.argpartition(-approx, n_candidates - 1)[:n_candidates])
+        rows = self._candidate_rows(candidates)
+        # Cosine similarity does not depend on the scale of a row, so stored int8 rows need no decoding.
+        norms = np.linalg.norm(rows, axis=1)
+        norms[norms == 0] = 1.0
+        return self._results(candidates, (rows @ query) / norms, top_k)
+
+    def _candidate_rows(self, candidates: np.ndarray) -> np.ndarray:
+        """Reads the rows of sorted ticket ids from the stored matrix, or from `added` past its end."""
+        stored = np.searchsorted(candidates, len(self.matrix))
+        rows = np.empty((len(candidates), self.matrix.shape[1]), dtype=np.float32)
+        rows[:stored] = self.matrix[candidates[:stored]]
+        rows[stored:] = self.added[candidates[stored:] - len(self.matrix)]
+        return rows
+
+    def add_tickets(self, tickets: list[dict], embeddings) -> None:
+        """Encodes the new rows with the existing codebooks; the quantizer is not retrained."""
+        rows = self._check_rows(embeddings)
+        self._rows, self.added = _append_rows(self._rows, self.added, rows)
+        self.tickets.extend({field: t.get(field) for field in TICKET_RESULT_FIELDS} for t in tickets)
+        # Swapped in last, so the approximate scores never cover rows the backend lacks.
+        self.quantizer = self.quantizer.extended(rows)
+
+
+class HNSWTicketBackend(LocalTicketBackend):
+    """
+    Approximate search over the resolved tickets using an HNSW graph (see `_ann_index.py`).
+
+    The graph is loaded from `index_path` when it matches the tickets, extended
+    with any tickets it does not cover yet, and rebuilt otherwise. `ef` sets the
+    recall/latency trade-off of every query.
+    """
+
+    name = "hnsw"
+
+    def __init__(self, tickets: list[dict], embeddings, index_path: Optional[str] = None, ef: Optional[int] = None):
+        super().__init__(tickets, embeddings)
+        self.index_path = index_path
+        self.ef = ef
+        self.index = self._load_or_build_index()
+        # Share the index's vector storage instead of keeping a second copy.
+        self.matrix = self.index.vectors
+
+    def _load_or_build_index(self) -> HNSWIndex:
+        index = None
+        if self.index_path and os.path.exists(self.index_path):
+            try:
+                index = HNSWIndex.load(self.index_path)
+            except (OSError, ValueError, KeyError, VectorStoreError) as e:
+                print(f"WARN: Could not load ANN index from '{self.index_path}', rebuilding: {e}")
+            else:
+                covered = len(index)
+                if (
+                    index.dim != self.matrix.shape[1]
+                    or covered > len(self.tickets)
+                    or not np.allclose(index.vectors, self.matrix[:covered], atol=1e-5)
+                ):
+                    print(f"INFO: ANN index at '{self.index_path}' is stale; rebuilding.")
+                    index = None
+
+        if index is None:
+            index = HNSWIndex(self.matrix.shape[1])
+
+        missing = len(self.tickets) - len(index)
+        if missing > 0:
+            print(f"INFO: Inserting {missing} tickets into the ANN index...")
+            index.add(self.matrix[len(index):])
+            if self.index_path:
+                index.save(self.index_path)
+        return index
+
+    def add_tickets(self, tickets: list[dict], embeddings) -> None:
+        """
+        Inserts newly resolved tickets into the index without rebuilding it. The
+        tickets are added only once the graph holds them, and the graph is saved
+        when the ingestion log is compacted (`save`), not on every call.
+        """
+        rows = self._check_rows(embeddings)
+        # Nodes past the last ticket were inserted by an earlier call for the same
+        # tickets that failed part-way (the merger retries the same records).
+        inserted = len(self.index) - len(self.tickets)
+        self.index.add(rows[inserted:])
+        self.tickets.extend({field: t.get(field) for field in TICKET_RESULT_FIELDS} for t in tickets)
+        self.matrix = self.index.vectors
+
+    def save(self) -> None:
+        if self.index_path:
+            self.index.save(self.index_path)
+
+    def search(self, query_embedding: list[float], top_k: int = 3) -> list[dict]:
+        count = len(self.tickets)
+        if not count:
+            return []
+        # A concurrent `add_tickets` may have inserted nodes whose tickets are not added yet.
+        pending = len(self.index) - count
+        ids, sims = self.index.search(self._prepare_query(query_embedding), top_k + pending, ef=self.ef)
+        keep = ids < count
+        return self._results(ids[keep], sims[keep], top_k)
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """Scales every row to unit length, leaving all-zero rows untouched."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _append_rows(buffer: Optional[np.ndarray], matrix: np.ndarray, rows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Writes `rows` past the end of `matrix` in a buffer grown geometrically and
+    returns (buffer, wider view). `matrix` itself is left untouched.
+    """
+    count = matrix.shape[0]
+    if buffer is None or len(buffer) < count + len(rows):
+        grown = np.empty((max(2 * (count + len(rows)), 64), matrix.shape[1]), dtype=np.float32)
+        grown[:count] = matrix
+        buffer = grown
+    buffer[count : count + len(rows)] = rows
+    return buffer, buffer[: count + len(rows)]
+
+
+def _spill_rows(embeddings) -> np.ndarray:
+    """
+    Writes the rows as float32 to an unlinked temporary file next to the other
+    caches and memory-maps it, so they are read back from disk on demand.
+    """
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    if not matrix.size:
+        return matrix
+    DEFAULT_INDEX_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryFile(dir=DEFAULT_INDEX_PATH.parent) as f:
+        spilled = np.memmap(f, dtype=np.float32, mode="w+", shape=matrix.shape)
+    spilled[:] = matrix
+    spilled.flush()
+    return spilled
+
+
+def _read_csv_source(csv_filepath: str) -> tuple[list[dict], list[list[float]]]:
+    if not os.path.exists(csv_filepath):
+        raise ConfigurationError(f"Resolved tickets file not found at '{csv_filepath}'.")
+
+    tickets, embeddings = read_tickets_csv(csv_filepath)
+    print(f"INFO: Loaded {len(tickets)} resolved tickets from '{csv_filepath}'.")
+    return tickets, embeddings
+
+
+def _export_bigquery_source(table_id: str) -> tuple[list[dict], list[list[float]]]:
+    project_id = table_id.split(".", 1)[0]
+    client = get_bigquery_client(project_id, os.getenv("BQ_LOCATION") or None)
+    sql_query = f"""
+        SELECT ticket_id, request, category, suggested_solution, request_embedding
+        FROM `{table_id}`
+    """
+    try:
+        rows = [dict(row) for row in client.query(sql_query).result()]
+    except Exception as e:
+        raise BigQueryError(f"Failed to export '{table_id}' for local search. Details: {e}")
+
+    print(f"INFO: Exported {len(rows)} resolved tickets from BigQuery table '{table_id}'.")
+    return rows, [row.pop("request_embedding") for row in rows]
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_ticket_search_backend() -> TicketSearchBackend:
+    """Returns the configured ticket search backend, building it once per process."""
+    global _backend
+    if _backend is not None:
+        return _backend
+
+    with _backend_lock:
+        if _backend is None:
+            _backend = _create_backend(ticket_search_backend_name())
+            print(f"INFO: Using '{_backend.name}' backend for historical ticket search.")
+    return _backend
+
+
+def ticket_search_backend_name() -> str:
+    """The configured `TICKET_SEARCH_BACKEND`, without building the backend."""
+    return os.getenv("TICKET_SEARCH_BACKEND", "bigquery").lower()
+
+
+def reset_ticket_search_backend() -> None:
+    """Drops the cached backend so the next search reloads it (e.g. after the data changes)."""
+    global _backend
+    with _backend_lock:
+        _backend = None
+
+
+def _default_tickets_source() -> str:
+    """Prefers the binary dataset written by `create_mock_db.py`, falling back to the CSV."""
+    if (DEFAULT_DATASET_PATH / "manifest.json").exists():
+        return str(DEFAULT_DATASET_PATH)
+    return str(DEFAULT_TICKETS_PATH)
+
+
+def ticket_search_source() -> str:
+    """The data the local backends load: `RESOLVED_TICKETS_PATH` or the default dataset/CSV."""
+    return os.getenv("RESOLVED_TICKETS_PATH") or _default_tickets_source()
+
+
+def _replay_ingested_tickets(backend: LocalTicketBackend) -> int:
+    """
+    Adds the tickets in the ingestion log that are not in the loaded data yet and
+    returns the sequence number of the last one. Tickets already present (e.g.
+    after a crash between a compaction and its checkpoint) are skipped.
+    """
+    wal = get_ticket_wal()
+    if wal is None:
+        return 0
+    pending = wal.pending()
+    known = {t["ticket_id"] for t in backend.tickets}
+    records = [r for r in pending if r["ticket_id"] not in known]
+    if records:
+        backend.add_tickets(records, np.stack([record_embedding(r) for r in records]))
+        print(f"INFO: Replayed {len(records)} ingested tickets from '{wal.path}'.")
+    return pending[-1]["seq"] if pending else wal.checkpoint
+
+
+def _create_backend(backend_name: str) -> TicketSearchBackend:
+    if backend_name == "bigquery":
+        bq_project_id = os.getenv("BQ_PROJECT_ID")
+        bq_dataset_id = os.getenv("BQ_DATASET_ID")
+        if not bq_project_id or not bq_dataset_id:
+            raise ConfigurationError("BigQuery project ID or dataset ID is not configured.")
+        backend = BigQueryTicketBackend(
+            bq_project_id,
+            bq_dataset_id,
+            location=os.getenv("BQ_LOCATION") or None,
+            result_cache_size=int(os.getenv("BQ_RESULT_CACHE_SIZE", "256")),
+            cache_validate_seconds=float(os.getenv("BQ_RESULT_CACHE_VALIDATE_SECONDS", "30")),
+        )
+        # The merger checkpoints the log after every load job, so only tickets
+        # past the checkpoint still need to be appended to the table.
+        wal = get_ticket_wal()
+        backend.wal_seq = wal.checkpoint if wal is not None else 0
+        return backend
+
+    if backend_name in ("local", "hnsw"):
+        source = ticket_search_source()
+        mode = os.getenv("TICKET_SEARCH_QUANTIZATION", "none").lower() if backend_name == "local" else "none"
+        if mode != "none":
+            options = {}
+            if mode == "pq":
+                options["subspaces"] = int(os.getenv("TICKET_PQ_SUBSPACES", "96"))
+            backend = QuantizedTicketBackend.from_source(
+                source,
+                mode=mode,
+                rerank_candidates=int(os.getenv("TICKET_SEARCH_RERANK", "30")),
+                **options,
+            )
+            # Encoded with the codebooks trained on the loaded rows.
+            backend.wal_seq = _replay_ingested_tickets(backend)
+            return backend
+
+        if source.startswith("bq://"):
+            exact = LocalTicketBackend.from_bigquery(source[5:])
+        elif os.path.isdir(source):
+            exact = LocalTicketBackend.from_dataset(source)
+        else:
+            exact = LocalTicketBackend.from_csv(source)
+        # Replayed before the ANN index is built, so it covers these tickets too.
+        wal_seq = _replay_ingested_tickets(exact)
+
+        if backend_name == "local":
+            backend = exact
+        else:
+            ef = os.getenv("TICKET_INDEX_EF")
+            backend = HNSWTicketBackend(
+                exact.tickets,
+                exact.matrix,
+                index_path=os.getenv("TICKET_INDEX_PATH") or str(DEFAULT_INDEX_PATH),
+                ef=int(ef) if ef else None,
+            )
+        backend.wal_seq = wal_seq
+        return backend
+
+    raise ConfigurationError(
+        f"Unknown TICKET_SEARCH_BACKEND '{backend_name}'. Expected 'bigquery', 'local' or 'hnsw'."
+    )
+
+
+def ticket_search_metrics() -> dict:
+    """Reports client-pool reuse and result-cache hits, including the time they saved."""
+    return {
+        "client_pool": bigquery_pool_stats(),
+        "result_cache": get_query_result_cache().stats(),
+    }
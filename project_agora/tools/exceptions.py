@@ -33,4 +33,9 @@ class EmbeddingError(ToolError):
 
 class DiagramGenerationError(ToolError):
     """Raised for errors during diagram generation."""
-    pass 
\ No newline at end of file
+    pass
+
+
+class VectorStoreError(ToolError):
+    """Raised for errors loading or querying a local vector index."""
+    pass
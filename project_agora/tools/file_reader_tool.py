@@ -1,31 +1,37 @@
 # FILE: project_agora/tools/file_reader_tool.py
-from google.cloud import storage
+from ._tool_executor import run_blocking
+from ._user_files import READ_MODES, read_span
 
-def read_user_file(file_uri: str) -> str:
+
+async def read_user_file(file_uri: str, mode: str = "head", max_bytes: int = 0, offset: int = 0) -> str:
     """
-    Reads the content of a user-uploaded file from Google Cloud Storage.
+    Reads part of a user-uploaded file from Google Cloud Storage (or a local file in offline setups).
+
+    Large files are never read whole: at most `max_bytes` are returned, cut at
+    line boundaries, and the result starts with the byte range it covers. For a
+    crash log, the error is usually at the end, so read the `tail` first.
 
     Args:
         file_uri: The GCS URI of the file (e.g., 'gs://bucket-name/path/to/file.log').
+        mode: 'head' (start of the file), 'tail' (end of the file) or 'window' (from `offset`).
+        max_bytes: Bytes to read; 0 or more than the configured maximum reads the maximum.
+        offset: Byte offset to start from in 'window' mode, e.g. the end of a previous read.
 
     Returns:
-        The content of the file as a string, or an error message.
+        The requested part of the file with its byte range, or an error message.
     """
-    if not file_uri.startswith("gs://"):
-        return "Error: Invalid GCS URI provided. Must start with 'gs://'."
+    if mode not in READ_MODES:
+        return f"Error: Invalid mode '{mode}'. Must be one of {', '.join(READ_MODES)}."
 
     try:
-        # Assumes the client is authenticated via Application Default Credentials
-        client = storage.Client()
-        # The URI is in the format gs://<bucket>/<object_path>
-        bucket_name, blob_name = file_uri[5:].split("/", 1)
-        bucket = client.bucket(bucket_name)
-        blob = bucket.blob(blob_name)
-        
-        file_content = blob.download_as_text()
-        print(f"INFO: Successfully read content from {file_uri}")
-        return file_content
+        # The reads are blocking, so they run on the tool thread pool.
+        span = await run_blocking(read_span, file_uri, mode, max_bytes, offset)
     except Exception as e:
-        error_msg = f"Error: Could not read file from GCS URI '{file_uri}'. Details: {e}"
+        error_msg = f"Error: Could not read file '{file_uri}'. Details: {e}"
         print(f"ERROR: {error_msg}")
-        return error_msg
\ No newline at end of file
+        return error_msg
+
+    print(f"INFO: Read bytes {span.start}-{span.end} of {span.size} from {file_uri}")
+    if span.complete:
+        return span.text
+    return f"[{mode} of {file_uri}: bytes {span.start}-{span.end} of {span.size}]\n{span.text}"
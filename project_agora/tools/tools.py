@@ -9,11 +9,13 @@ This module imports and re-exports tools from specialized modules for backward c
 from ._state_tools import (
     create_ticket,
     update_ticket_after_analysis,
-    update_ticket_after_retrieval
+    update_ticket_after_retrieval,
+    update_ticket_status
 )
 
 from ._data_tools import (
-    search_resolved_tickets_db
+    search_resolved_tickets_db,
+    search_local_knowledge_base
 )
 
 from ._rendering_tools import (
@@ -26,7 +28,9 @@ __all__ = [
     "create_ticket",
     "update_ticket_after_analysis", 
     "update_ticket_after_retrieval",
+    "update_ticket_status",
     "search_resolved_tickets_db",
+    "search_local_knowledge_base",
     "generate_diagram_from_mermaid",
     "format_code_reviewer_output"
 ]
@@ -0,0 +1,415 @@
+# FILE: project_agora/workflow_agent.py
+
+"""
+Defines TicketWorkflowAgent, a code-driven orchestrator for the ticket state machine.
+
+The LLM orchestrator re-reads ORCHESTRATOR_PROMPT on every turn and spends a model
+call on each step just to decide which tool comes next. This agent drives the same
+New → Analyzing → AwaitingContextConfirmation → Pending Solution →
+AwaitingPlanApproval → Resolved flow in code. It calls the sub-agents and state
+tools directly and emits the same status messages. The only model calls it adds
+are for replies that need judgment, such as an ambiguous answer to
+"Shall I proceed?". Clear replies are recognized without a model call.
+
+Before analyzing a new request, it checks the solution store for a near-identical
+request that was already resolved. On a hit, the stored answer is offered with its
+provenance (AwaitingReuseConfirmation), and the full pipeline only runs if the
+developer says it does not solve the problem.
+"""
+
+import inspect
+import json
+import re
+import time
+from datetime import datetime
+from typing import Any, AsyncGenerator, Callable, Optional
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.adk.tools import ToolContext
+from google.adk.tools.agent_tool import AgentTool
+from google.genai import types
+
+from .logging_config import logger
+from .ticket_state import field_text, load_ticket
+from .tools._solution_store import find_stored_solution, get_solution_store
+from .tools._tool_executor import run_blocking
+from .tools.tools import (
+    create_ticket,
+    format_code_reviewer_output,
+    generate_diagram_from_mermaid,
+    update_ticket_after_analysis,
+    update_ticket_after_retrieval,
+    update_ticket_status,
+)
+
+# Replies recognized without a model call, compared after lowercasing and stripping punctuation.
+AFFIRMATIVE_REPLIES = {
+    "y", "yes", "yes please", "yeah", "yep", "sure", "ok", "okay", "proceed", "please proceed",
+    "go ahead", "go for it", "continue", "do it", "please do", "sounds good", "looks good",
+    "looks correct", "correct", "approved", "approve", "lgtm", "yes proceed", "yes go ahead",
+}
+NEGATIVE_REPLIES = {"n", "no", "nope", "no thanks", "not yet", "not now", "stop", "cancel", "wait"}
+GREETINGS = {
+    "hi", "hello", "hey", "hi there", "hello there", "good morning", "good afternoon",
+    "good evening", "thanks", "thank you", "thanks a lot", "thank you very much",
+}
+# Messages with fewer words than this that are not recognized greetings are classified by the model.
+MIN_REQUEST_WORDS = 4
+
+GREETING_RESPONSE = (
+    "Hello! I'm Agora, your assistant for the Google Agent Development Kit. Describe the ADK "
+    "problem you're facing or the agent you'd like to build, and I'll take it from there."
+)
+CONTEXT_CONFIRMATION_QUESTION = (
+    "My search is complete. I found relevant information. I am now ready to formulate a solution. "
+    "Shall I proceed?"
+)
+PLAN_APPROVAL_QUESTION = "Does this plan and architecture look correct? Shall I proceed with generating the full code?"
+REUSE_CONFIRMATION_QUESTION = "Does this solve your problem? If not, I'll analyze your request from scratch."
+
+
+def _normalize(text: str) -> str:
+    return " ".join(re.sub(r"[^\w\s]", " ", text.lower()).split())
+
+
+def _strip_code_fences(text: str) -> str:
+    cleaned = text.strip()
+    if cleaned.startswith("```json"):
+        cleaned = cleaned[7:]
+    if cleaned.startswith("```"):
+        cleaned = cleaned[3:]
+    if cleaned.endswith("```"):
+        cleaned = cleaned[:-3]
+    return cleaned.strip()
+
+
+def build_context_block(ticket: dict) -> str:
+    """
+    Formats the ticket and its retrieval results as the context block the specialist
+    agents expect. Results moved to the blob store are read back in full.
+    """
+    analysis = ticket.get("analysis") or {}
+    return (
+        f"**Original Request:**\n{ticket.get('request', '')}\n\n"
+        f"**Analysis:**\n"
+        f"- Category: {analysis.get('category', 'Unknown')}\n"
+        f"- Urgency: {analysis.get('urgency', 'Unknown')}\n"
+        f"- Summary: {analysis.get('summary', '')}\n\n"
+        f"**Knowledge Base Search Results:**\n{field_text(ticket, 'retrieved_kb_docs') or 'No results.'}\n\n"
+        f"**Historical Ticket Search Results:**\n{field_text(ticket, 'retrieved_db_tickets') or 'No results.'}"
+    )
+
+
+class TicketWorkflowAgent(BaseAgent):
+    """
+    Runs the ticket state machine in code, one user turn per invocation.
+
+    The specialist agents are called through `AgentTool`, exactly as the LLM
+    orchestrator calls them, so they see the same single `request` input and
+    their state changes are merged back. The state tools are called directly and
+    their state changes are emitted as events.
+    """
+
+    ticket_analysis_agent: BaseAgent
+    context_retrieval_agent: BaseAgent
+    problem_solver_agent: BaseAgent
+    code_generator_agent: BaseAgent
+    code_reviewer_agent: BaseAgent
+    intent_classifier_agent: BaseAgent
+    diagram_tool: Callable[..., Any] = generate_diagram_from_mermaid
+
+    async def _run_async_impl(self, ctx: InvocationContext) -> AsyncGenerator[Event, None]:
+        message = ""
+        if ctx.user_content and ctx.user_content.parts:
+            message = " ".join(part.text for part in ctx.user_content.parts if part.text).strip()
+        ticket = self._ticket(ctx)
+        status = ticket.get("status") if ticket else None
+
+        if status == "AwaitingReuseConfirmation":
+            steps = self._confirm_reuse(ctx, ticket, message)
+        elif status == "AwaitingContextConfirmation":
+            steps = self._confirm_context(ctx, ticket, message)
+        elif status == "AwaitingPlanApproval":
+            steps = self._approve_plan(ctx, ticket, message)
+        elif status == "New":
+            # A previous turn was interrupted before the analysis finished.
+            steps = self._analyze(ctx, ticket["request"])
+        elif status == "Analyzing":
+            steps = self._retrieve(ctx)
+        else:
+            steps = self._intake(ctx, message)
+
+        async for event in steps:
+            yield event
+
+    # --- States ---
+
+    async def _intake(self, ctx: InvocationContext, message: str) -> AsyncGenerator[Event, None]:
+        intent = await self._classify(ctx, message, question="", labels=("greeting", "request"))
+        if intent != "request":
+            yield self._message(ctx, GREETING_RESPONSE)
+            return
+
+        _, event = await self._run_tool(ctx, create_ticket, request=message)
+        yield event
+
+        offer = await run_blocking(find_stored_solution, message)
+        if offer is not None:
+            async for event in self._offer_stored_solution(ctx, offer):
+                yield event
+            return
+
+        async for event in self._analyze(ctx, message):
+            yield event
+
+    async def _offer_stored_solution(self, ctx: InvocationContext, offer: dict) -> AsyncGenerator[Event, None]:
+        source = offer["ticket_id"]
+        _, event = await self._run_tool(
+            ctx, update_ticket_status, status="AwaitingReuseConfirmation",
+            note=f"Offered the stored solution of {source} (similarity {offer['similarity']:.3f})",
+        )
+        # The offer is resolved, or declined, on the next turn.
+        event.actions.state_delta["solution_offer"] = offer
+        yield event
+        resolved_on = datetime.fromtimestamp(offer["resolved_at"]).strftime("%Y-%m-%d")
+        yield self._message(
+            ctx,
+            f"💡 This looks like a request we've already solved: ticket {source}, resolved on {resolved_on} "
+            f"({offer['similarity']:.0%} match), asked:\n> {offer['request']}\n\n"
+            f"Here is the solution that worked there:\n\n{offer['suggested_solution']}\n\n"
+            f"{REUSE_CONFIRMATION_QUESTION}",
+        )
+
+    async def _confirm_reuse(
+        self, ctx: InvocationContext, ticket: dict, message: str
+    ) -> AsyncGenerator[Event, None]:
+        offer = ctx.session.state.get("solution_offer") or {}
+        intent = await self._classify(ctx, message, question=REUSE_CONFIRMATION_QUESTION)
+        accepted = intent == "yes" and bool(offer)
+        store = get_solution_store()
+        if store is not None:
+            store.record_outcome(offer.get("offer_id"), accepted, offer.get("compute_seconds", 0.0))
+
+        if accepted:
+            _, event = await self._run_tool(
+                ctx, update_ticket_status, status="Resolved",
+                note=f"Resolved with the stored solution of {offer['ticket_id']}",
+                suggested_solution=offer["suggested_solution"], solution_source=offer["ticket_id"],
+            )
+            yield event
+            yield self._message(ctx, "Glad that helped! Let me know if there's anything else I can do.")
+            return
+
+        yield self._message(ctx, "Understood. Let me look into your request from scratch.")
+        async for event in self._analyze(ctx, ticket["request"]):
+            yield event
+
+    async def _analyze(self, ctx: InvocationContext, request: str) -> AsyncGenerator[Event, None]:
+        started = time.perf_counter()
+        yield self._message(ctx, "🔍 Analyzing your request to understand the requirements...")
+        analysis, event = await self._run_agent(ctx, self.ticket_analysis_agent, request)
+        yield event
+        _, event = await self._run_tool(ctx, update_ticket_after_analysis, analysis_json=analysis)
+        yield event
+
+        category = (self._ticket(ctx).get("analysis") or {}).get("category", "General Inquiry")
+        yield self._message(
+            ctx,
+            f"I've analyzed your request and categorized it as '{category}'. "
+            "I will now search for relevant information.",
+        )
+        async for event in self._retrieve(ctx, started):
+            yield event
+
+    async def _retrieve(self, ctx: InvocationContext, started: Optional[float] = None) -> AsyncGenerator[Event, None]:
+        started = started if started is not None else time.perf_counter()
+        ticket = self._ticket(ctx)
+        query = (ticket.get("analysis") or {}).get("summary") or ticket.get("request", "")
+
+        yield self._message(ctx, "📚 Searching knowledge base and previous solutions...")
+        _, event = await self._run_agent(ctx, self.context_retrieval_agent, query)
+        yield event
+        _, event = await self._run_tool(ctx, update_ticket_after_retrieval)
+        # Pipeline time so far; the solution time is added once the ticket is solved.
+        event.actions.state_delta["pipeline_seconds"] = time.perf_counter() - started
+        yield event
+        yield self._message(ctx, CONTEXT_CONFIRMATION_QUESTION)
+
+    async def _confirm_context(
+        self, ctx: InvocationContext, ticket: dict, message: str
+    ) -> AsyncGenerator[Event, None]:
+        intent = await self._classify(ctx, message, question=CONTEXT_CONFIRMATION_QUESTION)
+        if intent != "yes":
+            yield self._message(
+                ctx,
+                "I'm sorry, I didn't understand. To clarify, would you like me to proceed with "
+                "formulating a solution?",
+            )
+            return
+
+        if (ticket.get("analysis") or {}).get("category") == "Code Generation":
+            yield self._message(ctx, "Excellent. Creating an architectural plan for your agent...")
+            async for event in self._plan(ctx, ticket):
+                yield event
+            return
+
+        yield self._message(ctx, "Great. Formulating a solution based on the information gathered...")
+        started = time.perf_counter()
+        solution, event = await self._run_agent(ctx, self.problem_solver_agent, build_context_block(ticket))
+        # Recorded with the solution in the solution store as the time a reuse of it saves.
+        event.actions.state_delta["pipeline_seconds"] = (
+            ctx.session.state.get("pipeline_seconds", 0.0) + time.perf_counter() - started
+        )
+        yield event
+        _, event = await self._run_tool(
+            ctx, update_ticket_status, status="Resolved",
+            note="Solution delivered by problem_solver_agent", suggested_solution=solution,
+        )
+        yield event
+        yield self._message(ctx, solution)
+
+    async def _plan(
+        self, ctx: InvocationContext, ticket: dict, feedback: str = ""
+    ) -> AsyncGenerator[Event, None]:
+        request = build_context_block(ticket)
+        if feedback:
+            request += f"\n\n**Requested Changes to the Previous Plan:**\n{feedback}"
+        raw_plan, event = await self._run_agent(ctx, self.code_generator_agent, request)
+        yield event
+
+        try:
+            plan = json.loads(_strip_code_fences(raw_plan))
+        except json.JSONDecodeError:
+            logger.warning("Could not parse the code generator plan as JSON; presenting it as-is.")
+            plan = {"plan_description": raw_plan}
+
+        yield self._message(
+            ctx, "I have formulated a plan to build your agent. First, I will generate the architecture diagram."
+        )
+        diagram = ""
+        if plan.get("mermaid_syntax"):
+            try:
+                url, event = await self._run_tool(
+                    ctx, self.diagram_tool, mermaid_code=plan["mermaid_syntax"],
+                    file_name=f"{ticket.get('ticket_id', 'plan')}_architecture",
+                )
+                yield event
+                diagram = f"\n\n**Architecture diagram:** {url}"
+            except Exception as e:
+                logger.warning("Diagram generation failed, continuing without it: %s", e)
+                diagram = "\n\n(The architecture diagram could not be generated.)"
+
+        _, event = await self._run_tool(
+            ctx, update_ticket_status, status="AwaitingPlanApproval", note="Architecture plan presented",
+        )
+        # The approved plan is passed back to the code generator on the next turn.
+        event.actions.state_delta["code_plan"] = raw_plan
+        yield event
+        yield self._message(ctx, f"{plan.get('plan_description', raw_plan)}{diagram}\n\n{PLAN_APPROVAL_QUESTION}")
+
+    async def _approve_plan(
+        self, ctx: InvocationContext, ticket: dict, message: str
+    ) -> AsyncGenerator[Event, None]:
+        intent = await self._classify(ctx, message, question=PLAN_APPROVAL_QUESTION)
+        if intent == "no":
+            yield self._message(ctx, "Understood. What would you like to change in the plan?")
+            return
+        if intent == "other":
+            # Anything that is not a yes or no is treated as feedback on the plan.
+            yield self._message(ctx, "Thanks for the feedback. Revising the architectural plan...")
+            async for event in self._plan(ctx, ticket, feedback=message):
+                yield event
+            return
+
+        yield self._message(ctx, "🔧 Generating your complete agent code, please wait...")
+        plan = ctx.session.state.get("code_plan", "")
+        code, event = await self._run_agent(
+            ctx,
+            self.code_generator_agent,
+            f"user_confirmation: The user approved the plan below. Generate the full code.\n\n"
+            f"**Approved Plan:**\n{plan}\n\n{build_context_block(ticket)}",
+        )
+        yield event
+
+        yield self._message(ctx, "🔍 Reviewing code for quality and best practices...")
+        review, event = await self._run_agent(ctx, self.code_reviewer_agent, code)
+        yield event
+        final = format_code_reviewer_output(review)
+        _, event = await self._run_tool(
+            ctx, update_ticket_status, status="Resolved",
+            note="Code generated and reviewed", suggested_solution=final,
+        )
+        yield event
+        yield self._message(ctx, final)
+
+    # --- Helpers ---
+
+    async def _classify(
+        self, ctx: InvocationContext, message: str, question: str, labels: tuple[str, ...] = ("yes", "no", "other")
+    ) -> str:
+        """Classifies a reply, calling the intent classifier only when the reply is ambiguous."""
+        normalized = _normalize(message)
+        if "yes" in labels and normalized in AFFIRMATIVE_REPLIES:
+            return "yes"
+        if "no" in labels and normalized in NEGATIVE_REPLIES:
+            return "no"
+        if "greeting" in labels:
+            if normalized in GREETINGS:
+                return "greeting"
+            if len(normalized.split()) >= MIN_REQUEST_WORDS:
+                return "request"
+
+        prompt = (
+            f"Assistant's last question: {question or '(none)'}\n"
+            f"Developer's reply: {message}\n"
+            f"Allowed labels: {', '.join(labels)}"
+        )
+        answer, _ = await self._run_agent(ctx, self.intent_classifier_agent, prompt)
+        label = _normalize(answer).split()[:1]
+        intent = label[0] if label and label[0] in labels else labels[-1]
+        logger.info("Intent classifier labelled %r as '%s'.", message, intent)
+        return intent
+
+    def _ticket(self, ctx: InvocationContext) -> Optional[dict]:
+        try:
+            ticket = load_ticket(ctx)
+        except ValueError:
+            logger.warning("Could not parse ticket from state in the workflow engine.")
+            return None
+        return ticket.model_dump() if ticket else None
+
+    async def _run_agent(self, ctx: InvocationContext, agent: BaseAgent, request: str) -> tuple[str, Event]:
+        """Runs a sub-agent through AgentTool and returns its text and an event carrying its state changes."""
+        tool_context = ToolContext(ctx)
+        result = await AgentTool(agent).run_async(args={"request": request}, tool_context=tool_context)
+        logger.info("Workflow engine ran '%s'.", agent.name)
+        return str(result or ""), self._state_event(ctx, tool_context)
+
+    async def _run_tool(self, ctx: InvocationContext, func: Callable[..., Any], **kwargs) -> tuple[Any, Event]:
+        """Calls a tool function directly and returns its result and an event carrying its state changes."""
+        tool_context = ToolContext(ctx)
+        if "tool_context" in inspect.signature(func).parameters:
+            kwargs["tool_context"] = tool_context
+        result = func(**kwargs)
+        if inspect.isawaitable(result):
+            result = await result
+        logger.info("Workflow engine called tool '%s'.", func.__name__)
+        return result, self._state_event(ctx, tool_context)
+
+    def _state_event(self, ctx: InvocationContext, tool_context: ToolContext) -> Event:
+        return Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            actions=EventActions(state_delta=dict(tool_context.actions.state_delta)),
+        )
+
+    def _message(self, ctx: InvocationContext, text: str) -> Event:
+        return Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=text)]),
+        )
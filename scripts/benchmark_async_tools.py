@@ -0,0 +1,112 @@
+# FILE: scripts/benchmark_async_tools.py
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import numpy as np
+from tabulate import tabulate
+
+os.environ["TICKET_SEARCH_BACKEND"] = "local"
+os.environ["TICKET_INGEST_ENABLED"] = "false"
+
+from project_agora.tools import _data_tools, file_reader_tool  # noqa: E402
+from project_agora.tools._ticket_dataset import write_ticket_dataset  # noqa: E402
+from project_agora.tools._tool_executor import reset_tool_executor, tool_executor_stats  # noqa: E402
+from project_agora.tools._user_files import FileSpan  # noqa: E402
+
+DIM = 768
+
+
+def install_stand_ins(latency: float) -> None:
+    """Replaces the Vertex AI embedding call and the Cloud Storage read with calls that block for `latency`."""
+    rng = np.random.default_rng(0)
+
+    def embed(text: str, model_name: str = "") -> list[float]:
+        time.sleep(latency)
+        return rng.normal(size=DIM).tolist()
+
+    def read_span(file_uri: str, mode: str = "head", max_bytes: int = 0, offset: int = 0) -> FileSpan:
+        time.sleep(latency)
+        text = "Traceback (most recent call last):\n  PermissionDenied: 403 on deploy\n"
+        return FileSpan(text, 0, len(text), len(text))
+
+    _data_tools._get_embedding_for_query = embed
+    file_reader_tool.read_span = read_span
+
+
+async def session_with_sync_tools(i: int) -> None:
+    """One analysis and retrieval turn, with the tools called inline as sync tools were."""
+    file_reader_tool.read_span(f"gs://uploads/session-{i}.log")
+    _data_tools._search_resolved_tickets_db(f"Deployment fails with 403 (session {i})")
+
+
+async def session_with_async_tools(i: int) -> None:
+    await file_reader_tool.read_user_file(f"gs://uploads/session-{i}.log")
+    await _data_tools.search_resolved_tickets_db(f"Deployment fails with 403 (session {i})")
+
+
+async def run(session, sessions: int) -> dict:
+    """Runs `sessions` turns at once while a heartbeat task measures how long the event loop stalls."""
+    stalls, last_tick = [], [time.perf_counter()]
+
+    def tick():
+        now = time.perf_counter()
+        stalls.append(now - last_tick[0] - 0.005)
+        last_tick[0] = now
+
+    async def heartbeat():
+        while True:
+            await asyncio.sleep(0.005)
+            tick()
+
+    monitor = asyncio.create_task(heartbeat())
+    await asyncio.sleep(0)
+    started = last_tick[0] = time.perf_counter()
+    await asyncio.gather(*(session(i) for i in range(sessions)))
+    elapsed = time.perf_counter() - started
+    # A loop blocked until the end never ran the heartbeat, so close the last interval here.
+    tick()
+    monitor.cancel()
+    return {"sessions": sessions, "wall_s": elapsed, "max_loop_stall_ms": 1000 * max(stalls, default=0.0)}
+
+
+def main():
+    """Shows that N concurrent sessions using the async tools finish in about the time of one."""
+    parser = argparse.ArgumentParser(description="Compare blocking and async data/file tools under concurrent sessions.")
+    parser.add_argument("--sessions", type=int, nargs="*", default=[1, 10, 50], help="Concurrent session counts.")
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds each embedding or file read blocks.")
+    parser.add_argument("--pool-size", type=int, default=16, help="TOOL_THREAD_POOL_SIZE for the async tools.")
+    parser.add_argument("--tickets", type=int, default=5000, help="Tickets in the synthetic search dataset.")
+    args = parser.parse_args()
+
+    dataset_path = os.path.join(tempfile.mkdtemp(prefix="agora_async_"), "resolved_tickets")
+    vectors = np.random.default_rng(1).normal(size=(args.tickets, DIM))
+    write_ticket_dataset(
+        dataset_path, [{"ticket_id": f"T-{i:05d}"} for i in range(args.tickets)], vectors, dtype="float32"
+    )
+    os.environ["RESOLVED_TICKETS_PATH"] = dataset_path
+    os.environ["TOOL_THREAD_POOL_SIZE"] = str(args.pool_size)
+    install_stand_ins(args.latency)
+    # Load the backend once so neither variant pays for it.
+    _data_tools._search_resolved_tickets_db("warm-up")
+
+    rows = []
+    for sessions in args.sessions:
+        rows.append({"tools": "sync (previous)", **asyncio.run(run(session_with_sync_tools, sessions))})
+        reset_tool_executor()
+        rows.append({"tools": "async + pool", **asyncio.run(run(session_with_async_tools, sessions))})
+        rows[-1]["peak_threads"] = tool_executor_stats()["peak_running"]
+
+    print(tabulate(rows, headers="keys", floatfmt=".2f"))
+    one = next(r["wall_s"] for r in rows if r["tools"] == "async + pool" and r["sessions"] == min(args.sessions))
+    print(
+        f"\nINFO: One session takes {one:.2f} s with the async tools. Up to {args.pool_size} sessions "
+        f"(TOOL_THREAD_POOL_SIZE) run side by side; beyond that, calls queue for a free thread."
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# FILE: scripts/benchmark_direct_agents.py
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import AsyncGenerator
+
+from google.adk.agents import Agent
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+from tabulate import tabulate
+
+from project_agora.sub_agents.direct_tool_agent import DirectToolAgent
+
+
+class StubLlm(BaseLlm):
+    """
+    A model that waits `latency` seconds per call and then behaves like the retrieval
+    agents' model: call the tool with the request, then echo the tool result.
+    """
+
+    latency: float = 1.0
+    tool_name: str = "search"
+    calls: int = 0
+
+    @classmethod
+    def supported_models(cls) -> list[str]:
+        return [r"stub-.*"]
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+
+        last_parts = llm_request.contents[-1].parts if llm_request.contents else []
+        responses = [p.function_response for p in last_parts if p.function_response]
+        if responses:
+            part = types.Part(text=str(responses[0].response.get("result", "")))
+        else:
+            request = " ".join(p.text for p in last_parts if p.text)
+            part = types.Part(function_call=types.FunctionCall(name=self.tool_name, args={"query": request}))
+        yield LlmResponse(content=types.Content(role="model", parts=[part]))
+
+
+def make_search_tool(latency: float):
+    """A stand-in for a retrieval tool that takes `latency` seconds."""
+
+    def search(query: str) -> str:
+        """Searches for the given query."""
+        time.sleep(latency)
+        return f"[{{'ticket_id': 'TICK-0001', 'request': {query!r}}}]"
+
+    return search
+
+
+async def time_turns(agent, turns: int) -> list[float]:
+    """Runs `turns` single-message turns against `agent` and returns each turn's latency in seconds."""
+    runner = InMemoryRunner(agent=agent, app_name="benchmark")
+    latencies = []
+    for i in range(turns):
+        session = await runner.session_service.create_session(app_name="benchmark", user_id="bench")
+        message = types.Content(role="user", parts=[types.Part(text=f"How do I fix error {i}?")])
+        start = time.perf_counter()
+        async for _ in runner.run_async(user_id="bench", session_id=session.id, new_message=message):
+            pass
+        latencies.append(time.perf_counter() - start)
+
+        final = await runner.session_service.get_session(
+            app_name="benchmark", user_id="bench", session_id=session.id
+        )
+        assert final.state.get("db_retrieval_results"), "the agent did not write its output_key"
+    return latencies
+
+
+async def run_benchmark(model_latency: float, tool_latency: float, turns: int) -> list[dict]:
+    search = make_search_tool(tool_latency)
+    stub = StubLlm(model="stub-model", latency=model_latency, tool_name=search.__name__)
+    llm_agent = Agent(
+        name="db_retrieval_agent",
+        model=stub,
+        instruction="Call the search tool with the user's verbatim request.",
+        tools=[search],
+        output_key="db_retrieval_results",
+    )
+    direct_agent = DirectToolAgent(
+        name="db_retrieval_agent",
+        tools=[search],
+        output_key="db_retrieval_results",
+    )
+
+    rows = []
+    for label, agent in (("LlmAgent (stub model)", llm_agent), ("DirectToolAgent", direct_agent)):
+        stub.calls = 0
+        latencies = await time_turns(agent, turns)
+        rows.append(
+            {
+                "agent": label,
+                "model_calls/turn": stub.calls / turns,
+                "mean_s": statistics.mean(latencies),
+                "p50_s": statistics.median(latencies),
+                "max_s": max(latencies),
+            }
+        )
+    return rows
+
+
+def main():
+    """Compares retrieval-agent turn latency with and without the model hop."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark a tool-wrapper LlmAgent against DirectToolAgent using a stubbed model."
+    )
+    parser.add_argument("--model-latency", type=float, default=1.5, help="Seconds per stubbed model call.")
+    parser.add_argument("--tool-latency", type=float, default=0.3, help="Seconds per tool call.")
+    parser.add_argument("--turns", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = asyncio.run(run_benchmark(args.model_latency, args.tool_latency, args.turns))
+    print(tabulate(rows, headers="keys", floatfmt=".3f"))
+    saved = rows[0]["mean_s"] - rows[1]["mean_s"]
+    print(f"\nINFO: The direct path saves {saved:.3f}s per turn ({rows[0]['model_calls/turn']:.0f} model calls).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# FILE: scripts/benchmark_model_routing.py
+
+import argparse
+import asyncio
+import re
+import time
+from typing import AsyncGenerator
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.adk.models.registry import LLMRegistry
+from google.genai import types
+from tabulate import tabulate
+
+from project_agora.model_routing import ModelRoute, RoutedLlm, model_routing_stats
+
+
+class FakeLlm(BaseLlm):
+    """
+    A fake backend named `fake-<seconds>s` (e.g. `fake-0.2s`) that answers after that
+    many seconds, or `fake-error`, which always fails. Token usage is reported from
+    the request and response sizes.
+    """
+
+    @classmethod
+    def supported_models(cls) -> list[str]:
+        return [r"fake-.*"]
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        if self.model == "fake-error":
+            raise ConnectionError("simulated 503 from the model endpoint")
+        await asyncio.sleep(float(re.match(r"fake-([\d.]+)s", self.model).group(1)))
+
+        prompt = " ".join(p.text or "" for c in llm_request.contents for p in c.parts or [])
+        text = f"Answered by {self.model}."
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text=text)]),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=len(prompt.split()), candidates_token_count=len(text.split())
+            ),
+        )
+
+
+SCENARIOS = {
+    # A primary that answers well inside its budget is never failed over.
+    "fast_agent": ModelRoute(model="fake-0.05s", fallback="fake-0.02s", latency_budget_s=0.5),
+    # A primary that always breaches its budget fails over, then gets downgraded.
+    "slow_agent": ModelRoute(
+        model="fake-2.0s", fallback="fake-0.05s", latency_budget_s=0.3, downgrade_after=3, downgrade_cooldown_s=60
+    ),
+    # A primary that errors fails over immediately.
+    "failing_agent": ModelRoute(model="fake-error", fallback="fake-0.05s", latency_budget_s=0.5),
+    # Without a fallback a slow primary is simply waited for.
+    "no_fallback_agent": ModelRoute(model="fake-0.4s", latency_budget_s=0.1),
+}
+
+
+async def call(llm: RoutedLlm, text: str) -> tuple[str, float]:
+    request = LlmRequest(model=llm.model, contents=[types.Content(role="user", parts=[types.Part(text=text)])])
+    started = time.perf_counter()
+    responses = [response async for response in llm.generate_content_async(request)]
+    return responses[-1].content.parts[0].text, time.perf_counter() - started
+
+
+async def run(calls: int) -> list[dict]:
+    LLMRegistry.register(FakeLlm)
+    rows = []
+    for agent_name, route in SCENARIOS.items():
+        llm = RoutedLlm(model=route.model, agent_name=agent_name, route=route)
+        total = 0.0
+        for i in range(calls):
+            answer, seconds = await call(llm, f"Request {i}: how do I add a tool to my agent?")
+            total += seconds
+        rows.append({"agent": agent_name, "last_answer": answer, "turn_total_s": total})
+    return rows
+
+
+def main():
+    """Exercises latency budgets, failover and downgrade against fake slow, fast and failing backends."""
+    parser = argparse.ArgumentParser(description="Benchmark model routing with fake model backends.")
+    parser.add_argument("--calls", type=int, default=6, help="Calls per simulated agent.")
+    args = parser.parse_args()
+
+    rows = asyncio.run(run(args.calls))
+    print(tabulate(rows, headers="keys", floatfmt=".3f"))
+    print()
+
+    stats = model_routing_stats()
+    print(
+        tabulate(
+            [
+                {
+                    "agent": name,
+                    "calls_by_model": s["calls_by_model"],
+                    "failovers": s["failovers"],
+                    "breaches": s["budget_breaches"],
+                    "downgraded": s["downgraded_calls"],
+                    "errors": s["errors"],
+                    "p50_s": s["p50_s"],
+                    "p95_s": s["p95_s"],
+                    "prompt_tok": s["prompt_tokens"],
+                    "output_tok": s["output_tokens"],
+                }
+                for name, s in stats.items()
+            ],
+            headers="keys",
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
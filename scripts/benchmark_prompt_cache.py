@@ -0,0 +1,84 @@
+# FILE: scripts/benchmark_prompt_cache.py
+
+import argparse
+import asyncio
+import os
+import shutil
+import tempfile
+
+from google.adk.models import LlmRequest
+from google.genai import types
+from tabulate import tabulate
+
+from project_agora.prompt_cache import FilePrompt, LocalContextCacheBackend, PromptPrefixCache
+from project_agora.sub_agents.code_generator import prompts as generator_prompts
+from project_agora.sub_agents.code_reviewer import prompts as reviewer_prompts
+
+
+async def simulate(tickets: int, edit_after: int, min_tokens: int) -> tuple[dict, LocalContextCacheBackend, int]:
+    """
+    Sends the plan, generation and review calls of `tickets` code-generation tickets
+    through the prompt-prefix cache, editing a copy of the style guide after
+    `edit_after` tickets. Returns the cache statistics, the backend and the rebuild count.
+    """
+    workdir = tempfile.mkdtemp(prefix="agora_prompt_cache_")
+    guide = os.path.join(workdir, "style_guide.md")
+    shutil.copy(generator_prompts.STYLE_GUIDE_PATH, guide)
+    # Both prompt modules read the guide through their STYLE_GUIDE_PATH, so point them at the copy.
+    generator_prompts.STYLE_GUIDE_PATH = guide
+    reviewer_prompts.STYLE_GUIDE_PATH = guide
+
+    instructions = {
+        "code_generator_agent": FilePrompt(generator_prompts.build_code_generator_prompt, [guide]),
+        "code_reviewer_agent": FilePrompt(reviewer_prompts.build_code_reviewer_prompt, [guide]),
+    }
+    backend = LocalContextCacheBackend(min_tokens=min_tokens)
+    cache = PromptPrefixCache(backend)
+    for agent_name in instructions:
+        cache.register(agent_name)
+
+    async def call(agent_name: str, request: str):
+        llm_request = LlmRequest(
+            model="gemini-2.5-pro",
+            contents=[types.Content(role="user", parts=[types.Part(text=request)])],
+            config=types.GenerateContentConfig(system_instruction=instructions[agent_name](None)),
+        )
+        await cache.apply(agent_name, llm_request)
+
+    try:
+        for ticket in range(tickets):
+            if ticket == edit_after:
+                with open(guide, "a", encoding="utf-8") as f:
+                    f.write("\n\n### 10. Logging\n- Tools MUST log their inputs at DEBUG level.\n")
+            await call("code_generator_agent", f"Ticket {ticket}: plan an agent.")
+            await call("code_generator_agent", f"Ticket {ticket}: user_confirmation, generate the code.")
+            await call("code_reviewer_agent", f"Ticket {ticket}: review this code.")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    rebuilds = sum(prompt.rebuilds for prompt in instructions.values())
+    return cache.stats(), backend, rebuilds
+
+
+def main():
+    """Counts cached versus uncached style-guide prefix tokens with the local context-cache stand-in."""
+    parser = argparse.ArgumentParser(description="Simulate prompt-prefix caching for the code generator and reviewer.")
+    parser.add_argument("--tickets", type=int, default=20, help="Code-generation tickets to simulate.")
+    parser.add_argument("--edit-after", type=int, default=10, help="Edit the style guide after this many tickets.")
+    parser.add_argument("--min-tokens", type=int, default=1024, help="Smallest prefix the stand-in accepts.")
+    args = parser.parse_args()
+
+    stats, backend, rebuilds = asyncio.run(simulate(args.tickets, args.edit_after, args.min_tokens))
+    rows = []
+    for agent_name, s in stats.items():
+        total = s["cached_prefix_tokens"] + s["uncached_prefix_tokens"]
+        rows.append({"agent": agent_name, **s, "cached_share": s["cached_prefix_tokens"] / total if total else 0.0})
+    print(tabulate(rows, headers="keys", floatfmt=".2f"))
+    print(
+        f"\nINFO: {backend.created} caches created, {backend.deleted} deleted after the style guide changed, "
+        f"{rebuilds} prompt rebuilds."
+    )
+
+
+if __name__ == "__main__":
+    main()
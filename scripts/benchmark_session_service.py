@@ -0,0 +1,111 @@
+# FILE: scripts/benchmark_session_service.py
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+import uuid
+
+from google.adk.events import Event, EventActions
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+from tabulate import tabulate
+
+from project_agora.session_service import SqliteSessionService
+
+APP_NAME = "project_agora"
+
+
+def _event(author: str, text: str = "", state_delta: dict = None, invocation_id: str = "") -> Event:
+    return Event(
+        invocation_id=invocation_id,
+        author=author,
+        content=types.Content(role="user" if author == "user" else "model", parts=[types.Part(text=text)])
+        if text else None,
+        actions=EventActions(state_delta=state_delta or {}),
+    )
+
+
+async def simulate_session(service, user_id: str, turns: int, ticket_chars: int) -> list[float]:
+    """Creates a session and plays `turns` ticket turns, returning the latency of each turn."""
+    session = await service.create_session(app_name=APP_NAME, user_id=user_id)
+    latencies = []
+    for turn in range(turns):
+        started = time.perf_counter()
+        invocation_id = f"e-{uuid.uuid4()}"
+        # Each turn reloads the session, then appends the events a workflow turn produces.
+        session = await service.get_session(app_name=APP_NAME, user_id=user_id, session_id=session.id)
+        await service.append_event(session, _event("user", f"Message {turn}", invocation_id=invocation_id))
+        await service.append_event(
+            session,
+            _event("workflow_agent", state_delta={"ticket": "x" * ticket_chars, "pipeline_seconds": turn},
+                   invocation_id=invocation_id),
+        )
+        await service.append_event(
+            session,
+            _event("workflow_agent", state_delta={"kb_retrieval_results": f"results {turn}"}, invocation_id=invocation_id),
+        )
+        await service.append_event(session, _event("workflow_agent", f"Reply {turn}", invocation_id=invocation_id))
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+async def run(service, sessions: int, turns: int, ticket_chars: int) -> dict:
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(simulate_session(service, f"dev-{i}", turns, ticket_chars) for i in range(sessions))
+    )
+    elapsed = time.perf_counter() - started
+    latencies = sorted(latency for session in results for latency in session)
+    return {
+        "sessions": sessions,
+        "turns_per_s": len(latencies) / elapsed,
+        "events_per_s": 4 * len(latencies) / elapsed,
+        "p50_turn_ms": 1000 * statistics.median(latencies),
+        "p95_turn_ms": 1000 * latencies[int(0.95 * (len(latencies) - 1))],
+    }
+
+
+async def check_durability(db_path: str) -> bool:
+    """Writes a session, reopens the database and checks that the state and events survived."""
+    service = SqliteSessionService(db_path)
+    session = await service.create_session(app_name=APP_NAME, user_id="restart", state={"user:name": "Ada"})
+    await service.append_event(session, _event("workflow_agent", state_delta={"ticket": "{}"}))
+    service.close()
+
+    reopened = SqliteSessionService(db_path)
+    restored = await reopened.get_session(app_name=APP_NAME, user_id="restart", session_id=session.id)
+    reopened.close()
+    return restored is not None and restored.state == session.state and len(restored.events) == 1
+
+
+def main():
+    """Compares session-service throughput of InMemorySessionService and SqliteSessionService."""
+    parser = argparse.ArgumentParser(description="Benchmark the SQLite session service against the in-memory one.")
+    parser.add_argument("--sessions", type=int, nargs="*", default=[1, 10, 100], help="Concurrent session counts.")
+    parser.add_argument("--turns", type=int, default=10, help="Turns per session.")
+    parser.add_argument("--ticket-chars", type=int, default=2000, help="Size of the ticket written each turn.")
+    parser.add_argument("--pool-size", type=int, default=4, help="SQLite connection pool size.")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="agora_sessions_")
+    rows = []
+    for sessions in args.sessions:
+        db_path = os.path.join(workdir, f"sessions_{sessions}.sqlite3")
+        services = {
+            "in-memory": InMemorySessionService(),
+            "sqlite": SqliteSessionService(db_path, pool_size=args.pool_size),
+        }
+        for name, service in services.items():
+            rows.append({"service": name, **asyncio.run(run(service, sessions, args.turns, args.ticket_chars))})
+        services["sqlite"].close()
+
+    print(tabulate(rows, headers="keys", floatfmt=".1f"))
+    durable = asyncio.run(check_durability(os.path.join(workdir, "restart.sqlite3")))
+    print(f"\nINFO: State and events {'survived' if durable else 'did NOT survive'} reopening the SQLite database.")
+
+
+if __name__ == "__main__":
+    main()
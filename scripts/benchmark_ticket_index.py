@@ -0,0 +1,174 @@
+# FILE: scripts/benchmark_ticket_index.py
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+from tabulate import tabulate
+
+from project_agora.tools._ann_index import HNSWIndex
+from project_agora.tools._ticket_dataset import DEFAULT_DATASET_PATH, load_ticket_dataset
+from project_agora.tools._vector_store import LocalTicketBackend, QuantizedTicketBackend
+
+
+def make_synthetic_embeddings(count: int, dim: int, seed: int = 0) -> np.ndarray:
+    """Generates clustered unit vectors that roughly mimic topic-grouped ticket embeddings."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(count // 50, 1), dim))
+    assignments = rng.integers(0, len(centers), size=count)
+    vectors = centers[assignments] + 0.6 * rng.normal(size=(count, dim))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def exact_top_k(matrix: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    """Brute-force top-k ids for every query (the ground truth)."""
+    scores = queries @ matrix.T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+def recall_report(
+    matrix: np.ndarray,
+    queries: np.ndarray,
+    k: int = 3,
+    ef_values=(8, 16, 32, 64, 128),
+    M: int = 16,
+    ef_construction: int = 100,
+) -> list[dict]:
+    """Builds an HNSW index over `matrix` and measures recall@k and latency for each `ef`."""
+    start = time.perf_counter()
+    index = HNSWIndex(matrix.shape[1], M=M, ef_construction=ef_construction)
+    index.add(matrix)
+    build_seconds = time.perf_counter() - start
+
+    truth = exact_top_k(matrix, queries, k)
+
+    start = time.perf_counter()
+    for query in queries:
+        np.argpartition(-(matrix @ query), k)[:k]
+    exact_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+    rows = []
+    for ef in ef_values:
+        hits = 0
+        start = time.perf_counter()
+        for query, expected in zip(queries, truth):
+            ids, _ = index.search(query, k, ef=ef)
+            hits += len(set(ids.tolist()) & set(expected.tolist()))
+        latency_ms = (time.perf_counter() - start) * 1000 / len(queries)
+        rows.append(
+            {
+                "ef": ef,
+                f"recall@{k}": hits / (k * len(queries)),
+                "ann_ms/query": latency_ms,
+                "exact_ms/query": exact_ms,
+                "build_s": build_seconds,
+            }
+        )
+    return rows
+
+
+def query_peak_bytes(backend, query: np.ndarray, k: int) -> int:
+    """Peak memory allocated while answering one query, on top of what the backend holds."""
+    tracemalloc.start()
+    try:
+        backend.search(query.tolist(), k)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def quantization_report(matrix: np.ndarray, queries: np.ndarray, k: int = 3, subspaces: int = 96) -> list[dict]:
+    """Measures resident and per-query peak memory, latency and recall@k of each ticket search representation."""
+    tickets = [{"ticket_id": str(i)} for i in range(len(matrix))]
+    truth = exact_top_k(matrix, queries, k)
+    dim = matrix.shape[1]
+
+    # The quantized backends re-rank against memory-mapped rows, as they do when loading a dataset.
+    rows_path = os.path.join(tempfile.mkdtemp(prefix="agora_quantized_"), "embeddings.npy")
+    np.save(rows_path, matrix)
+    stored_rows = np.load(rows_path, mmap_mode="r")
+
+    backends = [
+        ("float64 lists (previous)", None, dim * 8),
+        ("float32 exact", LocalTicketBackend(tickets, matrix), dim * 4),
+    ]
+    for mode, options in (("int8", {}), ("pq", {"subspaces": subspaces})):
+        for rerank in (0, 30):
+            backend = QuantizedTicketBackend(tickets, stored_rows, mode=mode, rerank_candidates=rerank, **options)
+            label = f"{mode} + rerank {rerank}" if rerank else f"{mode} (ADC only)"
+            backends.append((label, backend, backend.quantizer.nbytes / len(matrix)))
+
+    rows = []
+    for label, backend, bytes_per_ticket in backends:
+        if backend is None:
+            # Baseline: what the previous code held in memory, without a search implementation.
+            rows.append(
+                {
+                    "mode": label,
+                    "bytes/ticket": bytes_per_ticket,
+                    "resident_MiB": bytes_per_ticket * len(matrix) / 2**20,
+                    "query_peak_MiB": None,
+                    "ms/query": None,
+                    f"recall@{k}": None,
+                }
+            )
+            continue
+        hits = 0
+        start = time.perf_counter()
+        for query, expected in zip(queries, truth):
+            found = {int(r["ticket_id"]) for r in backend.search(query.tolist(), k)}
+            hits += len(found & set(expected.tolist()))
+        ms_per_query = (time.perf_counter() - start) * 1000 / len(queries)
+        rows.append(
+            {
+                "mode": label,
+                "bytes/ticket": bytes_per_ticket,
+                "resident_MiB": bytes_per_ticket * len(matrix) / 2**20,
+                "query_peak_MiB": query_peak_bytes(backend, queries[0], k) / 2**20,
+                "ms/query": ms_per_query,
+                f"recall@{k}": hits / (k * len(queries)),
+            }
+        )
+    return rows
+
+
+def main():
+    """Reports recall@3 of the HNSW index and of each quantized representation against exact search."""
+    parser = argparse.ArgumentParser(
+        description="Measure HNSW and quantized-index recall@k against exact cosine search."
+    )
+    parser.add_argument("--dataset", default=str(DEFAULT_DATASET_PATH), help="Binary ticket dataset directory.")
+    parser.add_argument(
+        "--synthetic",
+        type=int,
+        default=0,
+        help="Append this many synthetic tickets to model a larger history.",
+    )
+    parser.add_argument("--queries", type=int, default=200, help="Number of perturbed queries to run.")
+    parser.add_argument("--k", type=int, default=3)
+    args = parser.parse_args()
+
+    matrix = np.asarray(load_ticket_dataset(args.dataset).vectors(), dtype=np.float32)
+    matrix = matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+    if args.synthetic:
+        matrix = np.vstack([matrix, make_synthetic_embeddings(args.synthetic, matrix.shape[1])])
+
+    # Queries are stored tickets with added noise, like a paraphrased question.
+    rng = np.random.default_rng(1)
+    picks = rng.integers(0, len(matrix), size=args.queries)
+    queries = matrix[picks] + 0.02 * rng.normal(size=(args.queries, matrix.shape[1])).astype(np.float32)
+    queries /= np.linalg.norm(queries, axis=1, keepdims=True)
+
+    print(f"INFO: {len(matrix)} tickets, {args.queries} queries, dim {matrix.shape[1]}.")
+    print("\nHNSW index (recall vs. ef):")
+    print(tabulate(recall_report(matrix, queries, k=args.k), headers="keys", floatfmt=".3f"))
+
+    print("\nQuantized storage (resident and per-query peak memory, latency and recall per mode):")
+    print(tabulate(quantization_report(matrix, queries, k=args.k), headers="keys", floatfmt=".3f"))
+
+
+if __name__ == "__main__":
+    main()
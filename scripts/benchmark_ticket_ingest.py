@@ -0,0 +1,220 @@
+# FILE: scripts/benchmark_ticket_ingest.py
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+from tabulate import tabulate
+
+from project_agora.tools import _vector_store
+from project_agora.tools._ticket_dataset import load_ticket_dataset, write_ticket_dataset
+from project_agora.tools._ticket_ingest import get_ticket_ingestor, reset_ticket_ingestor
+from project_agora.tools._vector_store import get_ticket_search_backend, reset_ticket_search_backend
+
+
+class _Job:
+    def __init__(self, rows: list[dict]):
+        self.rows = rows
+
+    def result(self) -> list[dict]:
+        return self.rows
+
+
+class InMemoryBigQueryTable:
+    """
+    Stands in for the BigQuery client of a single `resolved_tickets` table: it
+    answers the vector search and ticket-id lookups and applies load jobs.
+    """
+
+    def __init__(self, tickets: list[dict], embeddings: np.ndarray):
+        self.rows = [{**t, "request_embedding": e} for t, e in zip(tickets, embeddings)]
+        self.load_jobs = 0
+
+    def query(self, sql: str, job_config=None) -> _Job:
+        params = {p.name: getattr(p, "values", getattr(p, "value", None)) for p in job_config.query_parameters}
+        if "ticket_ids" in params:
+            wanted = set(params["ticket_ids"])
+            return _Job([{"ticket_id": r["ticket_id"]} for r in self.rows if r["ticket_id"] in wanted])
+        matrix = np.stack([r["request_embedding"] for r in self.rows])
+        query = np.asarray(params["query_embedding"], dtype=np.float32)
+        distances = 1.0 - (matrix @ query) / (np.linalg.norm(matrix, axis=1) * np.linalg.norm(query))
+        best = np.argsort(distances, kind="stable")[: params["top_k"]]
+        return _Job(
+            [
+                {**{f: self.rows[i].get(f) for f in _vector_store.TICKET_RESULT_FIELDS}, "distance": float(distances[i])}
+                for i in best
+            ]
+        )
+
+    def load_table_from_json(self, rows: list[dict], table_id: str, job_config=None) -> _Job:
+        self.load_jobs += 1
+        self.rows.extend({**r, "request_embedding": np.asarray(r["request_embedding"], dtype=np.float32)} for r in rows)
+        return _Job([])
+
+    def duplicate_rows(self) -> int:
+        return len(self.rows) - len({r["ticket_id"] for r in self.rows})
+
+
+def random_unit_vectors(count: int, dim: int, rng: np.random.Generator) -> np.ndarray:
+    vectors = rng.normal(size=(count, dim))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def make_ticket(i: int) -> dict:
+    return {
+        "ticket_id": f"NEW-{i:05d}",
+        "customer_id": "DEV-0000",
+        "request": f"Newly resolved request {i}",
+        "category": "Deployment",
+        "suggested_solution": f"Solution {i}",
+    }
+
+
+def wait_until_searchable(ticket_id: str, embedding: np.ndarray, timeout: float) -> float:
+    """Polls the live backend until the ticket is the top hit for its own embedding."""
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        results = get_ticket_search_backend().search(embedding.tolist(), top_k=1)
+        if results and results[0]["ticket_id"] == ticket_id:
+            return time.perf_counter() - started
+        time.sleep(0.01)
+    raise TimeoutError(f"{ticket_id} was not searchable after {timeout:.0f} s.")
+
+
+def report_bigquery_restart(table: InMemoryBigQueryTable, expected: int) -> None:
+    """
+    Restarts the merger twice against the table: once as is, and once with the
+    checkpoint rewound, as after a crash between a load job and its checkpoint.
+    Neither may append a ticket the table already holds.
+    """
+    rows = []
+    for rewind in (False, True):
+        ingestor = get_ticket_ingestor()
+        if rewind:
+            ingestor.wal.commit_checkpoint(0)
+            reset_ticket_ingestor()
+            reset_ticket_search_backend()
+            ingestor = get_ticket_ingestor()
+        jobs, wal_seq = table.load_jobs, get_ticket_search_backend().wal_seq
+        resent = ingestor.merge()
+        rows.append(
+            {
+                "restart": "checkpoint rewound" if rewind else "clean",
+                "wal_seq_at_start": wal_seq,
+                "records_resent": resent,
+                "load_jobs": table.load_jobs - jobs,
+                "table_rows": len(table.rows),
+                "duplicate_rows": table.duplicate_rows(),
+            }
+        )
+        reset_ticket_ingestor()
+        reset_ticket_search_backend()
+    print()
+    print(tabulate(rows, headers="keys"))
+    ok = all(r["duplicate_rows"] == 0 and r["table_rows"] == expected for r in rows)
+    print(
+        f"\nINFO: After both restarts, the table holds {len(table.rows)} of {expected} tickets: "
+        f"{'no duplicates' if ok else 'DUPLICATES OR MISSING TICKETS'}."
+    )
+
+
+def main():
+    """Measures how quickly resolved tickets become searchable, and checks recovery after a crash."""
+    parser = argparse.ArgumentParser(description="Benchmark online ingestion of resolved tickets.")
+    parser.add_argument(
+        "--backend",
+        choices=["local", "hnsw", "bigquery"],
+        default="local",
+        help="Ticket search backend; 'bigquery' runs against an in-memory stand-in for the table.",
+    )
+    parser.add_argument("--base-tickets", type=int, default=20000, help="Tickets in the base dataset.")
+    parser.add_argument("--new-tickets", type=int, default=50, help="Tickets resolved during the run.")
+    parser.add_argument("--dim", type=int, default=768, help="Embedding dimension.")
+    parser.add_argument("--compact-after", type=int, default=40, help="Merged records that trigger a compaction.")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="agora_ingest_")
+    rng = np.random.default_rng(0)
+    dataset_path = os.path.join(workdir, "resolved_tickets")
+    base_tickets = [{"ticket_id": f"BASE-{i:06d}", "request": f"Request {i}"} for i in range(args.base_tickets)]
+    base_embeddings = random_unit_vectors(args.base_tickets, args.dim, rng)
+    table = None
+    if args.backend == "bigquery":
+        table = InMemoryBigQueryTable(base_tickets, base_embeddings)
+        _vector_store.get_bigquery_client = lambda project_id, location=None: table
+        os.environ.update({"BQ_PROJECT_ID": "benchmark", "BQ_DATASET_ID": "tickets", "BQ_RESULT_CACHE_SIZE": "0"})
+    else:
+        write_ticket_dataset(dataset_path, base_tickets, base_embeddings, dtype="float32")
+    os.environ.update(
+        {
+            "TICKET_SEARCH_BACKEND": args.backend,
+            "RESOLVED_TICKETS_PATH": dataset_path,
+            "TICKET_INDEX_PATH": os.path.join(workdir, "index.npz"),
+            "TICKET_INGEST_ENABLED": "true",
+            "TICKET_INGEST_BIGQUERY": "true",
+            "TICKET_INGEST_WAL_PATH": os.path.join(workdir, "resolved_tickets_wal.log"),
+            "TICKET_INGEST_INTERVAL_SECONDS": "2",
+            "TICKET_INGEST_COMPACT_AFTER": str(args.compact_after),
+        }
+    )
+
+    started = time.perf_counter()
+    get_ticket_search_backend()
+    reload_seconds = time.perf_counter() - started
+
+    ingestor = get_ticket_ingestor()
+    embeddings = random_unit_vectors(args.new_tickets, args.dim, rng)
+    latencies = []
+    for i, embedding in enumerate(embeddings):
+        ticket = make_ticket(i)
+        submitted = time.perf_counter()
+        ingestor.submit(ticket, embedding)
+        wait_until_searchable(ticket["ticket_id"], embedding, timeout=30)
+        latencies.append(time.perf_counter() - submitted)
+    stats = ingestor.stats()
+
+    latencies.sort()
+    print(
+        tabulate(
+            [
+                {
+                    "backend": args.backend,
+                    "base_tickets": args.base_tickets,
+                    "new_tickets": args.new_tickets,
+                    "p50_searchable_ms": 1000 * latencies[len(latencies) // 2],
+                    "max_searchable_ms": 1000 * latencies[-1],
+                    "full_reload_ms": 1000 * reload_seconds,
+                    "compactions": stats["compactions"],
+                }
+            ],
+            headers="keys",
+            floatfmt=".1f",
+        )
+    )
+
+    # Simulate a crash: stop without compacting, leave a torn record behind and start again.
+    reset_ticket_ingestor()
+    with open(os.environ["TICKET_INGEST_WAL_PATH"], "ab") as f:
+        f.write(b"0badc0de\t{\"seq\": ")
+    reset_ticket_search_backend()
+    backend = get_ticket_search_backend()
+    if table is not None:
+        report_bigquery_restart(table, args.base_tickets + args.new_tickets)
+        return
+    expected = args.base_tickets + args.new_tickets
+    on_disk = len(load_ticket_dataset(dataset_path))
+    recovered = len(backend.tickets) == expected and all(
+        wait_until_searchable(make_ticket(i)["ticket_id"], embeddings[i], timeout=1) >= 0
+        for i in range(args.new_tickets)
+    )
+    print(
+        f"\nINFO: After a simulated crash, {len(backend.tickets)} of {expected} tickets are searchable "
+        f"({on_disk} in the compacted dataset, the rest replayed from the log): "
+        f"{'recovered' if recovered else 'NOT recovered'}."
+    )
+
+
+if __name__ == "__main__":
+    main()
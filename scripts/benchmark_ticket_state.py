@@ -0,0 +1,135 @@
+# FILE: scripts/benchmark_ticket_state.py
+
+import argparse
+import asyncio
+import json
+import os
+import time
+import uuid
+from types import SimpleNamespace
+
+from tabulate import tabulate
+
+# Resolving a ticket would otherwise embed its request for the solution store and the ticket search.
+os.environ["SOLUTION_STORE_ENABLED"] = "false"
+os.environ["TICKET_INGEST_ENABLED"] = "false"
+
+from project_agora.ticket_state import load_ticket, reset_ticket_state_stats, ticket_state_stats  # noqa: E402
+from project_agora.tools._state_tools import (  # noqa: E402
+    create_ticket,
+    update_ticket_after_analysis,
+    update_ticket_after_retrieval,
+    update_ticket_status,
+)
+
+# `update_ticket_status` is async; one loop runs it for every lifecycle.
+loop = asyncio.new_event_loop()
+
+ANALYSIS = json.dumps({"urgency": "High", "category": "Deployment", "sentiment": "Frustrated", "summary": "403 on deploy."})
+
+
+class FakeToolContext:
+    """Carries the same state, session id and invocation id a ToolContext or CallbackContext exposes."""
+
+    def __init__(self, state: dict, session_id: str, invocation_id: str):
+        self.state = state
+        self._invocation_context = SimpleNamespace(
+            session=SimpleNamespace(id=session_id, state=state), invocation_id=invocation_id
+        )
+
+
+def lifecycle_with_accessor(state: dict, blob: str, model_calls: int) -> None:
+    """One ticket through the state tools, with the per-call callback reads, using ticket_state."""
+    session_id = uuid.uuid4().hex
+
+    # Turn 1: intake, analysis and retrieval.
+    ctx = FakeToolContext(state, session_id, "inv-1")
+    load_ticket(ctx)  # before_agent_call
+    create_ticket("My agent deployment to Cloud Run fails with a 403 error.", ctx)
+    update_ticket_after_analysis(ANALYSIS, ctx)
+    update_ticket_after_retrieval(ctx, kb_results=blob, db_results=blob)
+    for _ in range(model_calls):
+        load_ticket(ctx)  # route_model_for_state
+
+    # Turn 2: solution.
+    ctx = FakeToolContext(state, session_id, "inv-2")
+    load_ticket(ctx)
+    for _ in range(model_calls):
+        load_ticket(ctx)
+    loop.run_until_complete(update_ticket_status("Pending Solution", ctx))
+    loop.run_until_complete(update_ticket_status("Resolved", ctx, suggested_solution=blob[:2000]))
+
+
+def lifecycle_legacy(state: dict, blob: str, model_calls: int) -> None:
+    """The same lifecycle with a json.loads per read and json.dumps(indent=2) per update."""
+
+    def read() -> dict:
+        return json.loads(state["ticket"]) if "ticket" in state else {}
+
+    def update(**fields) -> None:
+        ticket = read()
+        note = fields.pop("note")
+        ticket.update(fields)
+        ticket["resolution_history"].append(note)
+        state["ticket"] = json.dumps(ticket, indent=2)
+
+    read()
+    state["ticket"] = json.dumps(
+        {
+            "ticket_id": "TICK-0000", "customer_id": "DEV-0000", "status": "New",
+            "request": "My agent deployment to Cloud Run fails with a 403 error.", "analysis": None,
+            "retrieved_docs": [], "suggested_solution": None, "solution_source": None,
+            "retrieved_kb_docs": None, "retrieved_db_tickets": None, "resolution_history": [], "assigned_agent": None,
+        },
+        indent=2,
+    )
+    update(note="Analysis completed", analysis=json.loads(ANALYSIS), status="Analyzing")
+    update(note="Retrieval completed", retrieved_kb_docs=blob, retrieved_db_tickets=blob,
+           status="AwaitingContextConfirmation")
+    for _ in range(model_calls):
+        read()
+
+    read()
+    for _ in range(model_calls):
+        read()
+    update(note="Status changed", status="Pending Solution")
+    update(note="Status changed", status="Resolved", suggested_solution=blob[:2000])
+
+
+def measure(lifecycle, tickets: int, blob: str, model_calls: int) -> dict:
+    state: dict = {}
+    started = time.perf_counter()
+    for _ in range(tickets):
+        state = {}
+        lifecycle(state, blob, model_calls)
+    elapsed = time.perf_counter() - started
+    return {"ms_per_ticket": 1000 * elapsed / tickets, "ticket_bytes": len(state["ticket"].encode("utf-8"))}
+
+
+def main():
+    """Times a full ticket lifecycle with and without the typed ticket accessor."""
+    parser = argparse.ArgumentParser(description="Micro-benchmark of ticket state parsing and serialization.")
+    parser.add_argument("--tickets", type=int, default=500, help="Ticket lifecycles per variant.")
+    parser.add_argument("--blob-chars", type=int, default=20000, help="Size of each retrieval result blob.")
+    parser.add_argument("--model-calls", type=int, default=4, help="Model calls (ticket reads) per turn.")
+    args = parser.parse_args()
+
+    blob = ("Grant roles/aiplatform.user to the Cloud Run service account.\n" * (args.blob_chars // 62 + 1))[
+        : args.blob_chars
+    ]
+    legacy = measure(lifecycle_legacy, args.tickets, blob, args.model_calls)
+    reset_ticket_state_stats()
+    accessor = measure(lifecycle_with_accessor, args.tickets, blob, args.model_calls)
+    stats = ticket_state_stats()
+
+    rows = [{"variant": "json per access", **legacy}, {"variant": "ticket_state", **accessor}]
+    print(tabulate(rows, headers="keys", floatfmt=".3f"))
+    print(
+        f"\nINFO: ticket_state served {stats['cache_hits']} of {stats['loads']} loads without parsing "
+        f"({stats['parses']} parses, {stats['serializations']} serializations); "
+        f"{legacy['ms_per_ticket'] / accessor['ms_per_ticket']:.1f}x faster per ticket."
+    )
+
+
+if __name__ == "__main__":
+    main()
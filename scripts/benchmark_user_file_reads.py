@@ -0,0 +1,93 @@
+# FILE: scripts/benchmark_user_file_reads.py
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+
+from tabulate import tabulate
+
+from project_agora.tools._user_files import iter_lines, open_user_file
+from project_agora.tools.file_reader_tool import read_user_file
+
+LOG_LINE = b"2025-06-01T12:00:00Z INFO agent.runner Processed event for session 42 in 12 ms\n"
+ERROR_TAIL = b"Traceback (most recent call last):\n  google.api_core.exceptions.PermissionDenied: 403 on deploy\n"
+
+
+def write_log(path: str, size_bytes: int) -> None:
+    """Writes a log of about `size_bytes` that ends with a traceback, without holding it in memory."""
+    block = LOG_LINE * (1024 * 1024 // len(LOG_LINE))
+    with open(path, "wb") as f:
+        written = 0
+        while written + len(block) <= size_bytes:
+            f.write(block)
+            written += len(block)
+        f.write(ERROR_TAIL)
+
+
+def measure(func) -> tuple[float, float, object]:
+    """Returns (milliseconds, peak traced MiB, result) of one call."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return 1000 * elapsed, peak / 2**20, result
+
+
+def read_whole(path: str) -> str:
+    """The previous behaviour: the whole file as one string."""
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def count_lines(uri: str) -> int:
+    with open_user_file(uri) as (stream, _):
+        return sum(1 for _ in iter_lines(stream))
+
+
+def main():
+    """Shows that read_user_file's memory use does not grow with the size of the file."""
+    parser = argparse.ArgumentParser(description="Measure bounded reads of large user files from a local directory.")
+    parser.add_argument("--sizes-mb", type=int, nargs="*", default=[1, 50, 500], help="Log sizes to generate.")
+    parser.add_argument("--max-bytes", type=int, default=64 * 1024, help="USER_FILE_MAX_BYTES.")
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix="agora_user_files_")
+    os.environ["USER_FILE_ROOT"] = root
+    os.environ["USER_FILE_MAX_BYTES"] = str(args.max_bytes)
+
+    rows = []
+    for size_mb in args.sizes_mb:
+        path = os.path.join(root, f"crash_{size_mb}mb.log")
+        write_log(path, size_mb * 2**20)
+        file_mb = os.path.getsize(path) / 2**20
+        uri = f"file://{path}"
+        for label, func in (
+            ("whole file (previous)", lambda: read_whole(path)),
+            ("tail", lambda: asyncio.run(read_user_file(uri, mode="tail"))),
+            ("head", lambda: asyncio.run(read_user_file(uri, mode="head"))),
+            ("window", lambda: asyncio.run(read_user_file(uri, mode="window", offset=size_mb * 2**19))),
+            ("iter_lines (all)", lambda: count_lines(uri)),
+        ):
+            ms, peak_mib, result = measure(func)
+            rows.append(
+                {
+                    "file_mb": file_mb,
+                    "read": label,
+                    "ms": ms,
+                    "peak_mib": peak_mib,
+                    "returned_kb": len(result) / 1024 if isinstance(result, str) else None,
+                    "has_traceback": "PermissionDenied" in result if isinstance(result, str) else None,
+                }
+            )
+        os.remove(path)
+
+    print(tabulate(rows, headers="keys", floatfmt=".1f"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+# FILE: scripts/benchmark_workflow_replay.py
+
+import argparse
+import asyncio
+import json
+from collections import Counter
+from typing import AsyncGenerator, Optional
+
+from google.adk.agents import Agent, LlmAgent, ParallelAgent, SequentialAgent
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.adk.runners import InMemoryRunner
+from google.adk.tools.agent_tool import AgentTool
+from google.genai import types
+from tabulate import tabulate
+
+from project_agora.prompts import ORCHESTRATOR_PROMPT
+from project_agora.sub_agents.context_retrieval.agent import RetrievalJoinAgent
+from project_agora.sub_agents.direct_tool_agent import DirectToolAgent
+from project_agora.tools.tools import (
+    create_ticket,
+    format_code_reviewer_output,
+    update_ticket_after_analysis,
+    update_ticket_after_retrieval,
+    update_ticket_status,
+)
+from project_agora.workflow_agent import TicketWorkflowAgent
+
+# Each transcript is the list of user messages of one ticket, replayed turn by turn.
+DEFAULT_TRANSCRIPTS = {
+    "technical_question": [
+        "My agent deployment to Cloud Run fails with a 403 error when it calls Vertex AI.",
+        "yes",
+    ],
+    "technical_question_ambiguous_reply": [
+        "How do I share state between two sub-agents in a SequentialAgent?",
+        "hmm ok, show me what you've got",
+    ],
+    "code_generation": [
+        "Build me an agent that fetches the weather from an API and summarizes it.",
+        "yes",
+        "looks good",
+    ],
+    "greeting_then_question": [
+        "hello",
+        "How do I write a custom tool that reads from BigQuery?",
+        "go ahead",
+    ],
+}
+
+# Model calls and prompt characters sent, per agent, for the replay in progress.
+MODEL_CALLS: Counter = Counter()
+PROMPT_CHARS: Counter = Counter()
+
+PLAN = {
+    "plan_description": "A single coordinator agent with a weather API tool.",
+    "components": [{"name": "WeatherAgent", "type": "Agent", "justification": "Answers the user."}],
+    "mermaid_syntax": "graph TD;\\n    User --> WeatherAgent;",
+    "dependencies": [],
+}
+
+
+def _text(content: Optional[types.Content]) -> str:
+    if not content or not content.parts:
+        return ""
+    return " ".join(p.text for p in content.parts if p.text)
+
+
+def _last_function_response(contents: list[types.Content]):
+    parts = contents[-1].parts if contents and contents[-1].parts else []
+    return next((p.function_response for p in parts if p.function_response), None)
+
+
+class ScriptedLlm(BaseLlm):
+    """
+    Stands in for every model in the replay. Specialist agents get canned answers; the
+    orchestrator follows ORCHESTRATOR_PROMPT step by step with no retries, which is
+    the fewest calls a real orchestrator model could make.
+    """
+
+    agent_name: str
+
+    @classmethod
+    def supported_models(cls) -> list[str]:
+        return [r"scripted-.*"]
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        MODEL_CALLS[self.agent_name] += 1
+        system = str(llm_request.config.system_instruction or "") if llm_request.config else ""
+        PROMPT_CHARS[self.agent_name] += len(system) + sum(len(_text(c)) for c in llm_request.contents)
+
+        if self.agent_name == "orchestrator_agent":
+            part = self._orchestrate(llm_request.contents)
+        else:
+            part = types.Part(text=self._answer(_text(llm_request.contents[-1])))
+        yield LlmResponse(content=types.Content(role="model", parts=[part]))
+
+    def _answer(self, request: str) -> str:
+        if self.agent_name == "ticket_analysis_agent":
+            category = "Code Generation" if request.lower().startswith("build") else "Deployment"
+            return json.dumps(
+                {"urgency": "Medium", "category": category, "sentiment": "Curious", "summary": request[:80]}
+            )
+        if self.agent_name == "intent_classifier_agent":
+            return "yes"
+        if self.agent_name == "problem_solver_agent":
+            return "### Summary of Issue\nThe service account is missing a role.\n### Step-by-Step Solution\n1. Grant it."
+        if self.agent_name == "code_generator_agent":
+            if "user_confirmation" in request:
+                return "==== FILE: weather_agent/agent.py ====\nroot_agent = ..."
+            return json.dumps(PLAN)
+        if self.agent_name == "code_reviewer_agent":
+            return json.dumps({"status": "approved", "code": "==== FILE: weather_agent/agent.py ====\nroot_agent = ..."})
+        return ""
+
+    def _orchestrate(self, contents: list[types.Content]) -> types.Part:
+        def call(name: str, **args) -> types.Part:
+            return types.Part(function_call=types.FunctionCall(name=name, args=args))
+
+        history = " ".join(
+            json.dumps(p.function_response.response) if p.function_response else (p.text or "")
+            for c in contents for p in (c.parts or [])
+        )
+        response = _last_function_response(contents)
+        if response is not None:
+            result = str(response.response.get("result", ""))
+            if response.name == "create_ticket":
+                return call("ticket_analysis_agent", request=json.loads(result)["request"])
+            if response.name == "ticket_analysis_agent":
+                return call("update_ticket_after_analysis", analysis_json=result)
+            if response.name == "update_ticket_after_analysis":
+                return call("context_retrieval_agent", request="ticket summary")
+            if response.name == "context_retrieval_agent":
+                return call("update_ticket_after_retrieval")
+            if response.name == "update_ticket_after_retrieval":
+                return types.Part(text="My search is complete. Shall I proceed?")
+            if response.name == "problem_solver_agent":
+                return call("update_ticket_status", status="Pending Solution")
+            if response.name == "code_generator_agent" and "plan_description" in result:
+                return call("generate_diagram_from_mermaid", mermaid_code=PLAN["mermaid_syntax"], file_name="plan")
+            if response.name == "generate_diagram_from_mermaid":
+                return call("update_ticket_status", status="AwaitingPlanApproval")
+            if response.name == "code_generator_agent":
+                return call("code_reviewer_agent", request=result)
+            if response.name == "code_reviewer_agent":
+                return call("format_code_reviewer_output", reviewer_json_output=result)
+            return types.Part(text="Here is the result. Shall I proceed with generating the full code?"
+                              if "AwaitingPlanApproval" in result else "Here is your solution.")
+
+        # The latest content is a user message.
+        previous = [c for c in contents[:-1] if c.role == "model" and _text(c)]
+        last_question = _text(previous[-1]) if previous else ""
+        if "generating the full code" in last_question:
+            return call("code_generator_agent", request="user_confirmation: approved")
+        if "Shall I proceed?" in last_question:
+            specialist = "code_generator_agent" if "Code Generation" in history else "problem_solver_agent"
+            return call(specialist, request="context block")
+        if _text(contents[-1]).lower().strip() in ("hello", "hi"):
+            return types.Part(text="Hello! How can I help with the ADK?")
+        return call("create_ticket", request=_text(contents[-1]))
+
+
+def search_knowledge_base_stub(query: str) -> str:
+    return "Grant roles/aiplatform.user to the Cloud Run service account."
+
+
+def search_resolved_tickets_db_stub(query: str) -> str:
+    return "[{'ticket_id': 'TICK-0001', 'resolution': 'Missing IAM role.'}]"
+
+
+async def generate_diagram_from_mermaid(mermaid_code: str, file_name: str) -> str:
+    """Stand-in for the Playwright renderer."""
+    return f"https://storage.example.com/diagrams/{file_name}.png"
+
+
+def build_agents() -> dict:
+    def model(name: str) -> ScriptedLlm:
+        return ScriptedLlm(model="scripted-model", agent_name=name)
+
+    specialists = {
+        name: LlmAgent(name=name, model=model(name), instruction=f"You are the {name}.")
+        for name in (
+            "ticket_analysis_agent",
+            "problem_solver_agent",
+            "code_generator_agent",
+            "code_reviewer_agent",
+            "intent_classifier_agent",
+        )
+    }
+    specialists["context_retrieval_agent"] = SequentialAgent(
+        name="context_retrieval_agent",
+        sub_agents=[
+            ParallelAgent(
+                name="parallel_retrieval_agent",
+                sub_agents=[
+                    DirectToolAgent(
+                        name="knowledge_retrieval_agent", tools=[search_knowledge_base_stub],
+                        output_key="kb_retrieval_results",
+                    ),
+                    DirectToolAgent(
+                        name="db_retrieval_agent", tools=[search_resolved_tickets_db_stub],
+                        output_key="db_retrieval_results",
+                    ),
+                ],
+            ),
+            RetrievalJoinAgent(name="retrieval_join_agent"),
+        ],
+    )
+
+    llm_orchestrator = Agent(
+        name="orchestrator_agent",
+        model=model("orchestrator_agent"),
+        instruction=ORCHESTRATOR_PROMPT,
+        tools=[
+            create_ticket,
+            update_ticket_after_analysis,
+            update_ticket_after_retrieval,
+            update_ticket_status,
+            generate_diagram_from_mermaid,
+            format_code_reviewer_output,
+            *(AgentTool(agent) for name, agent in specialists.items() if name != "intent_classifier_agent"),
+        ],
+    )
+    workflow = TicketWorkflowAgent(
+        name="workflow_agent",
+        diagram_tool=generate_diagram_from_mermaid,
+        **specialists,
+    )
+    return {"llm": llm_orchestrator, "workflow": workflow}
+
+
+async def replay(agent, transcript: list[str]) -> str:
+    """Replays one transcript in a fresh session and returns the final ticket status."""
+    runner = InMemoryRunner(agent=agent, app_name="replay")
+    session = await runner.session_service.create_session(app_name="replay", user_id="dev")
+    for message in transcript:
+        content = types.Content(role="user", parts=[types.Part(text=message)])
+        async for _ in runner.run_async(user_id="dev", session_id=session.id, new_message=content):
+            pass
+    session = await runner.session_service.get_session(app_name="replay", user_id="dev", session_id=session.id)
+    ticket = json.loads(session.state.get("ticket") or "{}")
+    return ticket.get("status", "-")
+
+
+async def run(transcripts: dict[str, list[str]]) -> list[dict]:
+    rows = []
+    for scenario, transcript in transcripts.items():
+        for mode in ("llm", "workflow"):
+            MODEL_CALLS.clear()
+            PROMPT_CHARS.clear()
+            status = await replay(build_agents()[mode], transcript)
+            rows.append(
+                {
+                    "scenario": scenario,
+                    "orchestrator": mode,
+                    "turns": len(transcript),
+                    "model_calls": sum(MODEL_CALLS.values()),
+                    "orchestrator_calls": MODEL_CALLS["orchestrator_agent"],
+                    "judgment_calls": MODEL_CALLS["intent_classifier_agent"],
+                    "prompt_chars": sum(PROMPT_CHARS.values()),
+                    "final_status": status,
+                }
+            )
+    return rows
+
+
+def main():
+    """Replays ticket transcripts through the LLM orchestrator and the workflow engine and counts model calls."""
+    parser = argparse.ArgumentParser(
+        description="Compare model calls per ticket between the LLM orchestrator and TicketWorkflowAgent."
+    )
+    parser.add_argument(
+        "--transcripts",
+        help="JSON file mapping scenario names to lists of user messages (defaults to built-in scenarios).",
+    )
+    args = parser.parse_args()
+
+    transcripts = DEFAULT_TRANSCRIPTS
+    if args.transcripts:
+        with open(args.transcripts, "r", encoding="utf-8") as f:
+            transcripts = json.load(f)
+
+    rows = asyncio.run(run(transcripts))
+    print(tabulate(rows, headers="keys"))
+
+    totals = {mode: sum(r["model_calls"] for r in rows if r["orchestrator"] == mode) for mode in ("llm", "workflow")}
+    print(
+        f"\nINFO: {totals['llm']} model calls with the LLM orchestrator, {totals['workflow']} with the "
+        f"workflow engine across {len(transcripts)} tickets."
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+# FILE: scripts/build_local_kb_index.py
+
+import argparse
+import time
+
+from project_agora.tools._chunking import DEFAULT_CHUNK_STORE_PATH
+from project_agora.tools._lexical_search import (
+    DEFAULT_INDEX_PATH,
+    DEFAULT_KNOWLEDGE_BASE_DIR,
+    BM25Index,
+    build_knowledge_base_index,
+)
+
+
+def main():
+    """Builds the local BM25 index over data/knowledge_base/ and reports its load time."""
+    parser = argparse.ArgumentParser(description="Build the offline BM25 index over the knowledge base.")
+    parser.add_argument("--kb-dir", default=str(DEFAULT_KNOWLEDGE_BASE_DIR), help="Knowledge base directory.")
+    parser.add_argument("--out", default=str(DEFAULT_INDEX_PATH), help="Index file to write.")
+    parser.add_argument(
+        "--chunk-store",
+        default=str(DEFAULT_CHUNK_STORE_PATH),
+        help="Chunk store directory (only changed files are re-chunked).",
+    )
+    parser.add_argument(
+        "--embed",
+        action="store_true",
+        help="Also store passage embeddings (requires Vertex AI) to enable hybrid search.",
+    )
+    parser.add_argument("--query", action="append", default=[], help="Sample query to run after building.")
+    args = parser.parse_args()
+
+    build_knowledge_base_index(args.kb_dir, args.out, embed=args.embed, chunk_store_path=args.chunk_store)
+
+    start = time.perf_counter()
+    index = BM25Index.load(args.out)
+    print(f"INFO: Index loads in {(time.perf_counter() - start) * 1000:.1f} ms "
+          f"({len(index)} passages, {len(index.vocabulary)} terms).")
+
+    for query in args.query:
+        print(f"\nQuery: {query}")
+        for result in index.search(query, top_k=3):
+            print(f"  {result['score']:.3f}  {result['source']} > {result['heading']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+# FILE: scripts/convert_resolved_tickets.py
+
+import argparse
+import json
+
+from project_agora.tools._ticket_dataset import (
+    SUPPORTED_DTYPES,
+    convert_csv_to_dataset,
+    verify_round_trip,
+)
+
+
+def main():
+    """Converts data/resolved_tickets.csv into the binary dataset format and checks the result."""
+    parser = argparse.ArgumentParser(
+        description="Convert the resolved-tickets CSV into the compact binary dataset format."
+    )
+    parser.add_argument("--csv", default="data/resolved_tickets.csv", help="Source CSV file.")
+    parser.add_argument("--out", default="data/resolved_tickets", help="Output dataset directory.")
+    parser.add_argument(
+        "--dtype", default="float32", choices=SUPPORTED_DTYPES, help="Storage type for the embeddings."
+    )
+    args = parser.parse_args()
+
+    convert_csv_to_dataset(args.csv, args.out, dtype=args.dtype)
+
+    report = verify_round_trip(args.csv, args.out)
+    print("INFO: Round-trip accuracy check:")
+    print(json.dumps(report, indent=2))
+
+    agreement = next(value for key, value in report.items() if key.endswith("_agreement"))
+    if agreement < 1.0:
+        print("WARN: Some nearest-neighbour results differ from the CSV. Consider a wider dtype.")
+    else:
+        print("✅ Binary dataset matches the CSV nearest-neighbour results.")
+
+
+if __name__ == "__main__":
+    main()
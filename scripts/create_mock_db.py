@@ -1,24 +1,177 @@
 # FILE: scripts/create_mock_db.py
 
 import csv
+import json
 import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional
 
-from vertexai.language_models import TextEmbeddingModel
+from project_agora.tools._embedding_cache import (
+    embed_texts,
+    get_embedding_cache,
+    get_embedding_model,
+)
+from project_agora.tools._ticket_dataset import METADATA_FIELDS, write_ticket_dataset
+
+# Batch pipeline defaults. text-embedding-004 accepts up to 250 texts per request,
+# but smaller batches keep each request well under the per-request token limit.
+BATCH_SIZE = 16
+MAX_CONCURRENT_BATCHES = 4
+REQUESTS_PER_MINUTE = 60
+MAX_RETRIES = 3
+
+CSV_HEADER = [
+    "ticket_id",
+    "customer_id",
+    "request",
+    "category",
+    "suggested_solution",
+    "request_embedding",
+]
 
 
 def get_embedding(text: str, model_name: str = "text-embedding-004") -> list[float]:
-    """Generates an embedding for a given text."""
-    model = TextEmbeddingModel.from_pretrained(model_name)
+    """Generates an embedding for a given text, reusing the shared embedding cache."""
     try:
-        embeddings = model.get_embeddings([text])
-        return embeddings[0].values
+        return embed_texts([text], model_name)[0]
     except Exception as e:
         print(f"  ERROR: Could not get embedding for '{text[:30]}...': {e}")
         # Return a zero vector on failure so the process doesn't stop
         return [0.0] * 768  # The dimension of text-embedding-004 is 768
 
 
+class RateLimiter:
+    """Spaces out calls across threads so that at most `requests_per_minute` start per minute."""
+
+    def __init__(self, requests_per_minute: float):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Blocks until the caller is allowed to issue its request."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def load_checkpoint(checkpoint_path: str) -> dict[str, list[float]]:
+    """Reads the embeddings of already completed tickets from a checkpoint file."""
+    completed = {}
+    if not os.path.exists(checkpoint_path):
+        return completed
+
+    with open(checkpoint_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                completed[record["ticket_id"]] = record["embedding"]
+            except (json.JSONDecodeError, KeyError):
+                # A torn final line from an interrupted write; that ticket is simply redone.
+                continue
+    return completed
+
+
+def embed_tickets(
+    ticket_rows: list[list[str]],
+    model=None,
+    model_name: str = "text-embedding-004",
+    checkpoint_path: Optional[str] = None,
+    batch_size: int = BATCH_SIZE,
+    max_concurrent_batches: int = MAX_CONCURRENT_BATCHES,
+    requests_per_minute: float = REQUESTS_PER_MINUTE,
+    max_retries: int = MAX_RETRIES,
+    use_cache: bool = True,
+) -> dict[str, list[float]]:
+    """
+    Embeds the 'request' text of each ticket in batches and returns {ticket_id: embedding}.
+
+    Batches of `batch_size` texts are sent in a single `get_embeddings` call, with
+    at most `max_concurrent_batches` requests in flight and requests spaced to
+    respect `requests_per_minute`. Each completed batch is appended to
+    `checkpoint_path`, and tickets already present there are skipped.
+
+    Args:
+        ticket_rows: Rows of [ticket_id, customer_id, request, category, solution].
+        model: Any object with a `get_embeddings(texts)` method returning objects
+            with a `.values` list. Defaults to the shared `TextEmbeddingModel` handle.
+        use_cache: Whether to consult the shared embedding cache before calling the model.
+
+    Raises:
+        ValueError: If `max_retries` is less than 1.
+        RuntimeError: If any batch still fails after `max_retries` attempts. All
+            other batches are checkpointed, so re-running resumes with the failures.
+    """
+    if max_retries < 1:
+        raise ValueError(f"max_retries must be at least 1, got {max_retries}.")
+    if model is None:
+        model = get_embedding_model(model_name)
+    cache = get_embedding_cache() if use_cache else None
+
+    completed = load_checkpoint(checkpoint_path) if checkpoint_path else {}
+    pending = [row for row in ticket_rows if row[0] not in completed]
+    if completed:
+        print(f"INFO: Resuming from checkpoint; {len(completed)} tickets already embedded.")
+
+    batches = [pending[i : i + batch_size] for i in range(0, len(pending), batch_size)]
+    rate_limiter = RateLimiter(requests_per_minute)
+
+    def _call_model(texts: list[str]) -> list[list[float]]:
+        rate_limiter.wait()
+        return [embedding.values for embedding in model.get_embeddings(texts)]
+
+    def _embed_batch(batch: list[list[str]]) -> list[list[float]]:
+        texts = [row[2] for row in batch]
+        for attempt in range(1, max_retries + 1):
+            try:
+                if cache is None:
+                    return _call_model(texts)
+                return cache.get_or_compute(model_name, texts, _call_model)
+            except Exception as e:
+                if attempt == max_retries:
+                    raise
+                print(f"  WARN: Embedding batch failed (attempt {attempt}/{max_retries}): {e}")
+                time.sleep(2 ** attempt)
+
+    failed_ids = []
+    checkpoint_file = open(checkpoint_path, "a", encoding="utf-8") if checkpoint_path else None
+    try:
+        with ThreadPoolExecutor(max_workers=max_concurrent_batches) as executor:
+            futures = {executor.submit(_embed_batch, batch): batch for batch in batches}
+            for future in as_completed(futures):
+                batch = futures[future]
+                try:
+                    vectors = future.result()
+                except Exception as e:
+                    print(f"  ERROR: Could not embed tickets {batch[0][0]}..{batch[-1][0]}: {e}")
+                    failed_ids.extend(row[0] for row in batch)
+                    continue
+
+                for row, vector in zip(batch, vectors):
+                    completed[row[0]] = list(vector)
+                    if checkpoint_file:
+                        checkpoint_file.write(json.dumps({"ticket_id": row[0], "embedding": list(vector)}) + "\n")
+                if checkpoint_file:
+                    checkpoint_file.flush()
+                    os.fsync(checkpoint_file.fileno())
+                print(f"  Embedded {len(completed)}/{len(ticket_rows)} tickets...")
+    finally:
+        if checkpoint_file:
+            checkpoint_file.close()
+
+    if failed_ids:
+        raise RuntimeError(
+            f"Failed to embed {len(failed_ids)} tickets (e.g. {failed_ids[0]}). "
+            "Completed tickets are checkpointed; re-run the script to resume."
+        )
+    return completed
+
+
 def generate_mock_data_with_embeddings():
     """
     Generates a CSV of mock tickets and enriches it with vector embeddings.
@@ -26,6 +179,7 @@ def generate_mock_data_with_embeddings():
     This function processes a predefined list of ADK support tickets, generates
     a vector embedding for each ticket's 'request' text using a Vertex AI
     model, and saves the combined data to 'data/resolved_tickets.csv'.
+    Embeddings are generated by the batched, resumable `embed_tickets` pipeline.
     """
     print("INFO: Initializing embedding model and generating mock data...")
 
@@ -432,42 +586,35 @@ def generate_mock_data_with_embeddings():
         ],
     ]
 
-    # Prepare the header row for the CSV file
-    header = [
-        "ticket_id",
-        "customer_id",
-        "request",
-        "category",
-        "suggested_solution",
-        "request_embedding",
-    ]
-
-    # This list will hold all rows for the final CSV
-    output_data = [header]
-
-    # Process each ticket
-    for i, row in enumerate(ticket_data):
-        request_text = row[2]
-        print(
-            f"  Generating embedding for ticket {row[0]} ({i+1}/{len(ticket_data)})..."
-        )
-        embedding = get_embedding(request_text)
-
-        # Append the embedding to the row
-        new_row = row + [embedding]
-        output_data.append(new_row)
-
-        # Adding a small delay to avoid hitting API rate limits
-        time.sleep(1)
-
     output_dir = "data"
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
     filepath = os.path.join(output_dir, "resolved_tickets.csv")
-    with open(filepath, "w", newline="") as f:
+    checkpoint_path = f"{filepath}.partial"
+
+    # Completed rows are checkpointed after every batch, so an interrupted run
+    # resumes from where it stopped instead of re-embedding everything.
+    embeddings = embed_tickets(ticket_data, checkpoint_path=checkpoint_path)
+
+    output_data = [CSV_HEADER] + [row + [embeddings[row[0]]] for row in ticket_data]
+
+    # Write to a temporary file first so a crash never leaves a truncated CSV behind.
+    tmp_filepath = f"{filepath}.tmp"
+    with open(tmp_filepath, "w", newline="") as f:
         writer = csv.writer(f)
         writer.writerows(output_data)
+    os.replace(tmp_filepath, filepath)
+
+    # Also write the compact binary companion (memory-mapped .npy + metadata) that the
+    # local search backend and setup_bigquery.py read without re-parsing JSON text.
+    write_ticket_dataset(
+        os.path.join(output_dir, "resolved_tickets"),
+        [dict(zip(METADATA_FIELDS, row)) for row in ticket_data],
+        [embeddings[row[0]] for row in ticket_data],
+        dtype="float32",
+    )
+    os.remove(checkpoint_path)
 
     print(
         f"✅ Mock database with embeddings created at '{filepath}' with {len(output_data)-1} tickets."
@@ -1,10 +1,16 @@
 # FILE: scripts/scrape_adk_docs.py
 
+import argparse
+import asyncio
+import json
 import os
 import re
-from urllib.parse import urljoin, urlparse
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urldefrag, urljoin, urlparse
 
-import requests
+import httpx
 from bs4 import BeautifulSoup
 from markdownify import markdownify as md
 
@@ -12,8 +18,14 @@ from markdownify import markdownify as md
 BASE_URL = "https://google.github.io/adk-docs/"
 OUTPUT_DIR = "data/knowledge_base/"
 
-# Keep track of visited URLs to avoid infinite loops and redundant scrapes
-visited_urls = set()
+# --- CRAWLER CONFIGURATION ---
+# Validators (ETag / Last-Modified) and outgoing links of every page from the previous run,
+# so a re-crawl only downloads pages that changed.
+CRAWL_STATE_PATH = ".cache/adk_docs_crawl_state.json"
+MAX_CONCURRENT_REQUESTS = 8
+REQUEST_TIMEOUT_SECONDS = 10
+PARSE_WORKERS = max(1, min(4, os.cpu_count() or 1))
+# --------------------------------
 
 
 def clean_url(url):
@@ -22,34 +34,27 @@ def clean_url(url):
     return f"{parsed.scheme}://{parsed.netloc}{parsed.path}".strip("/")
 
 
-def scrape_page(url):
-    """
-    Scrapes a single page, converts its main content to Markdown, and finds new links.
-
-    It normalizes and tracks visited URLs to prevent redundant scraping and
-    infinite loops.
-    """
-    # Normalize the URL to avoid scraping the same page with different fragments
-    normalized_url = clean_url(url)
-    if normalized_url in visited_urls:
-        return []
+def url_to_filename(url: str) -> str:
+    """Generates a clean filename from the URL path."""
+    path = urlparse(url).path
+    filename = path.strip("/").replace("/", "_").replace(".html", "") or "index"
+    return f"{filename}.md"
 
-    print(f"Scraping: {url}")
-    visited_urls.add(normalized_url)
 
-    try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-    except requests.RequestException as e:
-        print(f"  ERROR: Could not fetch {url}: {e}")
-        return []
+def parse_page(url: str, html: bytes, base_url: str = BASE_URL) -> tuple[Optional[str], list[str]]:
+    """
+    Converts a page's main content to Markdown and finds the links to other docs pages.
 
-    soup = BeautifulSoup(response.content, "html.parser")
+    This is CPU-bound, so the crawler runs it in a worker pool rather than on the
+    event loop. Returns (markdown or None if the page has no content area, links).
+    """
+    soup = BeautifulSoup(html, "html.parser")
 
     # This selector is specific to the ADK docs site structure.
     # It targets the main content area of the page.
     content_area = soup.select_one(".md-content .md-content__inner")
 
+    final_content = None
     if content_area:
         # Get the page title for context
         title_tag = soup.find("title")
@@ -71,56 +76,195 @@ def scrape_page(url):
             f"# {page_title}\n\n**Source URL:** {url}\n\n---\n\n{markdown_content}"
         )
 
-        # Generate a clean filename from the URL path
-        path = urlparse(url).path
-        filename = path.strip("/").replace("/", "_").replace(".html", "") or "index"
-        filename = os.path.join(OUTPUT_DIR, f"{filename}.md")
-
-        # Save the content
-        with open(filename, "w", encoding="utf-8") as f:
-            f.write(final_content)
-        print(f"  -> Saved to {filename}")
-
     # Find all links on the page that point to other docs pages
-    new_links = []
+    links = []
     # Target links within the main navigation and content area
     for link in soup.select(".md-nav__link, .md-content a"):
         if "href" not in link.attrs:
             continue
 
-        href = link["href"]
         # Construct absolute URL for relative links
-        absolute_url = urljoin(BASE_URL, href)
+        absolute_url = urldefrag(urljoin(base_url, link["href"])).url
 
         # Follow links only if they are within the same documentation site
-        if absolute_url.startswith(BASE_URL):
-            normalized_new_link = clean_url(absolute_url)
-            if normalized_new_link not in visited_urls:
-                new_links.append(absolute_url)
+        if absolute_url.startswith(base_url):
+            links.append(absolute_url)
 
-    return new_links
+    return final_content, sorted(set(links))
 
 
-def run_scraper():
-    """Main function to run the web scraper."""
-    if not os.path.exists(OUTPUT_DIR):
-        os.makedirs(OUTPUT_DIR)
+class DocsCrawler:
+    """
+    Crawls a documentation site breadth-first with a bounded number of concurrent requests.
+
+    All requests share one pooled `httpx.AsyncClient`. Pages are fetched with
+    conditional GETs using the validators saved by the previous run. A `304 Not
+    Modified` response reuses the saved links instead of re-parsing, and leaves the
+    existing Markdown file untouched.
+    """
+
+    def __init__(
+        self,
+        base_url: str = BASE_URL,
+        output_dir: str = OUTPUT_DIR,
+        state_path: Optional[str] = CRAWL_STATE_PATH,
+        max_concurrency: int = MAX_CONCURRENT_REQUESTS,
+        timeout: float = REQUEST_TIMEOUT_SECONDS,
+        parse_executor: Optional[Executor] = None,
+    ):
+        self.base_url = base_url
+        self.output_dir = Path(output_dir)
+        self.state_path = Path(state_path) if state_path else None
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.parse_executor = parse_executor
+
+        self.state = self._load_state()
+        self.visited: set[str] = set()
+        self.stats = {"fetched": 0, "not_modified": 0, "saved": 0, "errors": 0}
+
+    async def run(self) -> dict:
+        """Crawls every reachable page and returns counters for the run."""
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        limits = httpx.Limits(
+            max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency
+        )
+        owns_executor = self.parse_executor is None
+        executor = self.parse_executor or ProcessPoolExecutor(max_workers=PARSE_WORKERS)
+
+        queue: asyncio.Queue = asyncio.Queue()
+        self._enqueue(queue, self.base_url)
+        try:
+            async with httpx.AsyncClient(
+                limits=limits, timeout=self.timeout, follow_redirects=True
+            ) as client:
+                workers = [
+                    asyncio.create_task(self._worker(client, queue, executor))
+                    for _ in range(self.max_concurrency)
+                ]
+                await queue.join()
+                for worker in workers:
+                    worker.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+        finally:
+            if owns_executor:
+                executor.shutdown()
+            self._save_state()
+
+        self.stats["pages"] = len(self.visited)
+        return self.stats
+
+    def _enqueue(self, queue: asyncio.Queue, url: str) -> None:
+        # Normalize the URL to avoid scraping the same page with different fragments
+        normalized_url = clean_url(url)
+        if normalized_url not in self.visited:
+            self.visited.add(normalized_url)
+            queue.put_nowait(url)
+
+    async def _worker(self, client: httpx.AsyncClient, queue: asyncio.Queue, executor: Executor) -> None:
+        while True:
+            url = await queue.get()
+            try:
+                for link in await self._process(client, url, executor):
+                    self._enqueue(queue, link)
+            except Exception as e:
+                self.stats["errors"] += 1
+                print(f"  ERROR: Could not process {url}: {e}")
+            finally:
+                queue.task_done()
+
+    async def _process(self, client: httpx.AsyncClient, url: str, executor: Executor) -> list[str]:
+        key = clean_url(url)
+        previous = self.state.get(key, {})
+        headers = {}
+        # Only revalidate when the page's output from the last run is still on disk.
+        if previous and (not previous.get("filename") or (self.output_dir / previous["filename"]).exists()):
+            if previous.get("etag"):
+                headers["If-None-Match"] = previous["etag"]
+            if previous.get("last_modified"):
+                headers["If-Modified-Since"] = previous["last_modified"]
+
+        print(f"Scraping: {url}")
+        try:
+            response = await client.get(url, headers=headers)
+            if response.status_code == 304:
+                self.stats["not_modified"] += 1
+                return previous.get("links", [])
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            self.stats["errors"] += 1
+            print(f"  ERROR: Could not fetch {url}: {e}")
+            return []
+        self.stats["fetched"] += 1
 
-    # Start with the base URL and expand from there
-    urls_to_scrape = [BASE_URL]
+        loop = asyncio.get_running_loop()
+        content, links = await loop.run_in_executor(executor, parse_page, url, response.content, self.base_url)
 
-    while urls_to_scrape:
-        current_url = urls_to_scrape.pop(0)
-        # Use a list and set to get unique new links
-        new_links = list(set(scrape_page(current_url)))
+        filename = None
+        if content is not None:
+            filename = url_to_filename(url)
+            # Save the content
+            await asyncio.to_thread(_write_text, self.output_dir / filename, content)
+            self.stats["saved"] += 1
+            print(f"  -> Saved to {self.output_dir / filename}")
 
-        for link in new_links:
-            if clean_url(link) not in visited_urls:
-                urls_to_scrape.append(link)
+        self.state[key] = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "filename": filename,
+            "links": links,
+        }
+        return links
+
+    def _load_state(self) -> dict:
+        if not self.state_path or not self.state_path.exists():
+            return {}
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"WARN: Ignoring unreadable crawl state at '{self.state_path}': {e}")
+            return {}
+
+    def _save_state(self) -> None:
+        if not self.state_path:
+            return
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_name(self.state_path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.state_path)
+
+
+def _write_text(path: Path, content: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+def run_scraper(
+    base_url: str = BASE_URL,
+    output_dir: str = OUTPUT_DIR,
+    state_path: Optional[str] = CRAWL_STATE_PATH,
+    max_concurrency: int = MAX_CONCURRENT_REQUESTS,
+) -> dict:
+    """Main function to run the web scraper."""
+    crawler = DocsCrawler(base_url, output_dir, state_path, max_concurrency)
+    stats = asyncio.run(crawler.run())
 
     print("\n✅ Scraping complete.")
-    print(f"Total unique pages scraped: {len(visited_urls)}")
+    print(f"Total unique pages scraped: {stats['pages']}")
+    print(
+        f"Downloaded: {stats['fetched']}, unchanged (304): {stats['not_modified']}, "
+        f"saved: {stats['saved']}, errors: {stats['errors']}"
+    )
+    return stats
 
 
 if __name__ == "__main__":
-    run_scraper()
+    parser = argparse.ArgumentParser(description="Crawl the ADK documentation into data/knowledge_base/.")
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--out", default=OUTPUT_DIR)
+    parser.add_argument("--state", default=CRAWL_STATE_PATH, help="Crawl state file ('' to disable).")
+    parser.add_argument("--concurrency", type=int, default=MAX_CONCURRENT_REQUESTS)
+    args = parser.parse_args()
+    run_scraper(args.base_url, args.out, args.state or None, args.concurrency)
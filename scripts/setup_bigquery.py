@@ -1,11 +1,34 @@
 # FILE: scripts/setup_bigquery.py
 
+import csv
 import json
 import os
+import tempfile
+from typing import IO, Iterable, Iterator
 
 from google.api_core.exceptions import NotFound
 from google.cloud import bigquery
 
+from project_agora.tools._bigquery_pool import get_bigquery_client, invalidate_query_result_cache
+from project_agora.tools._ticket_dataset import load_ticket_dataset
+
+# Upper bound on the size of each newline-delimited JSON chunk uploaded to BigQuery.
+# Rows are streamed into a spooled temporary file, so memory stays bounded by
+# SPOOL_MEMORY_BYTES no matter how large the source CSV is.
+CHUNK_BYTES = 64 * 1024 * 1024
+SPOOL_MEMORY_BYTES = 8 * 1024 * 1024
+
+TICKET_SCHEMA = [
+    bigquery.SchemaField("ticket_id", "STRING"),
+    bigquery.SchemaField("customer_id", "STRING"),
+    bigquery.SchemaField("request", "STRING"),
+    bigquery.SchemaField("category", "STRING"),
+    bigquery.SchemaField("suggested_solution", "STRING"),
+    bigquery.SchemaField(
+        "request_embedding", "FLOAT64", mode="REPEATED"
+    ),  # Important: this defines the vector
+]
+
 
 def create_dataset_if_not_exists(client: bigquery.Client, dataset_id: str):
     """Creates a BigQuery dataset if it does not already exist."""
@@ -20,73 +43,117 @@ def create_dataset_if_not_exists(client: bigquery.Client, dataset_id: str):
         print(f"INFO: Created dataset '{dataset.project}.{dataset.dataset_id}'.")
 
 
-def load_csv_to_bigquery(
-    client: bigquery.Client, dataset_name: str, table_name: str, csv_filepath: str
-):
-    """Loads a CSV file with an embedding column into a BigQuery table, overwriting if it exists."""
+def iter_ticket_rows(csv_filepath: str) -> Iterator[dict]:
+    """Lazily yields ticket rows from the CSV with the embedding parsed into a list of floats."""
+    with open(csv_filepath, "r", encoding="utf-8", newline="") as source_file:
+        for row_dict in csv.DictReader(source_file):
+            try:
+                # Convert the string representation of a list into an actual list of floats
+                row_dict["request_embedding"] = json.loads(row_dict["request_embedding"])
+            except (json.JSONDecodeError, TypeError, KeyError) as e:
+                print(
+                    f"WARN: Could not parse embedding for ticket {row_dict.get('ticket_id')}. Skipping. Error: {e}"
+                )
+                continue
+            yield row_dict
+
+
+def iter_ndjson_chunks(
+    rows: Iterable[dict], max_chunk_bytes: int = CHUNK_BYTES
+) -> Iterator[tuple[IO[bytes], int]]:
+    """
+    Serializes rows as newline-delimited JSON into chunks of at most ~`max_chunk_bytes`.
+
+    Yields (file, row_count) pairs. Each file is rewound and ready to upload, and
+    is closed as soon as the consumer asks for the next chunk.
+    """
+    chunk, row_count = None, 0
+    try:
+        for row in rows:
+            if chunk is None:
+                chunk = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES)
+            chunk.write(json.dumps(row).encode("utf-8") + b"\n")
+            row_count += 1
+
+            if chunk.tell() >= max_chunk_bytes:
+                chunk.seek(0)
+                yield chunk, row_count
+                chunk.close()
+                chunk, row_count = None, 0
+
+        if chunk is not None:
+            chunk.seek(0)
+            yield chunk, row_count
+    finally:
+        if chunk is not None:
+            chunk.close()
+
+
+def load_rows_to_bigquery(
+    client: bigquery.Client,
+    dataset_name: str,
+    table_name: str,
+    rows: Iterable[dict],
+    max_chunk_bytes: int = CHUNK_BYTES,
+) -> int:
+    """
+    Streams rows into a BigQuery table chunk by chunk, overwriting it if it exists.
+
+    The first chunk truncates the table and later chunks append to it. Each chunk
+    is uploaded as soon as it is full, so peak memory does not depend on the
+    number of rows. Returns the number of rows loaded.
+    """
     dataset_ref = client.dataset(dataset_name)
     table_ref = dataset_ref.table(table_name)
 
-    # Explicitly define the schema to handle the vector embedding
-    schema = [
-        bigquery.SchemaField("ticket_id", "STRING"),
-        bigquery.SchemaField("customer_id", "STRING"),
-        bigquery.SchemaField("request", "STRING"),
-        bigquery.SchemaField("category", "STRING"),
-        bigquery.SchemaField("suggested_solution", "STRING"),
-        bigquery.SchemaField(
-            "request_embedding", "FLOAT64", mode="REPEATED"
-        ),  # Important: this defines the vector
-    ]
-
-    json_job_config = bigquery.LoadJobConfig(
-        schema=schema,
-        write_disposition=bigquery.WriteDisposition.WRITE_TRUNCATE,  # Overwrite the table
-        source_format=bigquery.SourceFormat.NEWLINE_DELIMITED_JSON,  # Specify the source format
-    )
+    total_rows = 0
+    for chunk_number, (chunk, chunk_rows) in enumerate(iter_ndjson_chunks(rows, max_chunk_bytes), start=1):
+        job_config = bigquery.LoadJobConfig(
+            schema=TICKET_SCHEMA,
+            # Overwrite the table with the first chunk, then append the rest
+            write_disposition=(
+                bigquery.WriteDisposition.WRITE_TRUNCATE
+                if chunk_number == 1
+                else bigquery.WriteDisposition.WRITE_APPEND
+            ),
+            source_format=bigquery.SourceFormat.NEWLINE_DELIMITED_JSON,  # Specify the source format
+        )
+        job = client.load_table_from_file(chunk, table_ref, job_config=job_config)
+        job.result()  # Wait for the job to complete before building the next chunk
+        total_rows += job.output_rows
+        print(f"INFO: Loaded chunk {chunk_number} ({chunk_rows} rows) into '{dataset_name}.{table_name}'.")
 
-    print(f"INFO: Preparing to load data into '{dataset_name}.{table_name}'...")
+    return total_rows
 
-    # We will convert the CSV to a newline-delimited JSON file in memory
-    rows_to_load_as_json_strings = []
-    with open(csv_filepath, "r", encoding="utf-8") as source_file:
-        import csv
 
-        reader = csv.reader(source_file)
-        header = next(reader)  # skip header
+def load_csv_to_bigquery(
+    client: bigquery.Client, dataset_name: str, table_name: str, csv_filepath: str
+):
+    """
+    Loads the resolved tickets into a BigQuery table, overwriting it if it exists.
 
-        for row in reader:
-            row_dict = dict(zip(header, row))
-            try:
-                # Convert the string representation of a list into an actual list of floats
-                row_dict["request_embedding"] = json.loads(
-                    row_dict["request_embedding"]
-                )
-                # Convert the entire dictionary to a JSON string for this row
-                rows_to_load_as_json_strings.append(json.dumps(row_dict))
-            except (json.JSONDecodeError, TypeError) as e:
-                print(
-                    f"WARN: Could not parse embedding for ticket {row_dict.get('ticket_id')}. Skipping. Error: {e}"
-                )
+    `csv_filepath` may also point to a binary ticket dataset directory, whose
+    memory-mapped embeddings are read directly instead of parsing JSON text.
+    """
+    print(f"INFO: Preparing to load data into '{dataset_name}.{table_name}'...")
 
-    if not rows_to_load_as_json_strings:
+    if os.path.isdir(csv_filepath):
+        rows = load_ticket_dataset(csv_filepath).iter_rows()
+    else:
+        rows = iter_ticket_rows(csv_filepath)
+    loaded_rows = load_rows_to_bigquery(client, dataset_name, table_name, rows)
+
+    if not loaded_rows:
         print(
             "ERROR: No rows were prepared for loading. Check the CSV format and content."
         )
         return
 
-    # Join the JSON strings with newlines to create the in-memory file content
-    in_memory_json_file = "\n".join(rows_to_load_as_json_strings).encode("utf-8")
-
-    from io import BytesIO
-
-    # Load the table from the in-memory BytesIO object
-    job = client.load_table_from_file(
-        BytesIO(in_memory_json_file), table_ref, job_config=json_job_config
-    )
+    print(f"INFO: Loaded {loaded_rows} rows into '{dataset_name}.{table_name}'.")
 
-    job.result()  # Wait for the job to complete
-    print(f"INFO: Loaded {job.output_rows} rows into '{dataset_name}.{table_name}'.")
+    # The reload bumps the table's last-modified time, which invalidates cached search
+    # results in running agents; drop this process's cached results immediately as well.
+    invalidate_query_result_cache(f"{client.project}.{dataset_name}.{table_name}")
 
 
 def setup():
@@ -102,13 +169,16 @@ def setup():
     full_dataset_id = f"{project_id}.{dataset_id}"
     table_name = "resolved_tickets"
     csv_filepath = "data/resolved_tickets.csv"
+    # Prefer the binary companion dataset written by create_mock_db.py when present.
+    if os.path.exists("data/resolved_tickets/manifest.json"):
+        csv_filepath = "data/resolved_tickets"
 
     if not os.path.exists(csv_filepath):
         print(f"ERROR: Mock database file not found at '{csv_filepath}'.")
         print("Please run 'python scripts/create_mock_db.py' first.")
         return
 
-    bq_client = bigquery.Client(project=project_id)
+    bq_client = get_bigquery_client(project_id)
     create_dataset_if_not_exists(bq_client, full_dataset_id)
     load_csv_to_bigquery(bq_client, dataset_id, table_name, csv_filepath)
     print("✅ BigQuery setup complete.")
@@ -1,14 +1,21 @@
 # FILE: scripts/setup_rag.py
 
+import hashlib
+import json
 import os
+import shutil
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from typing import Optional
 
 import vertexai
 from dotenv import find_dotenv, set_key
 from google.cloud import storage
 from vertexai.preview import rag
 
+from project_agora.tools._chunking import CHUNK_OVERLAP, CHUNK_SIZE, file_content_hash
+
 # --- LLM PARSER CONFIGURATION ---
 CUSTOM_PARSING_PROMPT = """
 You are a factual data extractor for a technical software development kit (SDK) documentation.
@@ -25,33 +32,150 @@ Do not analyze, interpret, summarize, or give opinions on the content. Your role
 PARSER_MODEL_NAME = "gemini-2.0-flash-001"
 # --------------------------------
 
+# --- SYNC CONFIGURATION ---
+MAX_UPLOAD_WORKERS = 8
+IMPORT_BATCH_SIZE = 25  # rag.import_files accepts a limited number of URIs per call.
+# --------------------------------
 
-def upload_folder_to_gcs(bucket_name, source_folder, destination_prefix=""):
-    """Uploads files from a local folder to a GCS bucket, skipping existing files."""
-    storage_client = storage.Client()
-    try:
-        bucket = storage_client.get_bucket(bucket_name)
-    except Exception as e:
-        print(f"ERROR: Could not get GCS bucket '{bucket_name}'. Please ensure it exists and you have permissions. Details: {e}")
-        raise
 
+class GcsSyncStorage:
+    """Sync target backed by a GCS bucket; the manifest is stored next to (not inside) the prefix."""
+
+    def __init__(self, bucket_name: str, prefix: str, client=None):
+        storage_client = client or storage.Client()
+        try:
+            self.bucket = storage_client.get_bucket(bucket_name)
+        except Exception as e:
+            print(f"ERROR: Could not get GCS bucket '{bucket_name}'. Please ensure it exists and you have permissions. Details: {e}")
+            raise
+        self.bucket_name = bucket_name
+        self.prefix = prefix.strip("/")
+        # Kept outside the prefix so that the RAG import never picks it up as a document.
+        self.manifest_blob = self.bucket.blob(f"{self.prefix}.manifest.json")
+
+    def uri(self, name: str) -> str:
+        return f"gs://{self.bucket_name}/{self.prefix}/{name}"
+
+    def read_manifest(self) -> Optional[dict]:
+        if not self.manifest_blob.exists():
+            return None
+        return json.loads(self.manifest_blob.download_as_text())
+
+    def write_manifest(self, manifest: dict) -> None:
+        self.manifest_blob.upload_from_string(json.dumps(manifest, indent=2), content_type="application/json")
+
+    def upload(self, filepath: Path, name: str) -> None:
+        self.bucket.blob(f"{self.prefix}/{name}").upload_from_filename(str(filepath))
+
+    def delete(self, name: str) -> None:
+        blob = self.bucket.blob(f"{self.prefix}/{name}")
+        if blob.exists():
+            blob.delete()
+
+
+class LocalSyncStorage:
+    """Sync target backed by a local directory, a stand-in for GCS when testing the sync offline."""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.manifest_path = self.root.with_name(self.root.name + ".manifest.json")
+
+    def uri(self, name: str) -> str:
+        return (self.root / name).as_uri()
+
+    def read_manifest(self) -> Optional[dict]:
+        if not self.manifest_path.exists():
+            return None
+        return json.loads(self.manifest_path.read_text(encoding="utf-8"))
+
+    def write_manifest(self, manifest: dict) -> None:
+        self.manifest_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+    def upload(self, filepath: Path, name: str) -> None:
+        target = self.root / name
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(filepath, target)
+
+    def delete(self, name: str) -> None:
+        (self.root / name).unlink(missing_ok=True)
+
+
+def build_manifest(source_folder) -> dict:
+    """Maps every file under `source_folder` (relative POSIX path) to its SHA-256 content hash."""
     source_path = Path(source_folder)
-    filepaths = [p for p in source_path.rglob("*") if p.is_file() and not p.name.startswith(".")]
+    return {
+        p.relative_to(source_path).as_posix(): file_content_hash(p)
+        for p in sorted(source_path.rglob("*"))
+        if p.is_file() and not p.name.startswith(".")
+    }
+
+
+def manifest_digest(manifest: dict) -> str:
+    """A short, order-independent digest of a manifest, used as the corpus version."""
+    return hashlib.sha256(json.dumps(manifest, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
 
-    print(f"INFO: Checking {len(filepaths)} files for upload from '{source_folder}'...")
+def diff_manifests(local: dict, remote: Optional[dict]) -> tuple[list[str], list[str]]:
+    """Returns (new or changed files, files removed locally) between two manifests."""
+    remote = remote or {}
+    changed = [name for name, digest in local.items() if remote.get(name) != digest]
+    removed = [name for name in remote if name not in local]
+    return changed, removed
 
-    upload_count = 0
-    for filepath in filepaths:
-        destination_blob_name = os.path.join(destination_prefix, filepath.relative_to(source_path))
-        blob = bucket.blob(destination_blob_name)
-        if not blob.exists():
-            blob.upload_from_filename(str(filepath))
-            upload_count += 1
 
-    if upload_count > 0:
-        print(f"INFO: Successfully uploaded {upload_count} new files to gs://{bucket_name}/{destination_prefix}")
+def sync_folder(
+    sync_storage,
+    source_folder,
+    max_workers: int = MAX_UPLOAD_WORKERS,
+    commit: bool = True,
+) -> tuple[list[str], list[str], dict]:
+    """
+    Uploads only new or changed files to `sync_storage`, concurrently, and deletes files that
+    no longer exist locally. The manifest only records files that were synced successfully,
+    so a failed file is retried on the next run.
+
+    With `commit=False` the manifest is returned but not written, so the caller can persist it
+    once the files have also been processed downstream (e.g. imported into the RAG corpus).
+
+    Returns the (changed, removed) file names and the new manifest.
+    """
+    local = build_manifest(source_folder)
+    remote = sync_storage.read_manifest()
+    changed, removed = diff_manifests(local, remote)
+
+    print(f"INFO: {len(local)} files in '{source_folder}': {len(changed)} new or changed, {len(removed)} removed.")
+
+    source_path = Path(source_folder)
+    failed = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(sync_storage.upload, source_path / name, name): name for name in changed}
+        futures.update({executor.submit(sync_storage.delete, name): name for name in removed})
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                failed[futures[future]] = e
+
+    manifest = dict(local)
+    for name in failed:
+        if remote and name in remote:
+            manifest[name] = remote[name]
+        else:
+            manifest.pop(name, None)
+    if commit:
+        sync_storage.write_manifest(manifest)
+
+    if failed:
+        for name, error in failed.items():
+            print(f"ERROR: Could not sync '{name}': {error}")
+        raise RuntimeError(f"{len(failed)} of {len(changed) + len(removed)} file operations failed; re-run to retry.")
+
+    if changed or removed:
+        print(f"INFO: Synced {len(changed)} uploads and {len(removed)} deletions.")
     else:
-        print("INFO: All files already up-to-date in Google Cloud Storage.")
+        print("INFO: All files already up-to-date.")
+    return changed, removed, manifest
 
 
 def create_gcs_bucket_if_not_exists(bucket_name, project_id, location):
@@ -76,6 +200,17 @@ def write_to_env(key: str, value: str):
     print(f"INFO: Wrote '{key}={value}' to {dotenv_path}")
 
 
+def write_corpus_version(manifest: dict):
+    """
+    Stamps the synced manifest as KB_CORPUS_VERSION whenever it differs from the current
+    stamp, including after a sync that only deleted files. A new corpus version invalidates
+    the agents' cached knowledge retrieval results.
+    """
+    version = manifest_digest(manifest)
+    if os.getenv("KB_CORPUS_VERSION") != version:
+        write_to_env("KB_CORPUS_VERSION", version)
+
+
 def get_or_create_rag_corpus(display_name: str) -> rag.RagCorpus:
     """Retrieves an existing RAG corpus by display name or creates a new one."""
     corpora = rag.list_corpora()
@@ -104,8 +239,10 @@ def setup():
     create_gcs_bucket_if_not_exists(bucket_name, project_id, location)
     kb_source_folder = "data/knowledge_base"
     gcs_destination_prefix = "rag_knowledge_base"
-    upload_folder_to_gcs(bucket_name, kb_source_folder, gcs_destination_prefix)
-    gcs_uri = f"gs://{bucket_name}/{gcs_destination_prefix}"
+    sync_storage = GcsSyncStorage(bucket_name, gcs_destination_prefix)
+    # The manifest is committed only after the import has been started, so files whose
+    # import never ran are still seen as changed on the next run.
+    changed, removed, manifest = sync_folder(sync_storage, kb_source_folder, commit=False)
 
     print("\n--- Step 2: Setting up Vertex AI RAG Corpus ---")
     corpus_display_name = "adk_knowledge_base_corpus"
@@ -114,14 +251,37 @@ def setup():
     print("\n--- Step 3: Updating Environment File ---")
     write_to_env("RAG_CORPUS_NAME", corpus.name)
 
-    print(f"\n--- Step 4: Importing files with LLM Parser ---")
+    print(f"\n--- Step 4: Importing changed files with LLM Parser ---")
 
     try:
+        existing_files = {rag_file.display_name: rag_file.name for rag_file in rag.list_files(corpus.name)}
+        if not existing_files:
+            # A new (or emptied) corpus needs every file, not just the ones that changed in storage.
+            changed = list(build_manifest(kb_source_folder))
+
+        # Drop the stale copies of changed and removed files so the re-import does not duplicate them.
+        # RAG files are named after the source file; the knowledge base folder is flat.
+        for name in [*changed, *removed]:
+            rag_file_name = existing_files.get(Path(name).name)
+            if rag_file_name:
+                rag.delete_file(rag_file_name)
+
+        if not changed:
+            sync_storage.write_manifest(manifest)
+            write_corpus_version(manifest)
+            if removed:
+                print(f"INFO: Removed {len(removed)} deleted files from the corpus; nothing to import.")
+            else:
+                print("INFO: No new or changed files to import.")
+            print("\n✅✅✅ RAG Corpus setup complete! ✅✅✅")
+            return
+
         # Define the configuration objects separately. This is the correct pattern for this SDK version.
+        # The chunk parameters are shared with the local chunker (project_agora/tools/_chunking.py).
         transformation_config = rag.TransformationConfig(
             chunking_config=rag.ChunkingConfig(
-                chunk_size=1024,
-                chunk_overlap=200,
+                chunk_size=CHUNK_SIZE,
+                chunk_overlap=CHUNK_OVERLAP,
             ),
         )
 
@@ -130,15 +290,19 @@ def setup():
             custom_parsing_prompt=CUSTOM_PARSING_PROMPT,
         )
 
-        # Call the import files function. We will not wait for the result.
-        rag.import_files(
-            corpus.name,
-            [gcs_uri],
-            transformation_config=transformation_config,
-            llm_parser=llm_parser_config,
-        )
+        # Call the import files function for the changed files only. We will not wait for the result.
+        uris = [sync_storage.uri(name) for name in changed]
+        for start in range(0, len(uris), IMPORT_BATCH_SIZE):
+            rag.import_files(
+                corpus.name,
+                uris[start : start + IMPORT_BATCH_SIZE],
+                transformation_config=transformation_config,
+                llm_parser=llm_parser_config,
+            )
 
-        print(f"INFO: File import process started in the background.")
+        sync_storage.write_manifest(manifest)
+        write_corpus_version(manifest)
+        print(f"INFO: Import of {len(uris)} files started in the background.")
         print("INFO: Pausing for 60 seconds to allow ingestion to begin...")
         
         # Add a static delay. This is a pragmatic workaround for CI.
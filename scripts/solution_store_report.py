@@ -0,0 +1,36 @@
+# FILE: scripts/solution_store_report.py
+
+import argparse
+import time
+
+from tabulate import tabulate
+
+from project_agora.tools._solution_store import DEFAULT_STORE_PATH, SolutionStore
+
+
+def main():
+    """Reports the hit rate, acceptance rate and pipeline time saved by reusing stored solutions."""
+    parser = argparse.ArgumentParser(description="Report on stored-solution reuse from the solution store.")
+    parser.add_argument("--path", default=str(DEFAULT_STORE_PATH), help="SQLite file of the solution store.")
+    parser.add_argument(
+        "--days", type=float, nargs="*", default=[1, 7, 30],
+        help="Reporting windows in days (an extra 'all time' row is always printed).",
+    )
+    args = parser.parse_args()
+
+    store = SolutionStore(path=args.path)
+    now = time.time()
+    windows = [(f"last {days:g} days", now - days * 24 * 3600) for days in args.days] + [("all time", 0.0)]
+    rows = [{"window": name, **store.report(since=since)} for name, since in windows]
+    print(tabulate(rows, headers="keys", floatfmt=".3f"))
+
+    total = rows[-1]
+    print(
+        f"\nINFO: {total['entries']} stored solutions. {total['hits']} of {total['lookups']} new tickets were "
+        f"offered a stored solution, {total['accepted']} accepted it, saving {total['saved_seconds']:.1f}s "
+        f"of analysis, retrieval and solution time."
+    )
+
+
+if __name__ == "__main__":
+    main()
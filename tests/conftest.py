@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The setup and crawler scripts are run as files, not installed with the package.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
@@ -0,0 +1,38 @@
+from project_agora.tools._embedding_cache import MAX_BATCH_TEXTS, MAX_BATCH_TOKENS, embedding_batches
+from project_agora.tools._tokens import count_tokens
+
+
+def test_no_texts_yield_no_batches():
+    assert list(embedding_batches([])) == []
+
+
+def test_batches_hold_at_most_max_texts():
+    texts = [f"text {i}" for i in range(7)]
+    batches = list(embedding_batches(texts, max_texts=3))
+    assert [len(b) for b in batches] == [3, 3, 1]
+    assert sum(batches, []) == texts
+
+
+def test_batches_hold_at_most_max_tokens():
+    texts = ["one two three four"] * 5  # 4 tokens each
+    batches = list(embedding_batches(texts, max_tokens=10))
+    assert [len(b) for b in batches] == [2, 2, 1]
+
+
+def test_a_batch_may_fill_the_token_cap_exactly():
+    assert [len(b) for b in embedding_batches(["a b c d e"] * 4, max_tokens=10)] == [2, 2]
+
+
+def test_a_text_over_the_token_cap_is_sent_on_its_own():
+    long_text = " ".join(["word"] * 50)
+    batches = list(embedding_batches(["short one", long_text, "short two"], max_tokens=10))
+    assert batches == [["short one"], [long_text], ["short two"]]
+
+
+def test_default_limits_hold_for_many_texts():
+    texts = [" ".join(["token"] * (i % 400 + 1)) for i in range(2000)]
+    batches = list(embedding_batches(texts))
+    assert sum(batches, []) == texts
+    for batch in batches:
+        assert len(batch) <= MAX_BATCH_TEXTS
+        assert len(batch) == 1 or sum(count_tokens(t) for t in batch) <= MAX_BATCH_TOKENS
@@ -0,0 +1,134 @@
+import asyncio
+
+import pytest
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+from project_agora import model_routing
+from project_agora.model_routing import ModelRoute, RoutedLlm, model_routing_stats, routed_model
+
+pytest_plugins = ("pytest_asyncio",)
+
+AGENT = "test_agent"
+
+
+class FakeModel:
+    """Answers with its name after `delay` seconds, or raises `error`."""
+
+    def __init__(self, name: str, delay: float = 0.0, error: Exception = None):
+        self.name = name
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    async def generate_content_async(self, llm_request, stream=False):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text=self.name)]))
+
+
+@pytest.fixture
+def models(monkeypatch):
+    models = {"primary": FakeModel("primary"), "fallback": FakeModel("fallback")}
+    monkeypatch.setattr(model_routing, "_backends", models)
+    model_routing.reset_model_routing_stats()
+    yield models
+    model_routing.reset_model_routing_stats()
+
+
+def routed(**route) -> RoutedLlm:
+    route = ModelRoute(**{"model": "primary", "fallback": "fallback", "latency_budget_s": 0.05, **route})
+    return RoutedLlm(model=route.model, agent_name=AGENT, route=route)
+
+
+async def answer(llm: RoutedLlm) -> str:
+    responses = [r async for r in llm.generate_content_async(LlmRequest(model=llm.model))]
+    return "".join(r.content.parts[0].text for r in responses)
+
+
+@pytest.mark.asyncio
+async def test_a_fast_primary_answers(models):
+    assert await answer(routed()) == "primary"
+    stats = model_routing_stats()[AGENT]
+    assert stats["calls_by_model"] == {"primary": 1}
+    assert stats["failovers"] == 0
+
+
+@pytest.mark.asyncio
+async def test_a_failing_primary_fails_over(models):
+    models["primary"].error = RuntimeError("unavailable")
+    assert await answer(routed()) == "fallback"
+    stats = model_routing_stats()[AGENT]
+    assert (stats["failovers"], stats["errors"], stats["budget_breaches"]) == (1, 1, 0)
+    assert stats["calls_by_model"] == {"fallback": 1}
+
+
+@pytest.mark.asyncio
+async def test_a_slow_primary_fails_over_after_the_latency_budget(models):
+    models["primary"].delay = 1.0
+    assert await answer(routed()) == "fallback"
+    stats = model_routing_stats()[AGENT]
+    assert (stats["failovers"], stats["budget_breaches"], stats["errors"]) == (1, 1, 0)
+
+
+@pytest.mark.asyncio
+async def test_without_a_fallback_errors_propagate_and_the_budget_is_not_enforced(models):
+    models["primary"].delay = 0.1
+    assert await answer(routed(fallback=None)) == "primary"
+
+    models["primary"].error = RuntimeError("unavailable")
+    with pytest.raises(RuntimeError):
+        await answer(routed(fallback=None))
+    assert model_routing_stats()[AGENT]["errors"] == 1
+
+
+@pytest.mark.asyncio
+async def test_a_failing_fallback_raises(models):
+    models["primary"].error = RuntimeError("primary down")
+    models["fallback"].error = RuntimeError("fallback down")
+    with pytest.raises(RuntimeError, match="fallback down"):
+        await answer(routed())
+
+
+@pytest.mark.asyncio
+async def test_consecutive_breaches_downgrade_until_the_cooldown_ends(models):
+    llm = routed(downgrade_after=2, downgrade_cooldown_s=0.3)
+    models["primary"].delay = 1.0
+    await answer(llm)
+    await answer(llm)
+    assert models["primary"].calls == 2
+
+    # Downgraded: the primary is not tried at all.
+    assert await answer(llm) == "fallback"
+    assert models["primary"].calls == 2
+    assert model_routing_stats()[AGENT]["downgraded_calls"] == 1
+
+    await asyncio.sleep(0.3)
+    models["primary"].delay = 0.0
+    assert await answer(llm) == "primary"
+
+
+@pytest.mark.asyncio
+async def test_a_response_within_the_budget_resets_the_breach_count(models):
+    llm = routed(downgrade_after=2)
+    for delay in (1.0, 0.0, 1.0):
+        models["primary"].delay = delay
+        await answer(llm)
+    stats = model_routing_stats()[AGENT]
+    assert (stats["budget_breaches"], stats["downgraded_calls"]) == (2, 0)
+    assert await answer(llm) == "fallback"
+    assert models["primary"].calls == 4
+
+
+def test_routed_model_honours_the_routing_switch(monkeypatch):
+    monkeypatch.delenv("MODEL_ROUTING_ENABLED", raising=False)
+    monkeypatch.delenv("MODEL_ROUTING_CONFIG", raising=False)
+    monkeypatch.setattr(model_routing, "_routes", None)
+    llm = routed_model("problem_solver_agent")
+    assert isinstance(llm, RoutedLlm) and llm.model == model_routing.PRO_MODEL
+    assert routed_model("unknown_agent", default="some-model") == "some-model"
+
+    monkeypatch.setenv("MODEL_ROUTING_ENABLED", "false")
+    assert routed_model("problem_solver_agent") == model_routing.PRO_MODEL
@@ -0,0 +1,117 @@
+import os
+
+import pytest
+from google.adk.models import LlmRequest
+from google.genai import types
+
+from project_agora.prompt_cache import FilePrompt, LocalContextCacheBackend, PromptPrefixCache
+
+pytest_plugins = ("pytest_asyncio",)
+
+AGENT = "code_generator_agent"
+STYLE_GUIDE = "Follow the ADK style guide. " * 20
+
+
+def request(instruction: str = STYLE_GUIDE, model: str = "gemini-2.5-pro", tools=None) -> LlmRequest:
+    return LlmRequest(model=model, config=types.GenerateContentConfig(system_instruction=instruction, tools=tools))
+
+
+@pytest.fixture
+def backend():
+    return LocalContextCacheBackend()
+
+
+@pytest.fixture
+def cache(backend):
+    cache = PromptPrefixCache(backend)
+    cache.register(AGENT)
+    return cache
+
+
+@pytest.mark.asyncio
+async def test_the_instruction_is_cached_once_and_referenced(cache, backend):
+    first, second = request(), request()
+    assert await cache.apply(AGENT, first)
+    assert await cache.apply(AGENT, second)
+    assert backend.created == 1
+    assert first.config.system_instruction is None
+    assert first.config.cached_content == second.config.cached_content
+    assert backend.entries[first.config.cached_content] == STYLE_GUIDE
+    stats = cache.stats()[AGENT]
+    assert (stats["cached_calls"], stats["creations"], stats["uncached_calls"]) == (2, 1, 0)
+
+
+@pytest.mark.asyncio
+async def test_unregistered_agents_and_requests_with_tools_are_sent_uncached(cache, backend):
+    plain = request()
+    assert not await cache.apply("other_agent", plain)
+    assert plain.config.system_instruction == STYLE_GUIDE
+
+    with_tools = request(tools=[types.Tool(function_declarations=[types.FunctionDeclaration(name="lookup")])])
+    assert not await cache.apply(AGENT, with_tools)
+    assert with_tools.config.system_instruction == STYLE_GUIDE
+    assert backend.created == 0
+    assert cache.stats()[AGENT]["uncached_calls"] == 1
+
+
+@pytest.mark.asyncio
+async def test_a_changed_instruction_replaces_the_cache(cache, backend):
+    await cache.apply(AGENT, request())
+    changed = request(STYLE_GUIDE + "Use type hints.")
+    assert await cache.apply(AGENT, changed)
+    assert (backend.created, backend.deleted) == (2, 1)
+    assert list(backend.entries.values()) == [STYLE_GUIDE + "Use type hints."]
+    assert cache.stats()[AGENT]["refreshes"] == 1
+
+
+@pytest.mark.asyncio
+async def test_each_model_gets_its_own_cache(cache, backend):
+    pro, flash = request(), request(model="gemini-2.5-flash")
+    await cache.apply(AGENT, pro)
+    await cache.apply(AGENT, flash)
+    assert backend.created == 2
+    assert pro.config.cached_content != flash.config.cached_content
+
+
+@pytest.mark.asyncio
+async def test_a_cache_near_expiry_is_replaced_before_use(backend):
+    cache = PromptPrefixCache(backend, ttl_seconds=30)
+    cache.register(AGENT)
+    await cache.apply(AGENT, request())
+    await cache.apply(AGENT, request())
+    assert backend.created == 2
+
+
+@pytest.mark.asyncio
+async def test_a_rejected_prefix_is_not_retried_on_every_call():
+    backend = LocalContextCacheBackend(min_tokens=10_000)
+    cache = PromptPrefixCache(backend)
+    cache.register(AGENT)
+    for _ in range(3):
+        llm_request = request()
+        assert not await cache.apply(AGENT, llm_request)
+        assert llm_request.config.system_instruction == STYLE_GUIDE
+    stats = cache.stats()[AGENT]
+    assert (stats["failures"], stats["uncached_calls"]) == (1, 3)
+
+
+@pytest.mark.asyncio
+async def test_detach_restores_the_inline_instruction(cache):
+    llm_request = request()
+    await cache.apply(AGENT, llm_request)
+    cache.detach(llm_request)
+    assert llm_request.config.system_instruction == STYLE_GUIDE
+    assert llm_request.config.cached_content is None
+
+
+def test_file_prompt_rebuilds_only_when_a_source_file_changes(tmp_path):
+    guide = tmp_path / "style_guide.md"
+    guide.write_text("v1")
+    prompt = FilePrompt(lambda: "Instruction: " + guide.read_text(), [str(guide)])
+    assert prompt() == prompt() == "Instruction: v1"
+    assert prompt.rebuilds == 0
+
+    guide.write_text("v2, longer")
+    os.utime(guide, ns=(0, os.stat(guide).st_mtime_ns + 1_000_000))
+    assert prompt() == "Instruction: v2, longer"
+    assert prompt.rebuilds == 1
@@ -0,0 +1,90 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from scrape_adk_docs import DocsCrawler, clean_url, parse_page, url_to_filename
+
+pytest_plugins = ("pytest_asyncio",)
+
+BASE = "https://docs.example.com/adk/"
+
+
+def page(title: str, body: str, links: list[str]) -> str:
+    anchors = "".join(f'<a class="md-nav__link" href="{href}">{href}</a>' for href in links)
+    return (
+        f"<html><head><title>{title} - ADK</title></head><body><nav>{anchors}</nav>"
+        f'<div class="md-content"><div class="md-content__inner"><h1>{title}</h1><p>{body}</p></div></div>'
+        "</body></html>"
+    )
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def site(tmp_path):
+    root = tmp_path / "site"
+    (root / "guide").mkdir(parents=True)
+    (root / "index.html").write_text(page("Home", "Welcome", ["guide/", "guide/#setup", "https://other.example.com/"]))
+    (root / "guide" / "index.html").write_text(page("Guide", "Agents", ["../"]))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(QuietHandler, directory=str(root)))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/"
+    server.shutdown()
+    server.server_close()
+
+
+def crawler(base_url: str, tmp_path) -> DocsCrawler:
+    return DocsCrawler(
+        base_url,
+        output_dir=str(tmp_path / "kb"),
+        state_path=str(tmp_path / "state.json"),
+        max_concurrency=4,
+        parse_executor=ThreadPoolExecutor(max_workers=2),
+    )
+
+
+def test_urls_are_normalized_and_mapped_to_filenames():
+    assert clean_url(BASE + "guide/?q=1#setup") == clean_url(BASE + "guide") == BASE + "guide"
+    assert url_to_filename(BASE + "guide/agents.html") == "adk_guide_agents.md"
+    assert url_to_filename("https://docs.example.com/") == "index.md"
+
+
+def test_parse_page_converts_the_content_and_keeps_same_site_links():
+    content, links = parse_page(BASE, page("Home", "Welcome", ["guide/", "guide/#setup", "https://x.org/"]).encode(), BASE)
+    assert content.startswith("# Home\n\n**Source URL:** " + BASE)
+    assert "Welcome" in content
+    assert links == [BASE + "guide/"]
+
+
+def test_a_page_without_a_content_area_is_not_saved():
+    content, links = parse_page(BASE, b'<html><a class="md-nav__link" href="api/">API</a></html>', BASE)
+    assert content is None
+    assert links == [BASE + "api/"]
+
+
+@pytest.mark.asyncio
+async def test_the_crawl_saves_each_page_once(site, tmp_path):
+    stats = await crawler(site, tmp_path).run()
+    assert (stats["pages"], stats["fetched"], stats["saved"], stats["errors"]) == (2, 2, 2, 0)
+    assert "Agents" in (tmp_path / "kb" / "guide.md").read_text()
+    assert (tmp_path / "kb" / "index.md").exists()
+
+
+@pytest.mark.asyncio
+async def test_a_recrawl_revalidates_unchanged_pages(site, tmp_path):
+    await crawler(site, tmp_path).run()
+    stats = await crawler(site, tmp_path).run()
+    # The guide is still found through the links saved for the unchanged home page.
+    assert (stats["pages"], stats["fetched"], stats["not_modified"]) == (2, 0, 2)
+
+    (tmp_path / "kb" / "guide.md").unlink()
+    stats = await crawler(site, tmp_path).run()
+    assert (stats["fetched"], stats["not_modified"]) == (1, 1)
+    assert (tmp_path / "kb" / "guide.md").exists()
@@ -0,0 +1,47 @@
+import csv
+import json
+
+from setup_bigquery import iter_ndjson_chunks, iter_ticket_rows
+
+
+def rows(count: int) -> list[dict]:
+    return [{"ticket_id": f"TICK-{n}", "request_embedding": [n / 10] * 8} for n in range(count)]
+
+
+def test_no_rows_yield_no_chunks():
+    assert list(iter_ndjson_chunks([])) == []
+
+
+def test_chunks_round_trip_every_row_in_order():
+    source = rows(100)
+    loaded, files = [], []
+    for chunk, row_count in iter_ndjson_chunks(source, max_chunk_bytes=1000):
+        lines = chunk.read().splitlines()
+        assert len(lines) == row_count
+        loaded += [json.loads(line) for line in lines]
+        files.append(chunk)
+    assert loaded == source
+    assert len(files) > 1
+    # Each chunk is closed once the next one is requested.
+    assert all(f.closed for f in files)
+
+
+def test_a_chunk_ends_with_the_row_that_crosses_the_limit():
+    row_bytes = len(json.dumps(rows(1)[0])) + 1
+    counts = [n for _, n in iter_ndjson_chunks(rows(10), max_chunk_bytes=3 * row_bytes)]
+    assert counts == [3, 3, 3, 1]
+
+
+def test_ticket_rows_parse_embeddings_and_skip_malformed_rows(tmp_path):
+    csv_path = tmp_path / "tickets.csv"
+    with open(csv_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["ticket_id", "request", "request_embedding"])
+        writer.writeheader()
+        writer.writerow({"ticket_id": "TICK-1", "request": "a, quoted\nrequest", "request_embedding": "[0.5, 1.0]"})
+        writer.writerow({"ticket_id": "TICK-2", "request": "b", "request_embedding": "not json"})
+        writer.writerow({"ticket_id": "TICK-3", "request": "c", "request_embedding": "[2.0]"})
+
+    parsed = list(iter_ticket_rows(str(csv_path)))
+    assert [r["ticket_id"] for r in parsed] == ["TICK-1", "TICK-3"]
+    assert parsed[0]["request"] == "a, quoted\nrequest"
+    assert parsed[0]["request_embedding"] == [0.5, 1.0]
@@ -0,0 +1,71 @@
+import pytest
+
+from setup_rag import LocalSyncStorage, build_manifest, diff_manifests, manifest_digest, sync_folder
+
+
+@pytest.fixture
+def source(tmp_path):
+    folder = tmp_path / "kb"
+    (folder / "guides").mkdir(parents=True)
+    (folder / "a.md").write_text("alpha")
+    (folder / "guides" / "b.md").write_text("beta")
+    (folder / ".DS_Store").write_text("ignored")
+    return folder
+
+
+class FlakyStorage(LocalSyncStorage):
+    """Fails every upload of `failing`."""
+
+    def __init__(self, root, failing: str):
+        super().__init__(root)
+        self.failing = failing
+
+    def upload(self, filepath, name):
+        if name == self.failing:
+            raise OSError("upload failed")
+        super().upload(filepath, name)
+
+
+def test_manifest_maps_relative_paths_and_skips_hidden_files(source):
+    assert sorted(build_manifest(source)) == ["a.md", "guides/b.md"]
+
+
+def test_diff_and_digest():
+    local = {"a.md": "1", "b.md": "2", "c.md": "3"}
+    assert diff_manifests(local, None) == (["a.md", "b.md", "c.md"], [])
+    assert diff_manifests(local, {"a.md": "1", "b.md": "old", "d.md": "4"}) == (["b.md", "c.md"], ["d.md"])
+    assert manifest_digest({"a.md": "1", "b.md": "2"}) == manifest_digest({"b.md": "2", "a.md": "1"})
+
+
+def test_only_new_changed_and_removed_files_are_synced(source, tmp_path):
+    storage = LocalSyncStorage(tmp_path / "bucket")
+    changed, removed, _ = sync_folder(storage, source)
+    assert (sorted(changed), removed) == (["a.md", "guides/b.md"], [])
+    assert (tmp_path / "bucket" / "guides" / "b.md").read_text() == "beta"
+
+    assert sync_folder(storage, source)[:2] == ([], [])
+
+    (source / "a.md").write_text("alpha, edited")
+    (source / "guides" / "b.md").unlink()
+    changed, removed, manifest = sync_folder(storage, source)
+    assert (changed, removed) == (["a.md"], ["guides/b.md"])
+    assert not (tmp_path / "bucket" / "guides" / "b.md").exists()
+    assert storage.read_manifest() == manifest == build_manifest(source)
+
+
+def test_a_failed_upload_is_retried_on_the_next_run(source, tmp_path):
+    storage = FlakyStorage(tmp_path / "bucket", failing="guides/b.md")
+    with pytest.raises(RuntimeError):
+        sync_folder(storage, source)
+    assert sorted(storage.read_manifest()) == ["a.md"]
+
+    storage.failing = None
+    assert sync_folder(storage, source)[:2] == (["guides/b.md"], [])
+
+
+def test_without_commit_the_manifest_is_not_written(source, tmp_path):
+    storage = LocalSyncStorage(tmp_path / "bucket")
+    _, _, manifest = sync_folder(storage, source, commit=False)
+    assert storage.read_manifest() is None
+    storage.write_manifest(manifest)
+    assert sync_folder(storage, source)[:2] == ([], [])
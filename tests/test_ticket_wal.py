@@ -0,0 +1,109 @@
+import numpy as np
+import pytest
+
+from project_agora.tools._ticket_wal import TicketWriteAheadLog, record_embedding
+
+
+def ticket(n: int) -> dict:
+    return {
+        "ticket_id": f"TICK-{n}",
+        "customer_id": f"DEV-{n}",
+        "request": f"request {n}",
+        "category": "Technical Issue",
+        "suggested_solution": f"solution {n}",
+    }
+
+
+@pytest.fixture
+def wal_path(tmp_path):
+    return tmp_path / "wal.log"
+
+
+def fill(path, count: int) -> TicketWriteAheadLog:
+    wal = TicketWriteAheadLog(str(path))
+    for n in range(1, count + 1):
+        wal.append(ticket(n), np.full(4, n, dtype=np.float32))
+    return wal
+
+
+def test_append_assigns_sequence_numbers_and_round_trips_records(wal_path):
+    wal = fill(wal_path, 3)
+    records = wal.pending()
+    assert [r["seq"] for r in records] == [1, 2, 3]
+    assert records[1]["request"] == "request 2"
+    np.testing.assert_array_equal(record_embedding(records[2]), np.full(4, 3, dtype=np.float32))
+
+
+def test_a_logged_ticket_is_not_appended_again_after_a_restart(wal_path):
+    fill(wal_path, 2)
+    wal = TicketWriteAheadLog(str(wal_path))
+    assert wal.append(ticket(2), np.zeros(4)) is None
+    assert wal.append(ticket(3), np.zeros(4)) == 3
+
+
+def test_read_resumes_from_a_record_end_offset(wal_path):
+    wal = fill(wal_path, 3)
+    (_, offset), *_ = wal.read()
+    assert [r["seq"] for r, _ in wal.read(offset=offset)] == [2, 3]
+    assert [r["seq"] for r, _ in wal.read(after_seq=2)] == [3]
+
+
+def test_a_torn_tail_is_cut_off_on_open(wal_path):
+    fill(wal_path, 3)
+    valid_size = wal_path.stat().st_size
+    with open(wal_path, "ab") as f:
+        f.write(b'0badc0de\t{"seq":4,"ticket_id":"TICK-4"')
+
+    wal = TicketWriteAheadLog(str(wal_path))
+    assert wal_path.stat().st_size == valid_size
+    assert (wal.record_count, wal.last_seq) == (3, 3)
+    assert wal.append(ticket(4), np.zeros(4)) == 4
+    assert [r["seq"] for r in TicketWriteAheadLog(str(wal_path)).pending()] == [1, 2, 3, 4]
+
+
+def test_a_corrupt_last_record_is_discarded_on_open(wal_path):
+    fill(wal_path, 3)
+    data = wal_path.read_bytes()
+    last_start = data.rindex(b"\n", 0, len(data) - 1) + 1
+    wal_path.write_bytes(data[:-3] + b"X" + data[-2:])
+
+    wal = TicketWriteAheadLog(str(wal_path))
+    assert wal_path.stat().st_size == last_start
+    assert (wal.record_count, wal.last_seq) == (2, 2)
+
+
+def test_the_checkpoint_survives_a_restart(wal_path):
+    fill(wal_path, 3).commit_checkpoint(2)
+    wal = TicketWriteAheadLog(str(wal_path))
+    assert wal.checkpoint == 2
+    assert [r["seq"] for r in wal.pending()] == [3]
+
+
+def test_truncate_removes_the_checkpointed_records(wal_path):
+    wal = fill(wal_path, 3)
+    size = wal_path.stat().st_size
+    wal.commit_checkpoint(2)
+
+    removed = wal.truncate()
+    assert removed > 0 and wal_path.stat().st_size == size - removed
+    assert wal.record_count == 1
+    assert [r["seq"] for r, _ in wal.read()] == [3]
+
+
+def test_sequence_numbers_continue_after_truncating_the_whole_log(wal_path):
+    wal = fill(wal_path, 3)
+    wal.commit_checkpoint(3)
+    wal.truncate()
+    assert wal_path.stat().st_size == 0
+
+    wal = TicketWriteAheadLog(str(wal_path))
+    assert (wal.record_count, wal.last_seq) == (0, 3)
+    assert wal.append(ticket(4), np.zeros(4)) == 4
+
+
+def test_an_unreadable_checkpoint_replays_the_whole_log(wal_path):
+    fill(wal_path, 2).commit_checkpoint(2)
+    wal_path.with_name(wal_path.name + ".checkpoint.json").write_text("{not json")
+    wal = TicketWriteAheadLog(str(wal_path))
+    assert wal.checkpoint == 0
+    assert [r["seq"] for r in wal.pending()] == [1, 2]
@@ -0,0 +1,84 @@
+import asyncio
+import contextvars
+import threading
+import time
+
+import pytest
+
+from project_agora.tools._tool_executor import reset_tool_executor, run_blocking, tool_executor_stats
+
+pytest_plugins = ("pytest_asyncio",)
+
+request_id = contextvars.ContextVar("request_id", default=None)
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setenv("TOOL_THREAD_POOL_SIZE", "2")
+    reset_tool_executor()
+    yield
+    reset_tool_executor()
+
+
+@pytest.mark.asyncio
+async def test_returns_the_result_from_a_pool_thread(pool):
+    def call(a, b=0):
+        return threading.current_thread().name, a + b
+
+    thread_name, result = await run_blocking(call, 1, b=2)
+    assert result == 3
+    assert thread_name.startswith("agora-tool")
+
+
+@pytest.mark.asyncio
+async def test_exceptions_propagate_to_the_caller(pool):
+    def fail():
+        raise KeyError("missing")
+
+    with pytest.raises(KeyError):
+        await run_blocking(fail)
+    assert tool_executor_stats()["running"] == 0
+
+
+@pytest.mark.asyncio
+async def test_context_variables_are_propagated_but_not_leaked_back(pool):
+    def call():
+        seen = request_id.get()
+        request_id.set("changed in the pool")
+        return seen
+
+    request_id.set("req-1")
+    assert await run_blocking(call) == "req-1"
+    assert request_id.get() == "req-1"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_are_bounded_by_the_pool_size(pool):
+    await asyncio.gather(*(run_blocking(time.sleep, 0.05) for _ in range(6)))
+    stats = tool_executor_stats()
+    assert (stats["pool_size"], stats["calls"], stats["peak_running"], stats["running"]) == (2, 6, 2, 0)
+    # Four calls had to wait for a free thread.
+    assert stats["queued_seconds"] >= 0.05
+
+
+@pytest.mark.asyncio
+async def test_the_event_loop_keeps_running_during_a_blocking_call(pool):
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    await run_blocking(time.sleep, 0.2)
+    task.cancel()
+    assert ticks >= 5
+
+
+def test_reset_clears_the_stats(pool):
+    asyncio.run(run_blocking(int, "1"))
+    assert tool_executor_stats()["calls"] == 1
+    reset_tool_executor()
+    assert tool_executor_stats() == {"pool_size": 0, "calls": 0, "running": 0, "peak_running": 0, "queued_seconds": 0.0}
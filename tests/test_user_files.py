@@ -0,0 +1,102 @@
+import os
+
+import pytest
+
+from project_agora.tools._user_files import _local_path, read_span
+
+LINES = b"".join(b"line%d\n" % i for i in range(10))  # 10 lines of 6 bytes
+
+
+@pytest.fixture
+def user_root(tmp_path, monkeypatch):
+    root = tmp_path / "uploads"
+    root.mkdir()
+    monkeypatch.setenv("USER_FILE_ROOT", str(root))
+    monkeypatch.delenv("USER_FILE_MAX_BYTES", raising=False)
+    return root
+
+
+def test_head_stops_at_the_last_complete_line(user_root):
+    (user_root / "app.log").write_bytes(LINES)
+    span = read_span("app.log", "head", max_bytes=15)
+    assert (span.text, span.start, span.end, span.size) == ("line0\nline1\n", 0, 12, 60)
+    assert not span.complete
+
+
+def test_head_of_a_small_file_is_complete(user_root):
+    (user_root / "app.log").write_bytes(LINES)
+    span = read_span("app.log")
+    assert span.text == LINES.decode()
+    assert span.complete
+
+
+def test_tail_drops_the_partial_first_line(user_root):
+    (user_root / "app.log").write_bytes(LINES)
+    span = read_span("app.log", "tail", max_bytes=15)
+    # The last 15 bytes start inside line7.
+    assert (span.text, span.start, span.end) == ("line8\nline9\n", 48, 60)
+
+
+def test_tail_keeps_a_single_line_longer_than_the_limit(user_root):
+    (user_root / "app.log").write_bytes(b"x" * 20 + b"\n")
+    span = read_span("app.log", "tail", max_bytes=5)
+    assert (span.text, span.start, span.end) == ("xxxx\n", 16, 21)
+
+
+def test_window_starts_at_the_offset_and_stops_before_a_cut_line(user_root):
+    (user_root / "app.log").write_bytes(LINES)
+    span = read_span("app.log", "window", max_bytes=15, offset=12)
+    assert (span.text, span.start, span.end) == ("line2\nline3\n", 12, 24)
+
+
+def test_window_keeps_the_last_line_without_a_newline(user_root):
+    (user_root / "app.log").write_bytes(LINES + b"end")
+    span = read_span("app.log", "window", max_bytes=100, offset=54)
+    assert (span.text, span.end) == ("line9\nend", 63)
+
+
+def test_a_line_longer_than_the_limit_is_split(user_root):
+    (user_root / "app.log").write_bytes(b"x" * 100 + b"\n")
+    span = read_span("app.log", "head", max_bytes=10)
+    assert (span.text, span.end) == ("x" * 10, 10)
+
+
+def test_max_bytes_is_capped_by_user_file_max_bytes(user_root, monkeypatch):
+    monkeypatch.setenv("USER_FILE_MAX_BYTES", "12")
+    (user_root / "app.log").write_bytes(LINES)
+    assert read_span("app.log", "head", max_bytes=1000).end == 12
+
+
+def test_unknown_mode_is_rejected(user_root):
+    (user_root / "app.log").write_bytes(LINES)
+    with pytest.raises(ValueError):
+        read_span("app.log", "middle")
+
+
+def test_local_path_resolves_paths_and_file_uris_inside_the_root(user_root):
+    (user_root / "logs").mkdir()
+    target = user_root / "logs" / "app.log"
+    target.write_bytes(LINES)
+    assert _local_path("logs/app.log") == target.resolve()
+    assert _local_path(target.as_uri()) == target.resolve()
+
+
+@pytest.mark.parametrize("file_uri", ["../secret.txt", "logs/../../secret.txt", "/etc/passwd", "file:///etc/passwd"])
+def test_local_path_refuses_paths_outside_the_root(user_root, file_uri):
+    (user_root.parent / "secret.txt").write_text("secret")
+    with pytest.raises(PermissionError):
+        _local_path(file_uri)
+
+
+def test_local_path_refuses_symlinks_out_of_the_root(user_root):
+    (user_root.parent / "secret.txt").write_text("secret")
+    os.symlink(user_root.parent / "secret.txt", user_root / "link.txt")
+    with pytest.raises(PermissionError):
+        read_span("link.txt")
+
+
+def test_local_files_are_refused_without_user_file_root(tmp_path, monkeypatch):
+    monkeypatch.delenv("USER_FILE_ROOT", raising=False)
+    (tmp_path / "app.log").write_bytes(LINES)
+    with pytest.raises(PermissionError):
+        read_span(str(tmp_path / "app.log"))